@@ -0,0 +1,65 @@
+"""
+Benchmarks the per-call overhead of server interceptor chains of 0, 1, 5 and 10 pass-through interceptors,
+dispatching a unary-unary RPC the way the gRPC server does (generic handler lookup, then the method handler).
+
+Usage: python benchmarks/interceptor_chain.py [--calls 100000]
+"""
+import argparse
+import collections
+import os
+import sys
+import timeit
+
+import grpc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from grpc_django.utils.interceptors import UnaryUnaryServerInterceptor, intercept_server  # noqa: E402
+
+HandlerCallDetails = collections.namedtuple('HandlerCallDetails', ('method', 'invocation_metadata'))
+
+
+class PassThroughInterceptor(UnaryUnaryServerInterceptor):
+    def intercept_unary_unary_handler(self, handler, method, request, servicer_context):
+        return handler(request, servicer_context)
+
+
+class Server:
+    """
+    Collects the generic handlers registered by the (intercepting) server
+    """
+    def __init__(self):
+        self.handlers = []
+
+    def add_generic_rpc_handlers(self, generic_rpc_handlers):
+        self.handlers.extend(generic_rpc_handlers)
+
+
+def get_user(request, context):
+    return request
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--calls', type=int, default=100000)
+    args = parser.parse_args()
+
+    details = HandlerCallDetails('/test.TestService/GetUser', ())
+    generic_handler = grpc.method_handlers_generic_handler(
+        'test.TestService', {'GetUser': grpc.unary_unary_rpc_method_handler(get_user)})
+
+    print("{:>12} {:>12}".format("interceptors", "ns/call"))
+    for count in (0, 1, 5, 10):
+        server = Server()
+        intercepted = intercept_server(server, *[PassThroughInterceptor() for _ in range(count)]) if count else server
+        intercepted.add_generic_rpc_handlers((generic_handler,))
+        handler = server.handlers[0]
+
+        def call():
+            handler.service(details).unary_unary(None, None)
+        elapsed = min(timeit.repeat(call, number=args.calls, repeat=3))
+        print("{:>12} {:>12.0f}".format(count, elapsed / args.calls * 1e9))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmarks the rows/sec of building the response messages of model instances and of `values()` rows: through a
+Django REST framework serializer (when installed), through a plain serializer and the intermediate dictionary, and
+straight from the objects with the field mapping converter.
+
+Usage: python benchmarks/model_conversion.py [--rows 100000]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tests.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth.models import User as UserModel  # noqa: E402
+
+from grpc_django.converters import ModelToProtobufConverter  # noqa: E402
+from grpc_django.protobuf_to_dict import dict_to_protobuf  # noqa: E402
+from tests.grpc_codegen.test_pb2 import User  # noqa: E402
+
+try:
+    from rest_framework import serializers
+except ImportError:
+    serializers = None
+
+
+class UserSerializer:
+    def __init__(self, obj):
+        self.obj = obj
+
+    @property
+    def data(self):
+        return {"id": self.obj.id, "username": self.obj.username, "name": self.obj.first_name}
+
+
+if serializers is not None:
+    class UserModelSerializer(serializers.ModelSerializer):
+        name = serializers.CharField(source='first_name')
+
+        class Meta:
+            model = UserModel
+            fields = ('id', 'username', 'name')
+
+
+def serialize(serializer_class, objects):
+    for obj in objects:
+        yield dict_to_protobuf(User, values=serializer_class(obj).data, ignore_none=True)
+
+
+def measure(convert, objects):
+    start = time.perf_counter()
+    count = sum(1 for _ in convert(objects))
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', default='100000')
+    args = parser.parse_args()
+
+    converter = ModelToProtobufConverter(User, {"id": "id", "username": "username", "name": "first_name"}, UserModel)
+    print("{:>10} {:>16} {:>16} {:>16} {:>16}".format("rows", "drf/s", "serializer/s", "converter/s",
+                                                      "values()/s"))
+    for num_rows in [int(x) for x in args.rows.split(',')]:
+        # Unsaved instances, the database is left out of the measurement
+        users = [UserModel(id=i, username="user.{}".format(i), first_name="User {}".format(i))
+                 for i in range(num_rows)]
+        rows = [{"id": i, "username": "user.{}".format(i), "first_name": "User {}".format(i)}
+                for i in range(num_rows)]
+        drf = measure(lambda objects: serialize(UserModelSerializer, objects), users) if serializers else None
+        print("{:>10} {:>16} {:>16,.0f} {:>16,.0f} {:>16,.0f}".format(
+            num_rows,
+            "{:,.0f}".format(drf) if drf is not None else "n/a",
+            measure(lambda objects: serialize(UserSerializer, objects), users),
+            measure(lambda objects: map(converter, objects), users),
+            measure(lambda objects: map(converter, objects), rows),
+        ))
+    if serializers is None:
+        print("Django REST framework is not installed, its serializer was skipped")
+
+
+if __name__ == '__main__':
+    main()
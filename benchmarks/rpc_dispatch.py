@@ -0,0 +1,114 @@
+"""
+Benchmarks the per-call overhead of dispatching RPCs of the test service to views returning constant responses,
+the way the gRPC server does (generic handler lookup, then the method handler), with:
+- servicer: the generated servicer class patched with the views, added with its `add_*Servicer_to_server`
+- generic: the generic handler built by `GRPCService.get_generic_handler`
+
+--no-request-scope leaves out the request_started/request_finished signals sent around the views, which otherwise
+dominate the timings.
+
+Usage: python benchmarks/rpc_dispatch.py [--calls 100000] [--no-request-scope]
+"""
+import argparse
+import collections
+import contextlib
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tests.settings')
+
+import django  # noqa: E402
+django.setup()
+
+from grpc_django import service as grpc_service  # noqa: E402
+from grpc_django.interfaces import rpc  # noqa: E402
+from grpc_django.settings import settings  # noqa: E402
+from grpc_django.views import GenericGrpcView, ServerStreamGRPCView  # noqa: E402
+from tests.grpc_codegen.test_pb2 import Empty, GetPayload, User  # noqa: E402
+
+HandlerCallDetails = collections.namedtuple('HandlerCallDetails', ('method', 'invocation_metadata'))
+
+
+class Server:
+    """
+    Collects the generic handlers registered by the servicers
+    """
+    def __init__(self):
+        self.handlers = []
+
+    def add_generic_rpc_handlers(self, generic_rpc_handlers):
+        self.handlers.extend(generic_rpc_handlers)
+
+
+USER = User(id=1, name="Bruce Wayne", username="bruce.wayne")
+
+
+class GetUser(GenericGrpcView):
+    response_proto = User
+
+    def __call__(self):
+        return USER
+
+
+class ListUsers(ServerStreamGRPCView):
+    response_proto = User
+
+    def __call__(self):
+        yield USER
+
+
+class Context:
+    def invocation_metadata(self):
+        return ()
+
+
+def get_servicer_handler(service):
+    server = Server()
+    service.find_server_handler()(service.load(), server)
+    return server.handlers[0]
+
+
+def get_generic_handler(service):
+    return service.get_generic_handler()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--calls', type=int, default=100000)
+    parser.add_argument('--no-request-scope', action='store_true')
+    args = parser.parse_args()
+    if args.no_request_scope:
+        grpc_service.request_scope = lambda *args: contextlib.nullcontext()
+
+    service = settings.services[0]
+    service.rpcs = [rpc('GetUser', GetUser), rpc('ListUsers', ListUsers)]
+    service.find_stubs()
+    context = Context()
+    get_user = HandlerCallDetails('/test.TestService/GetUser', ())
+    list_users = HandlerCallDetails('/test.TestService/ListUsers', ())
+    get_payload, empty = GetPayload(id=1), Empty()
+
+    paths = [('servicer', get_servicer_handler)]
+    if hasattr(service, 'get_generic_handler'):
+        paths.append(('generic', get_generic_handler))
+
+    print("{:>10} {:>12} {:>12}".format("path", "unary ns", "stream ns"))
+    for name, get_handler in paths:
+        handler = get_handler(service)
+
+        def unary():
+            handler.service(get_user).unary_unary(get_payload, context)
+
+        def stream():
+            for _ in handler.service(list_users).unary_stream(empty, context):
+                pass
+
+        timings = [min(timeit.repeat(call, number=args.calls, repeat=3)) / args.calls * 1e9
+                   for call in (unary, stream)]
+        print("{:>10} {:>12.0f} {:>12.0f}".format(name, *timings))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmarks the rows/sec of ServerStreamGRPCView, converting rows one at a time vs. in batches.
+
+Usage: python benchmarks/stream_serialization.py [--rows 10000,100000,1000000] [--batch-size 1000]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tests.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from grpc_django.views import ServerStreamGRPCView  # noqa: E402
+from tests.grpc_codegen.test_pb2 import Empty, User  # noqa: E402
+
+
+class Context:
+    def invocation_metadata(self):
+        return ()
+
+    def set_code(self, code):
+        pass
+
+    def set_details(self, details):
+        pass
+
+
+class RowSerializer:
+    def __init__(self, obj):
+        self.obj = obj
+
+    @property
+    def data(self):
+        return self.obj
+
+
+def make_view(rows, batch_size, serializer_class):
+    class BenchmarkView(ServerStreamGRPCView):
+        response_proto = User
+
+        def get_queryset(self):
+            return rows
+
+    BenchmarkView.batch_size = batch_size
+    BenchmarkView.serializer_class = serializer_class
+    return BenchmarkView
+
+
+def measure(view_class):
+    start = time.perf_counter()
+    count = sum(1 for _ in view_class(Empty(), Context())())
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', default='10000,100000,1000000')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    print("{:>10} {:>16} {:>16} {:>16}".format("rows", "per-row/s", "batched/s", "values()/s"))
+    for num_rows in [int(x) for x in args.rows.split(',')]:
+        rows = [{"id": i, "name": "User {}".format(i), "username": "user.{}".format(i)} for i in range(num_rows)]
+        print("{:>10} {:>16,.0f} {:>16,.0f} {:>16,.0f}".format(
+            num_rows,
+            measure(make_view(rows, None, RowSerializer)),
+            measure(make_view(rows, args.batch_size, RowSerializer)),
+            measure(make_view(rows, args.batch_size, None)),
+        ))
+
+
+if __name__ == '__main__':
+    main()
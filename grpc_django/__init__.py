@@ -1,5 +1,6 @@
 from .interfaces import (
-    IServer as GRPCServer, IService as GRPCService, ISettings as GRPCSettings
+    IConnectionPool as GRPCConnectionPool, IServer as GRPCServer, IServerOptions as GRPCServerOptions,
+    IService as GRPCService, ISettings as GRPCSettings, IWarmup as GRPCWarmup
 )
 
-__all__ = ['GRPCServer', 'GRPCService', 'GRPCSettings']
+__all__ = ['GRPCConnectionPool', 'GRPCServer', 'GRPCServerOptions', 'GRPCService', 'GRPCSettings', 'GRPCWarmup']
@@ -0,0 +1,271 @@
+import json
+import time
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.exceptions import ImproperlyConfigured
+
+from .cache import LRUCache
+from .exceptions import AuthenticationFailed
+
+
+class Principal:
+    """
+    Lightweight representation of the authenticated user of an RPC, the claims it was authenticated with are
+    available as attributes.
+    """
+    __slots__ = ('id', 'username', 'claims')
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, id=None, username='', claims=None):
+        self.id = id
+        self.username = username
+        self.claims = claims if claims is not None else {}
+
+    @property
+    def pk(self):
+        return self.id
+
+    def __getattr__(self, name):
+        # Only called for attributes which are not slots, which may not be set yet while unpickling
+        if name == 'claims':
+            raise AttributeError(name)
+        try:
+            return self.claims[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __eq__(self, other):
+        return isinstance(other, Principal) and (self.id, self.username, self.claims) == \
+            (other.id, other.username, other.claims)
+
+    def __hash__(self):
+        return hash((self.id, self.username))
+
+    def __str__(self):
+        return self.username
+
+    def __repr__(self):
+        return '<Principal: {}>'.format(self.username or self.id)
+
+
+class LazyUser:
+    """
+    Proxy of the user of an RPC authenticating it on first access, like a SimpleLazyObject which is several times
+    more expensive to build.
+    """
+    __slots__ = ('_authenticate', '_context', '_user')
+
+    def __init__(self, authenticate, context):
+        """
+        :param authenticate: function returning the user of the context
+        """
+        self._authenticate = authenticate
+        self._context = context
+        self._user = None
+
+    def _get_user(self):
+        if self._user is None:
+            self._user = self._authenticate(self._context)
+        return self._user
+
+    # Lets isinstance() check the class of the user
+    @property
+    def __class__(self):
+        return self._get_user().__class__
+
+    def __getattr__(self, name):
+        return getattr(self._get_user(), name)
+
+    def __eq__(self, other):
+        return self._get_user() == other
+
+    def __hash__(self):
+        return hash(self._get_user())
+
+    def __bool__(self):
+        return bool(self._get_user())
+
+    def __str__(self):
+        return str(self._get_user())
+
+    def __repr__(self):
+        return '<LazyUser: {!r}>'.format(self._get_user())
+
+
+class BaseAuthenticator:
+    """
+    Base class of the authenticators, which verify the credentials found in the metadata of the RPCs.
+    Verified principals are cached by their raw credentials.
+    """
+    DEFAULT_CACHE_SIZE = 1024
+    DEFAULT_CACHE_TIMEOUT = 300
+
+    def __init__(self, cache_size=DEFAULT_CACHE_SIZE, cache_timeout=DEFAULT_CACHE_TIMEOUT):
+        """
+        :param cache_size: maximum number of verified principals to cache
+        :param cache_timeout: seconds the verified principals are cached for
+        """
+        self._principals = LRUCache(max_size=cache_size, timeout=cache_timeout)
+
+    def get_credentials(self, metadata):
+        """
+        Override this function to extract the credentials from the metadata
+        :param metadata: dictionary of the invocation metadata
+        :return: the raw credentials, None if the metadata holds none
+        """
+        raise NotImplementedError
+
+    def verify(self, credentials):
+        """
+        Override this function to verify the credentials.
+        Raise AuthenticationFailed if they are invalid.
+        :return: Principal of the credentials, None if they do not identify a user
+        """
+        raise NotImplementedError
+
+    def get_cache_timeout(self, principal):
+        """
+        :return: seconds the principal may be cached for
+        """
+        return DEFAULT_TIMEOUT
+
+    def authenticate(self, metadata):
+        """
+        :return: Principal of the credentials in the metadata, None if there are none
+        """
+        credentials = self.get_credentials(metadata)
+        if credentials is None:
+            return None
+        principal = self._principals.get(credentials)
+        if principal is None:
+            principal = self.verify(credentials)
+            if principal is not None:
+                self._principals.set(credentials, principal, self.get_cache_timeout(principal))
+        return principal
+
+
+class JSONMetadataAuthenticator(BaseAuthenticator):
+    """
+    Authenticates the user passed on as a JSON object in the metadata, by a trusted upstream service
+    """
+
+    def __init__(self, key='user', **kwargs):
+        super().__init__(**kwargs)
+        self.key = key
+
+    def get_credentials(self, metadata):
+        return metadata.get(self.key)
+
+    def verify(self, credentials):
+        try:
+            claims = json.loads(credentials)
+        except ValueError:
+            raise AuthenticationFailed("Invalid {} metadata".format(self.key))
+        if not claims:
+            return None
+        if not isinstance(claims, dict):
+            raise AuthenticationFailed("Invalid {} metadata".format(self.key))
+        return Principal(id=claims.get('id'), username=claims.get('username', ''), claims=claims)
+
+
+class BearerTokenAuthenticator(BaseAuthenticator):
+    """
+    Authenticates the bearer token of the authorization metadata, override `verify` to verify the tokens
+    """
+    keyword = 'Bearer'
+
+    def __init__(self, key='authorization', **kwargs):
+        super().__init__(**kwargs)
+        self.key = key
+
+    def get_credentials(self, metadata):
+        value = metadata.get(self.key)
+        if value is None:
+            return None
+        keyword, _, token = value.partition(' ')
+        if keyword != self.keyword or not token:
+            return None
+        return token
+
+
+class JWTAuthenticator(BearerTokenAuthenticator):
+    """
+    Authenticates JSON Web Tokens, signed with a static key or with the keys of a JWKS endpoint, which are cached.
+    Requires PyJWT.
+    """
+
+    def __init__(self, signing_key=None, jwks_url=None, algorithms=('RS256',), audience=None, issuer=None, leeway=0,
+                 id_claim='sub', username_claim='username', jwks_lifespan=300, **kwargs):
+        """
+        :param signing_key: key verifying the signatures of the tokens
+        :param jwks_url: URL of the JSON Web Key Set verifying the signatures of the tokens, instead of a static key
+        :param jwks_lifespan: seconds the keys of the JWKS endpoint are cached for
+        """
+        super().__init__(**kwargs)
+        try:
+            import jwt
+        except ImportError:
+            raise ImproperlyConfigured("JWTAuthenticator requires PyJWT, install it with 'pip install pyjwt[crypto]'")
+        if (signing_key is None) == (jwks_url is None):
+            raise ImproperlyConfigured("JWTAuthenticator requires either a signing_key or a jwks_url")
+        self._jwt = jwt
+        self.signing_key = signing_key
+        self.jwks_client = jwt.PyJWKClient(jwks_url, cache_keys=True, lifespan=jwks_lifespan) if jwks_url else None
+        self.algorithms = list(algorithms)
+        self.audience = audience
+        self.issuer = issuer
+        self.leeway = leeway
+        self.id_claim = id_claim
+        self.username_claim = username_claim
+
+    def verify(self, credentials):
+        try:
+            key = self.jwks_client.get_signing_key_from_jwt(credentials).key if self.jwks_client \
+                else self.signing_key
+            claims = self._jwt.decode(credentials, key, algorithms=self.algorithms, audience=self.audience,
+                                      issuer=self.issuer, leeway=self.leeway)
+        except self._jwt.PyJWTError as ex:
+            raise AuthenticationFailed("Invalid token: {}".format(ex))
+        return Principal(id=claims.get(self.id_claim), username=claims.get(self.username_claim, ''), claims=claims)
+
+    def get_cache_timeout(self, principal):
+        # Tokens must not outlive their expiry in the cache
+        expiry = principal.claims.get('exp')
+        if expiry is None:
+            return DEFAULT_TIMEOUT
+        timeout = max(expiry + self.leeway - time.time(), 0)
+        default_timeout = self._principals.default_timeout
+        return timeout if default_timeout is None else min(timeout, default_timeout)
+
+
+class AuthenticationPipeline:
+    """
+    Authenticates the RPCs with the first authenticator finding credentials in their metadata
+    """
+
+    def __init__(self, authenticators):
+        self.authenticators = list(authenticators)
+
+    def authenticate(self, context):
+        """
+        :return: the Principal of the RPC, or an AnonymousUser
+        """
+        metadata = dict(context.invocation_metadata())
+        for authenticator in self.authenticators:
+            principal = authenticator.authenticate(metadata)
+            if principal is not None:
+                return principal
+        return AnonymousUser()
+
+    def get_credentials(self, context):
+        """
+        :return: the raw credentials of the RPC, an empty string if it has none
+        """
+        metadata = dict(context.invocation_metadata())
+        for authenticator in self.authenticators:
+            credentials = authenticator.get_credentials(metadata)
+            if credentials is not None:
+                return credentials
+        return ''
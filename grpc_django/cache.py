@@ -0,0 +1,158 @@
+import hashlib
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+
+class LRUCache:
+    """
+    In-process cache of a bounded number of entries, evicting the least recently used ones.
+    Implements the subset of the Django cache API used by `ResponseCache`.
+    """
+
+    def __init__(self, max_size=1024, timeout=300):
+        self.max_size = max_size
+        self.default_timeout = timeout
+        self._entries = OrderedDict()   # key -> (expiry time or None, value)
+        self._lock = threading.Lock()
+
+    def _get_expiry(self, timeout):
+        timeout = self.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+        return None if timeout is None else time.monotonic() + timeout
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            expiry, value = entry
+            if expiry is not None and expiry <= time.monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT):
+        with self._lock:
+            self._entries[key] = (self._get_expiry(timeout), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT):
+        if self.get(key) is not None:
+            return False
+        self.set(key, value, timeout)
+        return True
+
+    def delete(self, key):
+        with self._lock:
+            return self._entries.pop(key, None) is not None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class ResponseCache:
+    """
+    Caches the serialized responses of views, by view, request and authentication scope. The responses of a view
+    are invalidated whenever an instance of one of its models is saved or deleted, by moving the models on to a
+    new generation which is part of the cache keys.
+    """
+    KEY_PREFIX = 'grpc_django.response'
+
+    def __init__(self, cache=DEFAULT_CACHE_ALIAS, timeout=300):
+        """
+        :param cache: alias of a Django cache, or a cache instance such as `LRUCache`
+        :param timeout: seconds the responses are cached for, None to cache them until invalidated
+        """
+        self.cache = cache
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._models = set()
+
+    def get_cache(self):
+        # Django caches are thread local
+        return caches[self.cache] if isinstance(self.cache, str) else self.cache
+
+    def _get_generation_key(self, model):
+        return '{}.generation.{}'.format(self.KEY_PREFIX, model._meta.label_lower)
+
+    def watch(self, model):
+        """
+        Invalidates the cached responses depending on `model` on its post_save and post_delete signals
+        """
+        if model in self._models:
+            return
+        with self._lock:
+            if model in self._models:
+                return
+            dispatch_uid = '{}.{}'.format(id(self), model._meta.label_lower)
+            post_save.connect(self._invalidate, sender=model, weak=False, dispatch_uid=dispatch_uid)
+            post_delete.connect(self._invalidate, sender=model, weak=False, dispatch_uid=dispatch_uid)
+            self._models.add(model)
+
+    def _invalidate(self, sender, using, **kwargs):
+        # Responses cached before the transaction is committed would still hold the previous values
+        transaction.on_commit(lambda: self.invalidate(sender), using=using)
+
+    def invalidate(self, model):
+        self.get_cache().set(self._get_generation_key(model), uuid.uuid4().hex, None)
+
+    def get_generation(self, cache, model):
+        key = self._get_generation_key(model)
+        generation = cache.get(key)
+        if generation is None:
+            # Never fall back on a previous generation, which may have been evicted after an invalidation
+            generation = uuid.uuid4().hex
+            if not cache.add(key, generation, None):
+                generation = cache.get(key, generation)
+        return generation
+
+    def get_key(self, cache, view, models):
+        digest = hashlib.sha1(view.request.SerializeToString(deterministic=True))
+        digest.update(b'\0' + view.get_cache_scope().encode('utf-8'))
+        generations = '.'.join(self.get_generation(cache, model) for model in models)
+        return '{}.{}.{}.{}.{}'.format(self.KEY_PREFIX, view.__class__.__module__, view.__class__.__qualname__,
+                                       generations, digest.hexdigest())
+
+    def get_or_set(self, view, get_response):
+        """
+        :param view: view the response is for
+        :param get_response: callable returning the response message of the view, on cache misses
+        :return: the response message
+        """
+        models = view.get_cache_models()
+        for model in models:
+            self.watch(model)
+        cache = self.get_cache()
+        key = self.get_key(cache, view, models)
+        data = cache.get(key)
+        if data is not None:
+            with self._lock:
+                self.hits += 1
+            return view.response_proto.FromString(data)
+        with self._lock:
+            self.misses += 1
+        response = get_response()
+        cache.set(key, response.SerializeToString(), self.timeout)
+        return response
+
+    def get_stats(self):
+        """
+        :return: number of cache hits and misses
+        """
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses}
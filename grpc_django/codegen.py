@@ -0,0 +1,232 @@
+import functools
+import hashlib
+import importlib.util
+import json
+import os
+import re
+import time
+from concurrent import futures
+
+# Manifest of the digests of the protos the stubs of a destination folder were generated from
+MANIFEST_NAME = '.grpc_django_stubs.json'
+MANIFEST_VERSION = 1
+
+_IMPORT_RE = re.compile(r'^\s*import\s+(?:public\s+|weak\s+)?"([^"]+)"\s*;', re.MULTILINE)
+
+
+def get_well_known_protos_include():
+    """
+    :return: folder of the well known protos shipped with grpc_tools, None if it is not installed
+    """
+    # Located without importing grpc_tools, which is slow to import and never needed to serve the RPCs
+    spec = importlib.util.find_spec('grpc_tools')
+    if spec is None or not spec.submodule_search_locations:
+        return None
+    return os.path.join(list(spec.submodule_search_locations)[0], '_proto')
+
+
+@functools.lru_cache(maxsize=None)
+def get_generator_version():
+    try:
+        from importlib.metadata import version
+        return version('grpcio-tools')
+    except Exception:
+        return ''
+
+
+def find_imports(source):
+    """
+    :param source: contents of a proto file
+    :return: list of the proto files it imports, relative to the include paths
+    """
+    return _IMPORT_RE.findall(source)
+
+
+def run_protoc(command):
+    """
+    Runs protoc in the current process, used as the task of the worker processes
+    :return: tuple of the exit code and the duration of the invocation in seconds
+    """
+    from grpc_tools import protoc
+
+    started = time.monotonic()
+    code = protoc.main(command)
+    return code, time.monotonic() - started
+
+
+class ProtoTree:
+    """
+    Proto files of an inclusion root, resolved and hashed with their imports the way protoc resolves them
+    """
+
+    def __init__(self, inclusion_root):
+        """
+        :param inclusion_root: folder where the protos reside
+        """
+        self.inclusion_root = inclusion_root
+        self._include_paths = None
+        self._sources = {}
+
+    @property
+    def include_paths(self):
+        if self._include_paths is None:
+            self._include_paths = [self.inclusion_root]
+            well_known_protos_include = get_well_known_protos_include()
+            if well_known_protos_include:
+                self._include_paths.append(well_known_protos_include)
+        return self._include_paths
+
+    def get_proto_name(self, proto_file):
+        """
+        :return: name of the proto file relative to the inclusion root, as protoc resolves it
+        """
+        if os.path.isfile(proto_file):
+            return os.path.relpath(proto_file, self.inclusion_root).replace(os.sep, '/')
+        return proto_file
+
+    def read_source(self, name):
+        """
+        :return: contents of the proto file of that name in the first include path it is found, None if missing
+        """
+        if name not in self._sources:
+            self._sources[name] = None
+            for include_path in self.include_paths:
+                path = os.path.join(include_path, name)
+                if os.path.isfile(path):
+                    with open(path, 'rb') as f:
+                        self._sources[name] = f.read()
+                    break
+        return self._sources[name]
+
+    def get_digest(self, name):
+        """
+        :return: digest of the proto file and of all the protos it imports, directly or not
+        """
+        digest = hashlib.sha256(get_generator_version().encode())
+        seen, pending = set(), [name]
+        while pending:
+            current = pending.pop()
+            if current in seen:
+                continue
+            seen.add(current)
+            source = self.read_source(current)
+            digest.update(current.encode() + b'\0')
+            if source is None:
+                digest.update(b'\0missing\0')
+                continue
+            digest.update(hashlib.sha256(source).digest())
+            pending.extend(find_imports(source.decode('utf-8', 'replace')))
+        return digest.hexdigest()
+
+    def get_protoc_command(self, proto_files, *options):
+        return ['grpc_tools.protoc'] + [
+            '--proto_path={}'.format(include_path) for include_path in self.include_paths
+        ] + list(options) + list(proto_files)
+
+
+class StubGenerator(ProtoTree):
+    """
+    Generates the python stubs of proto files incrementally: the digest of each proto, and of all the protos it
+    imports, is recorded in a manifest of the destination folder, and the protos whose digest did not change since
+    their stubs were generated are skipped. The others are split into batches compiled by a single protoc
+    invocation each, run in parallel across a pool of processes.
+    """
+
+    def __init__(self, inclusion_root, destination_path='./', jobs=None, force=False, stdout=None, verbosity=1):
+        """
+        :param inclusion_root: folder where the protos reside
+        :param destination_path: folder of the generated stubs
+        :param jobs: maximum number of protoc invocations run in parallel, defaults to the number of CPUs
+        :param force: whether to generate the stubs of all the protos, changed or not
+        :param stdout: stream the timings are reported to, if any
+        """
+        super().__init__(inclusion_root)
+        self.destination_path = destination_path
+        self.jobs = jobs or os.cpu_count() or 1
+        self.force = force
+        self.stdout = stdout
+        self.verbosity = verbosity
+
+    @property
+    def manifest_path(self):
+        return os.path.join(self.destination_path, MANIFEST_NAME)
+
+    def write(self, message, verbosity=1):
+        if self.stdout and self.verbosity >= verbosity:
+            self.stdout.write(message)
+
+    def get_outputs(self, name):
+        module = os.path.join(self.destination_path, os.path.splitext(name)[0])
+        return [module + '_pb2.py', module + '_pb2_grpc.py']
+
+    def load_manifest(self):
+        try:
+            with open(self.manifest_path) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if manifest.get('version') != MANIFEST_VERSION:
+            return {}
+        return manifest.get('protos', {})
+
+    def save_manifest(self, digests):
+        os.makedirs(self.destination_path, exist_ok=True)
+        with open(self.manifest_path, 'w') as f:
+            json.dump({'version': MANIFEST_VERSION, 'protos': digests}, f, indent=2, sort_keys=True)
+
+    def get_command(self, proto_files):
+        return self.get_protoc_command(proto_files, '--python_out={}'.format(self.destination_path),
+                                       '--grpc_python_out={}'.format(self.destination_path))
+
+    def get_batches(self, proto_files):
+        """
+        Splits the proto files into at most as many batches as there are jobs, each compiled by one invocation
+        """
+        count = min(self.jobs, len(proto_files))
+        return [proto_files[i::count] for i in range(count)] if count else []
+
+    def compile(self, batches):
+        """
+        :return: list of (batch, exit code, duration) tuples
+        """
+        commands = [self.get_command(batch) for batch in batches]
+        if len(batches) == 1:
+            return [(batches[0],) + run_protoc(commands[0])]
+        with futures.ProcessPoolExecutor(max_workers=len(batches)) as executor:
+            return [(batch,) + result for batch, result in zip(batches, executor.map(run_protoc, commands))]
+
+    def generate(self, proto_files):
+        """
+        :param proto_files: paths of the proto files, or their names relative to the inclusion root
+        :return: tuple of the lists of the generated, skipped and failed proto files
+        """
+        started = time.monotonic()
+        manifest = self.load_manifest()
+        digests, changed, skipped = {}, [], []
+        for proto_file in dict.fromkeys(proto_files):
+            name = self.get_proto_name(proto_file)
+            digests[proto_file] = self.get_digest(name)
+            unchanged = manifest.get(name) == digests[proto_file] and all(map(os.path.isfile, self.get_outputs(name)))
+            if unchanged and not self.force:
+                skipped.append(proto_file)
+            else:
+                changed.append(proto_file)
+
+        generated, failed = [], []
+        batches = self.get_batches(changed)
+        if batches:
+            os.makedirs(self.destination_path, exist_ok=True)
+        for batch, code, duration in self.compile(batches) if batches else ():
+            self.write("Compiled {} protos in {:.0f} ms{}\n".format(
+                len(batch), duration * 1e3, '' if code == 0 else ' (failed)'), verbosity=2)
+            if code == 0:
+                generated.extend(batch)
+                manifest.update((self.get_proto_name(proto_file), digests[proto_file]) for proto_file in batch)
+            else:
+                failed.extend(batch)
+        if generated:
+            self.save_manifest(manifest)
+
+        self.write("Generated the stubs of {} protos in {} protoc invocations, skipped {} unchanged protos, "
+                   "in {:.2f} s\n".format(len(generated), len(batches), len(skipped), time.monotonic() - started))
+        return generated, skipped, failed
@@ -0,0 +1,163 @@
+import operator
+
+from django.core.exceptions import FieldDoesNotExist
+from google.protobuf.descriptor import FieldDescriptor
+
+from .protobuf_to_dict import datetime_to_timestamp
+from .protos import GetMessageClass
+
+# Model fields whose values are already of the python type of the proto fields
+_STRING_FIELDS = frozenset(['CharField', 'TextField', 'SlugField', 'EmailField', 'URLField', 'FilePathField'])
+_FLOAT_TYPES = frozenset([FieldDescriptor.TYPE_DOUBLE, FieldDescriptor.TYPE_FLOAT])
+
+# Maximum number of converters restricted to field masks cached per converter
+MAX_MASKED_CONVERTERS = 256
+
+
+def _to_str(value):
+    return value if type(value) is str else str(value)
+
+
+def _pks(value):
+    # Related managers of the repeated fields of primary keys, iterated from the prefetched objects if any
+    return [obj.pk for obj in value.all()] if hasattr(value, 'all') else value
+
+
+def _get_model_field(model, path):
+    """
+    :return: model field at the end of a path of attributes, None if not a model field
+    """
+    field = None
+    for attr in path.split('.'):
+        if model is None:
+            return None
+        try:
+            field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            return None
+        model = field.related_model
+    return field
+
+
+def _mask_field_mapping(field_mapping, tree):
+    if not isinstance(field_mapping, dict):
+        field_mapping = {name: name for name in field_mapping}
+    masked = {}
+    for name, subtree in tree.items():
+        if name not in field_mapping:
+            continue
+        source = field_mapping[name]
+        if subtree is not None and isinstance(source, (dict, list, tuple)):
+            source = _mask_field_mapping(source, subtree)
+        masked[name] = source
+    return masked
+
+
+def _freeze(tree):
+    return tuple(sorted((name, _freeze(subtree) if subtree is not None else None) for name, subtree in tree.items()))
+
+
+class ModelToProtobufConverter:
+    """
+    Builds messages straight from model instances, or from `values()` rows, skipping the serializer and the
+    intermediate dictionary: the getter and the conversion of each field of the message are compiled once from a
+    mapping of the fields to the attributes of the objects they are read from.
+    """
+
+    def __init__(self, message_class, field_mapping, model=None):
+        """
+        :param message_class: class of the messages
+        :param field_mapping: list of the names of the fields of the message, read from the attributes of the same
+            name, or dictionary of the names of the fields to the path of the attribute they are read from, e.g.
+            'author.name' (read from the 'author__name' key of the rows), to a function of the object, or to the
+            field mapping of their nested message
+        :param model: model of the objects, the conversions are selected by the type of its fields
+        """
+        if not isinstance(field_mapping, dict):
+            field_mapping = {name: name for name in field_mapping}
+        self.message_class = message_class
+        self.field_mapping = field_mapping
+        self.model = model
+        self._object_fields, self._row_fields = self._compile()
+        self._masked = {}
+
+    def _compile(self):
+        descriptor = self.message_class.DESCRIPTOR
+        object_fields, row_fields = [], []
+        for name, source in self.field_mapping.items():
+            field = descriptor.fields_by_name.get(name)
+            if field is None:
+                raise ValueError("{} does not have a field called {}".format(descriptor.full_name, name))
+            if callable(source):
+                get_attr = get_item = source
+                model_field = None
+            elif isinstance(source, (dict, list, tuple)):
+                # Nested message, read from the related object of the same name
+                get_attr, get_item = operator.attrgetter(name), operator.itemgetter(name)
+                model_field = _get_model_field(self.model, name)
+            else:
+                get_attr, get_item = operator.attrgetter(source), operator.itemgetter(source.replace('.', '__'))
+                model_field = _get_model_field(self.model, source)
+            adapt = self._compile_adapter(field, source, model_field)
+            object_fields.append((name, get_attr, adapt))
+            row_fields.append((name, get_item, adapt))
+        return tuple(object_fields), tuple(row_fields)
+
+    def _compile_adapter(self, field, source, model_field):
+        """
+        :return: function converting the values of the field, None if they need no conversion
+        """
+        internal_type = model_field.get_internal_type() if model_field is not None else None
+        repeated = field.label == FieldDescriptor.LABEL_REPEATED
+        if field.type == FieldDescriptor.TYPE_MESSAGE:
+            if isinstance(source, (dict, list, tuple)):
+                nested = ModelToProtobufConverter(GetMessageClass(field.message_type), source,
+                                                  getattr(model_field, 'related_model', None))
+                if repeated:
+                    return lambda value: [nested(obj) for obj in (value.all() if hasattr(value, 'all') else value)]
+                return nested
+            if field.message_type.full_name == 'google.protobuf.Timestamp':
+                return datetime_to_timestamp
+            raise ValueError("The nested message field {} requires a field mapping".format(field.full_name))
+        if repeated:
+            return _pks
+        if field.type == FieldDescriptor.TYPE_STRING:
+            return None if internal_type in _STRING_FIELDS else _to_str
+        if field.type in _FLOAT_TYPES and internal_type not in ('FloatField', 'IntegerField', 'BigIntegerField'):
+            # e.g. decimals
+            return float
+        if field.type == FieldDescriptor.TYPE_BYTES:
+            # Binary fields are read as memoryviews
+            return bytes
+        if field.type == FieldDescriptor.TYPE_ENUM:
+            values = field.enum_type.values_by_name
+            return lambda value: values[value].number if isinstance(value, str) else value
+        return None
+
+    def __call__(self, obj):
+        """
+        :param obj: model instance, or dictionary of a `values()` row
+        :return: message
+        """
+        kwargs = {}
+        for name, get, adapt in (self._row_fields if isinstance(obj, dict) else self._object_fields):
+            value = get(obj)
+            if value is not None and adapt is not None:
+                value = adapt(value)
+            kwargs[name] = value
+        return self.message_class(**kwargs)
+
+    def mask(self, tree):
+        """
+        :param tree: field mask tree, see `get_field_mask_tree`
+        :return: converter of only the masked fields
+        """
+        key = _freeze(tree)
+        converter = self._masked.get(key)
+        if converter is None:
+            converter = ModelToProtobufConverter(
+                self.message_class, _mask_field_mapping(self.field_mapping, tree), self.model)
+            if len(self._masked) >= MAX_MASKED_CONVERTERS:
+                self._masked.clear()
+            self._masked[key] = converter
+        return converter
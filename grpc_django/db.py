@@ -0,0 +1,136 @@
+import threading
+from contextlib import contextmanager
+
+from django.core.signals import request_finished, request_started
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from .exceptions import ConnectionPoolExhausted
+
+
+class ConnectionPool:
+    """
+    Bounded pool of database connections shared by the worker threads. For the duration of an RPC, the thread
+    it is processed on checks out a connection of each pooled database instead of holding on to its own
+    thread local ones, so the number of connections does not grow with the number of worker threads.
+    Connections are only opened once used. The pool manages their lifetime rather than the request signals:
+    they are checked on checkout, and on release closed if unusable or older than `CONN_MAX_AGE`, if it is set
+    (the default of 0 would close them after every RPC).
+    """
+
+    def __init__(self, max_connections, timeout=30, health_checks=True, databases=(DEFAULT_DB_ALIAS,)):
+        """
+        :param max_connections: maximum number of connections to each database, i.e. of RPCs processed concurrently
+        :param timeout: seconds to wait for a free connection, before failing the RPC with RESOURCE_EXHAUSTED
+        :param health_checks: whether to check a connection still works before handing it out
+        :param databases: aliases of the pooled databases
+        """
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.health_checks = health_checks
+        self.databases = tuple(databases)
+
+        self._semaphore = threading.BoundedSemaphore(max_connections)
+        self._lock = threading.Lock()
+        # Idle connections of each database, the most recently used one is reused first
+        self._idle = {alias: [] for alias in self.databases}
+
+    def _create_connection(self, alias):
+        connection = connections.create_connection(alias)
+        # The connection is used by whichever worker thread checks it out
+        connection.inc_thread_sharing()
+        return connection
+
+    def acquire(self):
+        """
+        Checks out a connection of each pooled database for the current thread
+        """
+        if not self._semaphore.acquire(timeout=self.timeout):
+            raise ConnectionPoolExhausted(
+                "No database connection available after {}s".format(self.timeout))
+        checked_out = []
+        try:
+            for alias in self.databases:
+                with self._lock:
+                    idle = self._idle[alias]
+                    connection = idle.pop() if idle else None
+                if connection is None:
+                    connection = self._create_connection(alias)
+                elif self.health_checks and connection.connection is not None and not connection.is_usable():
+                    connection.close()
+                # Reset like the connections of the thread are at the start of a request
+                connection.queries_log.clear()
+                connections[alias] = connection
+                checked_out.append(alias)
+        except BaseException:
+            # Give back the connections of the databases checked out so far, the pool would shrink otherwise
+            for alias in checked_out:
+                connection = connections[alias]
+                del connections[alias]
+                with self._lock:
+                    self._idle[alias].append(connection)
+            self._semaphore.release()
+            raise
+
+    def release(self):
+        """
+        Returns the connections checked out by the current thread to the pool
+        """
+        for alias in self.databases:
+            connection = connections[alias]
+            del connections[alias]
+            if connection.settings_dict['CONN_MAX_AGE'] != 0:
+                connection.close_if_unusable_or_obsolete()
+            with self._lock:
+                self._idle[alias].append(connection)
+        self._semaphore.release()
+
+    def fill(self):
+        """
+        Opens connections to each pooled database up to the maximum number of connections, e.g. before serving
+        """
+        for alias in self.databases:
+            with self._lock:
+                missing = self.max_connections - len(self._idle[alias])
+            opened = []
+            for _ in range(missing):
+                connection = self._create_connection(alias)
+                connection.ensure_connection()
+                opened.append(connection)
+            with self._lock:
+                self._idle[alias].extend(opened)
+
+    def close_all(self):
+        """
+        Closes the idle connections
+        """
+        with self._lock:
+            idle_connections = [connection for idle in self._idle.values() for connection in idle]
+            for idle in self._idle.values():
+                idle.clear()
+        for connection in idle_connections:
+            connection.close()
+            connection.dec_thread_sharing()
+
+
+@contextmanager
+def request_scope(sender, context, connection_pool=None):
+    """
+    Wraps the processing of an RPC like Django does for HTTP requests, sending the `request_started` and
+    `request_finished` signals which reset the queries log and close the stale database connections.
+    :param connection_pool: ConnectionPool to check out the database connections of the RPC from, they are checked
+        out within the signals so that only the pool closes them
+    """
+    request_started.send(sender=sender)
+    try:
+        if connection_pool:
+            try:
+                connection_pool.acquire()
+            except ConnectionPoolExhausted as ex:
+                context.abort(ex.status_code, str(ex))
+        try:
+            yield
+        finally:
+            if connection_pool:
+                connection_pool.release()
+    finally:
+        request_finished.send(sender=sender)
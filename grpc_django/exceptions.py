@@ -1,8 +1,14 @@
+import logging
+import random
+import threading
+import time
 import uuid
 
 import grpc
 from django.core.exceptions import ObjectDoesNotExist, MultipleObjectsReturned, ValidationError as DjangoValidationError
 
+logger = logging.getLogger('grpc_django')
+
 
 class GrpcServerStartError(Exception):
     """
@@ -18,7 +24,7 @@ class GrpcException(Exception):
     status_code = grpc.StatusCode.INTERNAL
     default_message = "A server error occurred."
 
-    def __init__(self, message):
+    def __init__(self, message=None):
         if message is None:
             self.message = self.default_message
         else:
@@ -53,25 +59,119 @@ class ValidationError(GrpcException):
     default_message = "Invalid input."
 
 
+class ConnectionPoolExhausted(GrpcException):
+    status_code = grpc.StatusCode.RESOURCE_EXHAUSTED
+    default_message = "No database connection available."
+
+
+class RateLimiter(object):
+    """
+    Token bucket limiting the rate of the logged errors
+    """
+
+    def __init__(self, rate, burst):
+        """
+        :param rate: number of events allowed per second
+        :param burst: number of events allowed at once
+        """
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.suppressed = 0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """
+        :return: number of events suppressed since the last allowed one, None if this one is suppressed
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < 1:
+                self.suppressed += 1
+                return None
+            self.tokens -= 1
+            suppressed, self.suppressed = self.suppressed, 0
+            return suppressed
+
+
 class ExceptionHandler(object):
+    # Handled exceptions, their subclasses included, mapped to their status code and the function of their message
     _handlers = {
         ObjectDoesNotExist: (grpc.StatusCode.NOT_FOUND, str),
         MultipleObjectsReturned: (grpc.StatusCode.ALREADY_EXISTS, str),
         DjangoValidationError: (grpc.StatusCode.FAILED_PRECONDITION, str),
     }
-
-    def __init__(self, context):
+    # Fraction of the handled exceptions, e.g. NOT_FOUND, logged at the DEBUG level
+    expected_sample_rate = 0.01
+    # The unhandled exceptions are logged with their traceback, at most 10 per second
+    unexpected_limiter = RateLimiter(rate=10, burst=20)
+
+    def __init__(self, context, view=None):
+        """
+        :param context: context of the RPC
+        :param view: name of the view the exception was raised by, logged with it
+        """
         self.context = context
-
-    def __call__(self, exc, stack):
-        print(stack)
-        if issubclass(exc.__class__, GrpcException):
-            status_code, message = exc.status_code, str(exc)
-        elif self._handlers.get(exc.__class__):
-            status_code, message = self._handlers[exc.__class__][0], self._handlers[exc.__class__][1](exc)
+        self.view = view
+
+    @classmethod
+    def resolve(cls, exc_class):
+        """
+        Resolves the handler of the closest class of the MRO of an exception, cached per exception class
+        :return: tuple of the status code, None for the one of the GrpcException, and the function of the message;
+            None if the exception is not handled
+        """
+        resolved = cls.__dict__.get('_resolved')
+        if resolved is None:
+            resolved = cls._resolved = {}
+        try:
+            return resolved[exc_class]
+        except KeyError:
+            pass
+        handler = None
+        for base in exc_class.__mro__:
+            if base is GrpcException:
+                handler = (None, str)
+                break
+            if base in cls._handlers:
+                handler = cls._handlers[base]
+                break
+        resolved[exc_class] = handler
+        return handler
+
+    def __call__(self, exc, stack=None):
+        """
+        :param exc: exception raised by the view
+        :param stack: unused, the traceback is only formatted when the exception is logged
+        :return: context of the RPC
+        """
+        handler = self.resolve(exc.__class__)
+        if handler is not None:
+            status_code, get_message = handler
+            if status_code is None:
+                status_code = exc.status_code
+            message = get_message(exc)
+            if self.expected_sample_rate and logger.isEnabledFor(logging.DEBUG) and \
+                    random.random() < self.expected_sample_rate:
+                logger.debug("%s returned %s: %s", self.view, status_code.name, message, extra={
+                    'grpc_view': self.view, 'grpc_code': status_code.name, 'exception': exc.__class__.__name__,
+                })
         else:
             status_code = grpc.StatusCode.UNKNOWN
-            message = "{}; ErrorId: {}".format(exc, uuid.uuid4())
+            error_id = str(uuid.uuid4())
+            message = "{}; ErrorId: {}".format(exc, error_id)
+            if logger.isEnabledFor(logging.ERROR):
+                suppressed = self.unexpected_limiter.acquire()
+                if suppressed is not None:
+                    logger.error("%s failed with %s; ErrorId: %s", self.view, exc.__class__.__name__, error_id,
+                                 exc_info=(exc.__class__, exc, exc.__traceback__), extra={
+                                     'grpc_view': self.view, 'grpc_code': status_code.name,
+                                     'exception': exc.__class__.__name__, 'error_id': error_id,
+                                     'suppressed': suppressed,
+                                 })
         self.context.set_code(status_code)
         self.context.set_details(message)
         return self.context
@@ -0,0 +1,47 @@
+from .exceptions import InvalidArgument
+
+
+def get_field_mask_tree(paths, descriptor):
+    """
+    Parses the paths of a `google.protobuf.FieldMask` relative to a message, e.g. ['id', 'author.name']
+    :param descriptor: descriptor of the message
+    :return: dictionary of the masked fields by name, to the dictionary of the masked fields of their nested message
+        or None for the whole field, e.g. {'id': None, 'author': {'name': None}}
+    """
+    tree = {}
+    for path in paths:
+        node, message = tree, descriptor
+        names = path.split('.')
+        for depth, name in enumerate(names):
+            field = message.fields_by_name.get(name) if message is not None else None
+            if field is None:
+                raise InvalidArgument("Invalid field mask path {}".format(path))
+            if depth == len(names) - 1:
+                node[name] = None
+            elif node.get(name, {}) is None:
+                # The whole field is already masked
+                break
+            else:
+                node = node.setdefault(name, {})
+                message = field.message_type
+    return tree
+
+
+def mask_values(values, tree):
+    """
+    :param values: dictionary of a message
+    :param tree: field mask tree, see `get_field_mask_tree`
+    :return: dictionary of the masked fields of the message
+    """
+    masked = {}
+    for name, subtree in tree.items():
+        if name not in values:
+            continue
+        value = values[name]
+        if subtree is not None:
+            if isinstance(value, dict):
+                value = mask_values(value, subtree)
+            elif isinstance(value, (list, tuple)):
+                value = [mask_values(item, subtree) if isinstance(item, dict) else item for item in value]
+        masked[name] = value
+    return masked
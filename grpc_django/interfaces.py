@@ -15,19 +15,170 @@ class IService:
             proto_path: str,
             rpc_conf: str,
             stub_conf: str = None,
+            load_proto: bool = False,
     ):
         self.name = name
         self.package_name = package_name
         self.proto_path = proto_path
         self.rpc_conf = rpc_conf
         self.stub_conf = stub_conf if stub_conf else self._DEFAULT_STUB_MODULE
+        # Builds the service from its proto file at startup, instead of from the stubs generated by protoc
+        if type(load_proto) != bool:
+            raise TypeError("Invalid load_proto provided, should be bool")
+        self.load_proto = load_proto
+
+
+class IServerOptions:
+    """
+    Performance tuning options of the gRPC server, passed on as channel arguments to `grpc.server`
+    """
+    # Channel argument of each option
+    CHANNEL_ARGS = {
+        'max_receive_message_length': 'grpc.max_receive_message_length',
+        'max_send_message_length': 'grpc.max_send_message_length',
+        'max_concurrent_streams': 'grpc.max_concurrent_streams',
+        'keepalive_time_ms': 'grpc.keepalive_time_ms',
+        'keepalive_timeout_ms': 'grpc.keepalive_timeout_ms',
+        'keepalive_permit_without_calls': 'grpc.keepalive_permit_without_calls',
+        'http2_min_recv_ping_interval_without_data_ms': 'grpc.http2.min_ping_interval_without_data_ms',
+        'http2_max_pings_without_data': 'grpc.http2.max_pings_without_data',
+        'http2_bdp_probe': 'grpc.http2.bdp_probe',
+    }
+    BOOLEAN_OPTIONS = ('keepalive_permit_without_calls', 'http2_bdp_probe')
+
+    def __init__(
+            self,
+            max_receive_message_length: int = None,
+            max_send_message_length: int = None,
+            max_concurrent_streams: int = None,
+            keepalive_time_ms: int = None,
+            keepalive_timeout_ms: int = None,
+            keepalive_permit_without_calls: bool = None,
+            http2_min_recv_ping_interval_without_data_ms: int = None,
+            http2_max_pings_without_data: int = None,
+            http2_bdp_probe: bool = None,
+            maximum_concurrent_rpcs: int = None,
+            extra_channel_args: dict = None,
+    ):
+        values = locals()
+        for name in self.CHANNEL_ARGS:
+            value = values[name]
+            if value is not None:
+                if name in self.BOOLEAN_OPTIONS:
+                    if type(value) != bool:
+                        raise TypeError("Invalid {} provided, should be bool".format(name))
+                elif type(value) != int:
+                    raise TypeError("Invalid {} provided, should be int".format(name))
+                # Message lengths accept -1 for unlimited
+                elif value < (-1 if name.endswith('message_length') else 0):
+                    raise ValueError("Invalid {} provided, should not be negative".format(name))
+            setattr(self, name, value)
+
+        # Number of RPCs processed concurrently, the server responds RESOURCE_EXHAUSTED to the ones over this limit
+        # instead of queueing them up for the worker threads
+        if maximum_concurrent_rpcs is not None:
+            if type(maximum_concurrent_rpcs) != int:
+                raise TypeError("Invalid maximum_concurrent_rpcs provided, should be int")
+            if maximum_concurrent_rpcs < 1:
+                raise ValueError("Invalid maximum_concurrent_rpcs provided, should be positive")
+        self.maximum_concurrent_rpcs = maximum_concurrent_rpcs
+
+        # Any other channel arguments, by their name e.g. {'grpc.max_connection_idle_ms': 60000}
+        if extra_channel_args is not None and not isinstance(extra_channel_args, dict):
+            raise TypeError("Invalid extra_channel_args provided, should be dict")
+        self.extra_channel_args = extra_channel_args if extra_channel_args else {}
+
+    def get_channel_args(self):
+        """
+        :return: list of (channel argument, value) tuples of the provided options
+        """
+        channel_args = [
+            (arg, int(getattr(self, name))) for name, arg in self.CHANNEL_ARGS.items()
+            if getattr(self, name) is not None
+        ]
+        return channel_args + list(self.extra_channel_args.items())
+
+
+class IConnectionPool:
+    """
+    Bounded pool of database connections shared by the worker threads of the server
+    """
+    DEFAULT_TIMEOUT = 30
+
+    def __init__(
+            self,
+            max_connections: int,
+            timeout: float = None,
+            health_checks: bool = True,
+            databases: List[str] = None,
+    ):
+        if type(max_connections) != int:
+            raise TypeError("Invalid max_connections provided, should be int")
+        if max_connections < 1:
+            raise ValueError("Invalid max_connections provided, should be positive")
+        self.max_connections = max_connections
+
+        # Seconds an RPC waits for a free connection, before failing with RESOURCE_EXHAUSTED
+        if timeout is not None and type(timeout) not in (int, float):
+            raise TypeError("Invalid timeout provided, should be int or float")
+        self.timeout = timeout if timeout is not None else self.DEFAULT_TIMEOUT
+
+        if type(health_checks) != bool:
+            raise TypeError("Invalid health_checks provided, should be bool")
+        self.health_checks = health_checks
+
+        # Aliases of the pooled databases
+        if databases is not None and not isinstance(databases, (list, tuple)):
+            raise TypeError("Invalid databases provided, should be list")
+        self.databases = tuple(databases) if databases else ('default',)
+
+
+class IWarmup:
+    """
+    Warmup of the server before it starts listening
+    """
+
+    def __init__(
+            self,
+            open_connections: bool = True,
+            requests: dict = None,
+            timeout: float = None,
+    ):
+        # Opens the persistent database connections (CONN_MAX_AGE) of the worker threads, and the pooled ones
+        if type(open_connections) != bool:
+            raise TypeError("Invalid open_connections provided, should be bool")
+        self.open_connections = open_connections
+
+        # Canned requests replayed to the RPCs, as messages or dictionaries by method name,
+        # e.g. {'/package.Service/GetUser': [{'id': 1}]}
+        if requests is not None and not isinstance(requests, dict):
+            raise TypeError("Invalid requests provided, should be dict")
+        self.requests = requests if requests else {}
+
+        # Seconds to wait for each warmup stage, unlimited if not set
+        if timeout is not None and type(timeout) not in (int, float):
+            raise TypeError("Invalid timeout provided, should be int or float")
+        self.timeout = timeout
 
 
 class IServer:
     DEFAULT_SERVER_PORT = 55000
     DEFAULT_WORKER_COUNT = 1
+    DEFAULT_PROCESS_COUNT = 1
+    DEFAULT_SHUTDOWN_GRACE_PERIOD = 10
 
-    def __init__(self, port: int = None, num_of_workers: int = None):
+    def __init__(
+            self,
+            port: int = None,
+            num_of_workers: int = None,
+            use_asyncio: bool = False,
+            num_of_processes: int = None,
+            shutdown_grace_period: float = None,
+            options: IServerOptions = None,
+            metrics_port: int = None,
+            connection_pool: IConnectionPool = None,
+            warmup: IWarmup = None,
+    ):
         if port and type(port) != int:
             raise TypeError("Invalid port provided, should be int")
         self.port = port if port else self.DEFAULT_SERVER_PORT
@@ -36,6 +187,44 @@ class IServer:
             raise TypeError("Invalid num_of_workers provided, should be int")
         self.num_of_workers = num_of_workers if num_of_workers else self.DEFAULT_WORKER_COUNT
 
+        # Run the server on asyncio (grpc.aio), the worker threads then only serve the synchronous views
+        if type(use_asyncio) != bool:
+            raise TypeError("Invalid use_asyncio provided, should be bool")
+        self.use_asyncio = use_asyncio
+
+        # Number of server processes sharing the port, each one with its own pool of worker threads
+        if num_of_processes and type(num_of_processes) != int:
+            raise TypeError("Invalid num_of_processes provided, should be int")
+        self.num_of_processes = num_of_processes if num_of_processes else self.DEFAULT_PROCESS_COUNT
+
+        # Seconds the in-flight RPCs are given to finish on shutdown, before being cancelled
+        if shutdown_grace_period is not None and type(shutdown_grace_period) not in (int, float):
+            raise TypeError("Invalid shutdown_grace_period provided, should be int or float")
+        self.shutdown_grace_period = shutdown_grace_period if shutdown_grace_period is not None \
+            else self.DEFAULT_SHUTDOWN_GRACE_PERIOD
+
+        if options is not None and not isinstance(options, IServerOptions):
+            raise TypeError("Invalid options provided, should be an instance of IServerOptions")
+        self.options = options if options else IServerOptions()
+
+        # Port of the HTTP endpoint exposing the metrics of the RPCs in the Prometheus format, disabled if not set.
+        # Only supported by the threaded server, each process of a multi-process server listens on the next port
+        # after the previous one.
+        if metrics_port is not None and type(metrics_port) != int:
+            raise TypeError("Invalid metrics_port provided, should be int")
+        self.metrics_port = metrics_port
+
+        # Shares a bounded pool of database connections between the worker threads, instead of each one of them
+        # holding on to its own connections
+        if connection_pool is not None and not isinstance(connection_pool, IConnectionPool):
+            raise TypeError("Invalid connection_pool provided, should be an instance of IConnectionPool")
+        self.connection_pool = connection_pool
+
+        # Warms the server up before it starts listening, disabled if not set
+        if warmup is not None and not isinstance(warmup, IWarmup):
+            raise TypeError("Invalid warmup provided, should be an instance of IWarmup")
+        self.warmup = warmup
+
 
 class ISettings:
     DEFAULT_AUTHENTICATION_KEY = 'user'
@@ -46,12 +235,23 @@ class ISettings:
             services: List[IService],
             server: IServer = None,
             auth_user_key: str = None,
-            stubs: str = None
+            stubs: str = None,
+            authenticators: list = None,
+            descriptor_cache: str = None,
     ):
         self.services = services
         self.server = server if server else IServer()
         self.auth_user_key = auth_user_key if auth_user_key else self.DEFAULT_AUTHENTICATION_KEY
+        # Authenticators of the RPCs, tried in order, defaults to the JSON user of the `auth_user_key` metadata
+        if authenticators is not None and not isinstance(authenticators, (list, tuple)):
+            raise TypeError("Invalid authenticators provided, should be list")
+        self.authenticators = authenticators
         self.stubs = stubs if stubs is not None else self.DEFAULT_CODEGEN_LOCATION
+        # Folder the descriptors of the protos of the services loaded at startup are cached in, defaults to a
+        # folder of the temporary directory
+        if descriptor_cache is not None and not isinstance(descriptor_cache, str):
+            raise TypeError("Invalid descriptor_cache provided, should be str")
+        self.descriptor_cache = descriptor_cache
 
 
-__all__ = ['IService', 'ISettings', 'IServer', 'rpc']
+__all__ = ['IConnectionPool', 'IService', 'ISettings', 'IServer', 'IServerOptions', 'IWarmup', 'rpc']
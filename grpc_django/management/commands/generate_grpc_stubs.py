@@ -1,10 +1,10 @@
-import pkg_resources
-from django.core.management import BaseCommand
-from grpc_tools import protoc
+from django.core.management import BaseCommand, CommandError
+
+from grpc_django.codegen import StubGenerator
 
 
 class Command(BaseCommand):
-    help = "Generates server and client stubs using grpc_tools"
+    help = "Generates server and client stubs using grpc_tools, only of the protos which changed since last generated"
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -19,6 +19,14 @@ class Command(BaseCommand):
             "--dest", dest="destination_path",
             help="Destination path of the generated stub outputs"
         )
+        parser.add_argument(
+            "--jobs", dest="jobs", type=int,
+            help="Maximum number of protoc invocations run in parallel, defaults to the number of CPUs"
+        )
+        parser.add_argument(
+            "--force", dest="force", action="store_true",
+            help="Generate the stubs of all the proto files, even if they did not change"
+        )
 
     def handle(self, *args, **options):
         proto_files = options.get("proto_files")[0].split(",")
@@ -27,15 +35,8 @@ class Command(BaseCommand):
             destination_path = options["destination_path"]
         else:
             destination_path = "./"
-        well_known_protos_include = pkg_resources.resource_filename(
-            'grpc_tools', '_proto')
-        for proto_file in proto_files:
-            command = [
-                "grpc_tools.protoc",
-                "--proto_path={}".format(inclusion_root),
-                "--proto_path={}".format(well_known_protos_include),
-                "--python_out={}".format(destination_path),
-                "--grpc_python_out={}".format(destination_path),
-            ] + [proto_file]
-            if protoc.main(command) != 0:
-                self.stderr.write("Failed to generate {}".format(proto_file))
+        generator = StubGenerator(inclusion_root, destination_path, jobs=options["jobs"], force=options["force"],
+                                  stdout=self.stdout, verbosity=options["verbosity"])
+        _, _, failed = generator.generate(proto_files)
+        if failed:
+            raise CommandError("Failed to generate {}".format(", ".join(failed)))
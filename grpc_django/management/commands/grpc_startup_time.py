@@ -0,0 +1,96 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+from django.conf import settings as django_settings
+from django.core.management import BaseCommand, CommandError
+
+# Starts a server on a free port in a fresh interpreter, then reports when it was ready and serving
+STARTUP_SCRIPT = """
+import io, json, sys, time
+import django
+django.setup()
+ready = time.time()
+from grpc_django.server import init_server
+server = init_server('127.0.0.1', 0, stdout=io.StringIO())
+server.start()
+serving = time.time()
+print(json.dumps({'ready': ready, 'serving': serving, 'modules': sorted(sys.modules)}))
+server.stop(None)
+"""
+
+
+def parse_import_times(output):
+    """
+    Parses the report of `python -X importtime`
+    :return: list of (module, depth, self time, cumulative time) tuples, in microseconds
+    """
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        self_time, cumulative_time, name = line[len('import time:'):].split('|')
+        if not self_time.strip().isdigit():
+            # Header of the report
+            continue
+        name = name[1:]
+        module = name.lstrip()
+        imports.append((module, (len(name) - len(module)) // 2, int(self_time), int(cumulative_time)))
+    return imports
+
+
+class Command(BaseCommand):
+    help = "Measures the time to serving of the GRPC server from a cold start, and reports the slowest imports"
+
+    # Modules only needed to generate the stubs, which starting the server should never import
+    CODEGEN_MODULES = ('grpc_tools.protoc', 'pkg_resources')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--top", dest="top", type=int, default=15,
+            help="Number of slowest top level imports to report"
+        )
+        parser.add_argument(
+            "--json", dest="json", action="store_true",
+            help="Output the report as JSON, e.g. to track it over time"
+        )
+
+    def measure(self):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=django_settings.SETTINGS_MODULE,
+                   PYTHONPATH=os.pathsep.join(path for path in sys.path if path))
+        started = time.time()
+        process = subprocess.run([sys.executable, '-X', 'importtime', '-c', STARTUP_SCRIPT], env=env,
+                                 stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+        if process.returncode != 0:
+            errors = [line for line in process.stderr.splitlines() if not line.startswith('import time:')]
+            raise CommandError("Failed to start the server:\n{}".format('\n'.join(errors)))
+        result = json.loads(process.stdout.splitlines()[-1])
+        imports = parse_import_times(process.stderr)
+        return {
+            'time_to_serving': result['serving'] - started,
+            'time_to_ready': result['ready'] - started,
+            'import_time': sum(self_time for _, _, self_time, _ in imports) / 1e6,
+            'slowest_imports': [
+                (module, cumulative_time / 1e6) for module, depth, _, cumulative_time in
+                sorted(imports, key=lambda x: x[3], reverse=True) if depth == 0
+            ],
+            'codegen_modules': [module for module in self.CODEGEN_MODULES if module in result['modules']],
+        }
+
+    def handle(self, *args, **options):
+        report = self.measure()
+        report['slowest_imports'] = report['slowest_imports'][:options['top']]
+        if options['json']:
+            self.stdout.write(json.dumps(report))
+            return
+        self.stdout.write("Time to serving: {:.0f} ms (Django ready after {:.0f} ms)".format(
+            report['time_to_serving'] * 1e3, report['time_to_ready'] * 1e3))
+        self.stdout.write("Time spent importing modules: {:.0f} ms\n\n".format(report['import_time'] * 1e3))
+        self.stdout.write("Slowest top level imports (cumulative):")
+        for module, cumulative_time in report['slowest_imports']:
+            self.stdout.write("{:>10.1f} ms  {}".format(cumulative_time * 1e3, module))
+        if report['codegen_modules']:
+            self.stderr.write("\nCode generation modules imported at startup: {}".format(
+                ', '.join(report['codegen_modules'])))
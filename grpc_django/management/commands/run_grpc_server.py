@@ -1,15 +1,13 @@
 import re
-import time
-from contextlib import contextmanager
 from datetime import datetime
 from ipaddress import ip_address
 
 from django.conf import settings as django_settings
 from django.core.management import BaseCommand, CommandError
 
-from grpc_django.server import init_server
+from grpc_django.server import serve
 from grpc_django.settings import settings
-from grpc_django.views import ServerStreamGRPCView
+from grpc_django.supervisor import ProcessSupervisor, serve_process
 
 naiveip_re = re.compile(r"""^(?:(?P<addr>(?P<ipv4>\d{1,3}(?:\.\d{1,3}){3}) |):)?(?P<port>\d+)$""", re.X)
 
@@ -18,6 +16,8 @@ class Command(BaseCommand):
     help = "Starts a GRPC server"
 
     default_addr = '127.0.0.1'
+    # Seconds given to the worker processes to exit on top of the shutdown grace period, before being killed
+    SHUTDOWN_TIMEOUT_MARGIN = 5
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -25,25 +25,19 @@ class Command(BaseCommand):
             help="Optional port number, or ipaddr:port"
         )
         parser.add_argument(
-            "--workers", dest="max_workers",
+            "--workers", dest="max_workers", type=int,
             help="Number of maximum worker threads"
         )
+        parser.add_argument(
+            "--asyncio", dest="use_asyncio", action="store_true",
+            help="Run an asyncio server (grpc.aio), required for async views"
+        )
+        parser.add_argument(
+            "--processes", dest="num_of_processes", type=int,
+            help="Number of server processes sharing the port, restarted by a supervisor if they crash"
+        )
 
-    @staticmethod
-    def _get_rpc_method(rpc_call):
-        if issubclass(rpc_call.cls, ServerStreamGRPCView):
-            def method(*args):
-                yield from rpc_call.cls(args[1], args[2]).__call__()
-        else:
-            def method(*args):
-                return rpc_call.cls(args[1], args[2]).__call__()
-        return method
-
-    @contextmanager
-    def serve_forever(self, addr, port, **kwargs):
-        self.stdout.write("Performing system checks...\n\n")
-        self.check_migrations()
-        server = init_server(addr, port, max_workers=kwargs.get('max_workers', 1), stdout=self.stdout)
+    def write_banner(self, addr, port):
         self.stdout.write(datetime.now().strftime('%B %d, %Y - %X'))
         self.stdout.write(
             "Django version {version}, using settings {settings}\n"
@@ -54,9 +48,6 @@ class Command(BaseCommand):
                 'port': port
             })
         )
-        server.start()
-        yield
-        server.stop(0)
 
     @staticmethod
     def get_addrport(value):
@@ -83,9 +74,23 @@ class Command(BaseCommand):
             addr, port = self.default_addr, settings.server_port
         else:
             addr, port = self.get_addrport(options['addrport'])
-        with self.serve_forever(addr=addr, port=port):
-            try:
-                while True:
-                    time.sleep(60*60*24)
-            except KeyboardInterrupt:
-                pass
+        max_workers = options.get('max_workers') or settings.workers
+        use_asyncio = options.get('use_asyncio') or settings.use_asyncio
+        num_of_processes = options.get('num_of_processes') or settings.processes
+        if use_asyncio and settings.metrics_port:
+            # Checked before starting the worker processes, which would otherwise fail one after another
+            raise CommandError("The metrics endpoint is not supported by the asyncio server, unset the metrics_port "
+                               "of the server settings to run it")
+        self.stdout.write("Performing system checks...\n\n")
+        # Migrations are checked before starting any event loop, as the ORM is synchronous
+        self.check_migrations()
+        if num_of_processes > 1:
+            self.write_banner(addr, port)
+            ProcessSupervisor(
+                serve_process, args=(addr, port, max_workers, use_asyncio), num_of_processes=num_of_processes,
+                stdout=self.stdout, shutdown_timeout=settings.shutdown_grace_period + self.SHUTDOWN_TIMEOUT_MARGIN,
+                slot_kwarg='slot'
+            ).run()
+            return
+        serve(addr, port, max_workers=max_workers, use_asyncio=use_asyncio, stdout=self.stdout,
+              on_started=lambda: self.write_banner(addr, port))
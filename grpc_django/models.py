@@ -1,8 +1,10 @@
+import warnings
+
 from django.contrib.auth.models import AbstractUser
 
 
 # Create your models here.
-class ContextUser(AbstractUser):
+class _ContextUser(AbstractUser):
     """
     Just an abstract model class to represent Auth user coming as context in GRPC requests
     """
@@ -12,3 +14,11 @@ class ContextUser(AbstractUser):
 
     def __str__(self):
         return " ".format([self.first_name, self.last_name])
+
+
+def __getattr__(name):
+    if name == 'ContextUser':
+        warnings.warn("ContextUser is deprecated, the user of an RPC is a grpc_django.authentication.Principal",
+                      DeprecationWarning, stacklevel=2)
+        return _ContextUser
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
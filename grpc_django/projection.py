@@ -0,0 +1,117 @@
+import functools
+from collections import namedtuple
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from django.db.models.constants import LOOKUP_SEP
+from google.protobuf.descriptor import FieldDescriptor
+
+# Arguments of QuerySet.only(), select_related() and prefetch_related()
+Projection = namedtuple('Projection', ['only', 'select_related', 'prefetch_related'])
+
+DEFAULT_MAX_DEPTH = 3
+
+
+def _project(model, descriptor, prefix, depth, max_depth, projection, fields=None):
+    opts = model._meta
+    for field_descriptor in descriptor.fields:
+        if fields is not None and field_descriptor.name not in fields:
+            continue
+        try:
+            field = opts.get_field(field_descriptor.name)
+        except FieldDoesNotExist:
+            # Not a model field, e.g. built by the serializer
+            continue
+        name = prefix + field.name
+        nested = field_descriptor.message_type if field_descriptor.type == FieldDescriptor.TYPE_MESSAGE else None
+        if not field.is_relation:
+            if field.concrete:
+                projection.only.append(name)
+        elif field.related_model is None:
+            # Generic foreign keys
+            continue
+        elif field.many_to_many or field.one_to_many:
+            if nested is not None and depth < max_depth:
+                # The related objects of the repeated nested messages are prefetched with their own projection
+                related = Projection([], [], [])
+                _project(field.related_model, nested, '', depth + 1, max_depth, related)
+                if field.one_to_many and related.only:
+                    # Foreign key the prefetched objects are matched to the objects by
+                    related.only.append(field.field.name)
+                queryset = apply_projection(field.related_model._default_manager.all(), related)
+                projection.prefetch_related.append(Prefetch(name, queryset=queryset))
+            else:
+                projection.prefetch_related.append(name)
+        elif nested is not None and depth < max_depth:
+            # Foreign keys and one-to-one relations serialized as nested messages are joined
+            if field.concrete:
+                projection.only.append(name)
+            projection.select_related.append(name)
+            _project(field.related_model, nested, name + '__', depth + 1, max_depth, projection)
+        elif field.concrete:
+            # Serialized as the primary key of the related object
+            projection.only.append(name)
+
+
+def _project_lookup(model, lookup, projection):
+    """
+    Projects an additional field, following the relations of its lookup, e.g. 'content_type__app_label'
+    """
+    parts = lookup.split(LOOKUP_SEP)
+    prefix = ''
+    for depth, part in enumerate(parts):
+        try:
+            field = model._meta.get_field(part)
+        except FieldDoesNotExist:
+            if depth == 0:
+                projection.only.append(lookup)
+            return
+        name = prefix + part
+        if not field.is_relation or field.related_model is None:
+            if field.concrete and name not in projection.only:
+                projection.only.append(name)
+            return
+        if field.many_to_many or field.one_to_many:
+            if name not in projection.prefetch_related:
+                projection.prefetch_related.append(name)
+            return
+        if field.concrete and name not in projection.only:
+            # Column of the foreign key, which the related object is joined by
+            projection.only.append(name)
+        if depth == len(parts) - 1:
+            return
+        if name not in projection.select_related:
+            projection.select_related.append(name)
+        model, prefix = field.related_model, name + LOOKUP_SEP
+
+
+def apply_projection(queryset, projection):
+    if projection.only:
+        queryset = queryset.only(*projection.only)
+    if projection.select_related:
+        queryset = queryset.select_related(*projection.select_related)
+    if projection.prefetch_related:
+        queryset = queryset.prefetch_related(*projection.prefetch_related)
+    return queryset
+
+
+# Bounded, as the projections of the field masks of the requests are cached as well
+@functools.lru_cache(maxsize=1024)
+def get_projection(model, descriptor, extra_fields=(), max_depth=DEFAULT_MAX_DEPTH, fields=None):
+    """
+    Derives the projection of a queryset from the message its objects are serialized into: the columns of the
+    fields of the message, the relations of its nested messages to select along, or to prefetch for the repeated
+    ones with a projection of their own. The fields of the message which are not model fields are ignored.
+    :param model: model of the queryset
+    :param descriptor: descriptor of the message
+    :param extra_fields: additional fields to fetch, e.g. model fields the serializer builds message fields from,
+        or lookups of the fields of related objects, e.g. 'author__name', which are selected along
+    :param max_depth: maximum depth of the nested messages whose relations are selected
+    :param fields: frozenset of the names of the fields of the message to project, e.g. of a field mask, all if None
+    :return: Projection
+    """
+    projection = Projection([], [], [])
+    _project(model, descriptor, '', 0, max_depth, projection, fields)
+    for field in extra_fields:
+        _project_lookup(model, field, projection)
+    return Projection(*(tuple(arguments) for arguments in projection))
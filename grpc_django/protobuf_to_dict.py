@@ -1,13 +1,16 @@
 # -*- coding:utf-8 -*-
-import six
 import datetime
+import operator
+import threading
+
+import six
 
 from google.protobuf.message import Message
 from google.protobuf.descriptor import FieldDescriptor
 from google.protobuf.timestamp_pb2 import Timestamp
 
-__all__ = ["protobuf_to_dict", "TYPE_CALLABLE_MAP", "dict_to_protobuf",
-           "REVERSE_TYPE_CALLABLE_MAP"]
+__all__ = ["protobuf_to_dict", "protobufs_to_dicts", "TYPE_CALLABLE_MAP", "dict_to_protobuf",
+           "dicts_to_protobufs", "REVERSE_TYPE_CALLABLE_MAP"]
 
 Timestamp_type_name = 'Timestamp'
 
@@ -59,107 +62,359 @@ def _is_map_entry(field):
             field.message_type.GetOptions().map_entry)
 
 
-def protobuf_to_dict(pb, type_callable_map=TYPE_CALLABLE_MAP, use_enum_labels=False,
-                     including_default_value_fields=False):
-    result_dict = {}
-    extensions = {}
-    for field, value in pb.ListFields():
+# Compiled codec plans, keyed by plan type, descriptor full name, contents of the conversion map and options.
+# Plans are published only once they (and every nested plan they reference) are fully compiled,
+# so lookups on the hot path never need the lock.
+_codec_plans = {}
+_codec_plans_lock = threading.Lock()
+
+
+def _map_key(type_callable_map):
+    if type_callable_map is TYPE_CALLABLE_MAP or type_callable_map is REVERSE_TYPE_CALLABLE_MAP:
+        return id(type_callable_map)
+    # Other maps are keyed by their contents: the identity of a map built per call is reused once it is collected,
+    # and would grow the plans without bound
+    return frozenset(type_callable_map.items())
+
+
+def _plan_key(plan_cls, descriptor, type_callable_map, options):
+    return (plan_cls, descriptor.full_name, _map_key(type_callable_map)) + options
+
+
+def _get_plan(plan_cls, descriptor, type_callable_map, *options):
+    plan = _codec_plans.get(_plan_key(plan_cls, descriptor, type_callable_map, options))
+    if plan is not None and plan.descriptor is descriptor:
+        return plan
+    with _codec_plans_lock:
+        pending = {}
+        plan = _build_plan(plan_cls, descriptor, type_callable_map, options, pending)
+        _codec_plans.update(pending)
+    return plan
+
+
+def _build_plan(plan_cls, descriptor, type_callable_map, options, pending):
+    key = _plan_key(plan_cls, descriptor, type_callable_map, options)
+    plan = _codec_plans.get(key)
+    if plan is not None and plan.descriptor is descriptor:
+        return plan
+    plan = pending.get(key)
+    if plan is not None and plan.descriptor is descriptor:
+        return plan
+    # Register the plan before compiling its fields so that recursive message types resolve to it
+    plan = pending[key] = plan_cls(descriptor, type_callable_map, *options)
+    plan.compile(lambda nested: _build_plan(plan_cls, nested, type_callable_map, options, pending))
+    return plan
+
+
+def _compile_lazily(plan, compile_func, field):
+    """
+    Compiles an accessor for a field that is only discovered at conversion time (i.e. extensions).
+    """
+    with _codec_plans_lock:
+        pending = {}
+        accessor = compile_func(
+            field, lambda nested: _build_plan(type(plan), nested, plan.type_callable_map, plan.options, pending))
+        _codec_plans.update(pending)
+    return accessor
+
+
+class _ProtobufToDictPlan(object):
+    """
+    Converts instances of a single protobuf message type into dictionaries using per-field
+    value adaptors precompiled from the message descriptor.
+    """
+    __slots__ = ('descriptor', 'type_callable_map', 'use_enum_labels', 'including_default_value_fields',
+                 'getters', 'defaults', 'extension_getters')
+
+    def __init__(self, descriptor, type_callable_map, use_enum_labels, including_default_value_fields):
+        self.descriptor = descriptor
+        self.type_callable_map = type_callable_map
+        self.use_enum_labels = use_enum_labels
+        self.including_default_value_fields = including_default_value_fields
+        self.getters = {}
+        self.defaults = ()
+        self.extension_getters = {}
+
+    @property
+    def options(self):
+        return self.use_enum_labels, self.including_default_value_fields
+
+    def compile(self, resolve):
+        self.getters = {
+            field.number: (field.name, self._compile_getter(field, resolve)) for field in self.descriptor.fields
+        }
+        if self.including_default_value_fields:
+            # Singular message fields and oneof fields will not be affected.
+            self.defaults = tuple(
+                (field.name, _is_map_entry(field), field) for field in self.descriptor.fields
+                if not ((field.label != FieldDescriptor.LABEL_REPEATED and
+                         field.cpp_type == FieldDescriptor.CPPTYPE_MESSAGE) or field.containing_oneof)
+            )
+
+    def _compile_adaptor(self, field, resolve):
+        if field.message_type and field.message_type.name == Timestamp_type_name:
+            return timestamp_to_datetime
+        if field.type == FieldDescriptor.TYPE_MESSAGE:
+            # recursively encode protobuf sub-message
+            return resolve(field.message_type).convert
+        if self.use_enum_labels and field.type == FieldDescriptor.TYPE_ENUM:
+            return lambda value: enum_label_name(field, value)
+        if field.type in self.type_callable_map:
+            return self.type_callable_map[field.type]
+
+        def unrecognised(value):
+            raise TypeError("Field %s.%s has unrecognised type id %d" % (
+                self.descriptor.name, field.name, field.type))
+        return unrecognised
+
+    def _compile_getter(self, field, resolve):
         if field.message_type and field.message_type.has_options and field.message_type.GetOptions().map_entry:
-            result_dict[field.name] = dict()
-            value_field = field.message_type.fields_by_name['value']
-            type_callable = _get_field_value_adaptor(
-                pb, value_field, type_callable_map,
-                use_enum_labels, including_default_value_fields)
-            for k, v in value.items():
-                result_dict[field.name][k] = type_callable(v)
-            continue
-        type_callable = _get_field_value_adaptor(pb, field, type_callable_map,
-                                                 use_enum_labels, including_default_value_fields)
-        if field.label == FieldDescriptor.LABEL_REPEATED:
-            type_callable = repeated(type_callable)
+            value_adaptor = self._compile_adaptor(field.message_type.fields_by_name['value'], resolve)
+            return lambda value: {k: value_adaptor(v) for k, v in value.items()}
 
+        adaptor = self._compile_adaptor(field, resolve)
+        if field.label == FieldDescriptor.LABEL_REPEATED:
+            return repeated(adaptor)
         if field.is_extension:
-            extensions[str(field.number)] = type_callable(value)
-            continue
+            return adaptor
+
         # Custom handling for tri bool enum fields
         if field.type == FieldDescriptor.TYPE_ENUM and field.enum_type.name == "Bool":
-            if value == 1:
-                value = True
-            elif value == 2:
-                value = False
-            else:
-                value = None
-        if field.type == FieldDescriptor.CPPTYPE_STRING and value == "Nil":
-            # Custom handles for String fields receiving 'Nil' value, which is being mimicked by us to handle default
-            # values for string in proto buf, i.e., empty string ("")
-            value = ""
-        elif field.type == FieldDescriptor.CPPTYPE_STRING and value == "None":
-            # Custom handles for String fields receiving 'None' value, which is being mimicked by us to handle Null
-            # values for string
-            value = None
-        if value is not None:
-            result_dict[field.name] = type_callable(value)
-        else:
-            result_dict[field.name] = None
-
-    # Serialize default value if including_default_value_fields is True.
-    if including_default_value_fields:
-        for field in pb.DESCRIPTOR.fields:
-            # Singular message fields and oneof fields will not be affected.
-            if ((
-                                field.label != FieldDescriptor.LABEL_REPEATED and
-                                field.cpp_type == FieldDescriptor.CPPTYPE_MESSAGE) or
-                    field.containing_oneof):
-                continue
-            if field.name in result_dict:
-                # Skip the field which has been serailized already.
+            def tri_bool(value):
+                if value == 1:
+                    return adaptor(True)
+                elif value == 2:
+                    return adaptor(False)
+                return None
+            return tri_bool
+        if field.type == FieldDescriptor.CPPTYPE_STRING:
+            def string(value):
+                if value == "Nil":
+                    # Custom handles for String fields receiving 'Nil' value, which is being mimicked by us to
+                    # handle default values for string in proto buf, i.e., empty string ("")
+                    return adaptor("")
+                elif value == "None":
+                    # Custom handles for String fields receiving 'None' value, which is being mimicked by us to
+                    # handle Null values for string
+                    return None
+                return adaptor(value)
+            return string
+        return adaptor
+
+    def convert(self, pb):
+        result_dict = {}
+        extensions = {}
+        getters = self.getters
+        for field, value in pb.ListFields():
+            getter = getters.get(field.number)
+            if getter is None:
+                getter = self.extension_getters.get(field.number)
+                if getter is None:
+                    getter = self.extension_getters[field.number] = _compile_lazily(
+                        self, self._compile_getter, field)
+                extensions[str(field.number)] = getter(value)
                 continue
-            if _is_map_entry(field):
-                result_dict[field.name] = {}
-            else:
-                result_dict[field.name] = field.default_value
+            result_dict[getter[0]] = getter[1](value)
 
-    if extensions:
-        result_dict[EXTENSION_CONTAINER] = extensions
-    return result_dict
+        # Serialize default value if including_default_value_fields is True.
+        for name, is_map, field in self.defaults:
+            if name not in result_dict:
+                result_dict[name] = {} if is_map else field.default_value
 
+        if extensions:
+            result_dict[EXTENSION_CONTAINER] = extensions
+        return result_dict
 
-def _get_field_value_adaptor(pb, field, type_callable_map=TYPE_CALLABLE_MAP, use_enum_labels=False,
-                             including_default_value_fields=False):
-    if field.message_type and field.message_type.name == Timestamp_type_name:
-        return timestamp_to_datetime
-    if field.type == FieldDescriptor.TYPE_MESSAGE:
-        # recursively encode protobuf sub-message
-        return lambda pb: protobuf_to_dict(
-            pb, type_callable_map=type_callable_map,
-            use_enum_labels=use_enum_labels,
-            including_default_value_fields=including_default_value_fields,
-        )
 
-    if use_enum_labels and field.type == FieldDescriptor.TYPE_ENUM:
-        return lambda value: enum_label_name(field, value)
+def protobuf_to_dict(pb, type_callable_map=TYPE_CALLABLE_MAP, use_enum_labels=False,
+                     including_default_value_fields=False):
+    plan = _get_plan(_ProtobufToDictPlan, pb.DESCRIPTOR, type_callable_map,
+                     bool(use_enum_labels), bool(including_default_value_fields))
+    return plan.convert(pb)
 
-    if field.type in type_callable_map:
-        return type_callable_map[field.type]
 
-    raise TypeError("Field %s.%s has unrecognised type id %d" % (
-        pb.__class__.__name__, field.name, field.type))
+def protobufs_to_dicts(pbs, type_callable_map=TYPE_CALLABLE_MAP, use_enum_labels=False,
+                       including_default_value_fields=False):
+    """Converts a sequence of protobuf messages of the same type into a list of dictionaries.
+
+    The codec plan is looked up once for the whole batch instead of once per message.
+    """
+    pbs = list(pbs)
+    if not pbs:
+        return []
+    convert = _get_plan(_ProtobufToDictPlan, pbs[0].DESCRIPTOR, type_callable_map,
+                        bool(use_enum_labels), bool(including_default_value_fields)).convert
+    return [convert(pb) for pb in pbs]
 
 
 REVERSE_TYPE_CALLABLE_MAP = {
 }
 
 
+class _DictToProtobufPlan(object):
+    """
+    Populates instances of a single protobuf message type from dictionaries using per-field
+    setters precompiled from the message descriptor.
+    """
+    __slots__ = ('descriptor', 'type_callable_map', 'strict', 'ignore_none', 'setters', 'extension_setters')
+
+    def __init__(self, descriptor, type_callable_map, strict, ignore_none):
+        self.descriptor = descriptor
+        self.type_callable_map = type_callable_map
+        self.strict = strict
+        self.ignore_none = ignore_none
+        self.setters = {}
+        self.extension_setters = {}
+
+    @property
+    def options(self):
+        return self.strict, self.ignore_none
+
+    def compile(self, resolve):
+        self.setters = {field.name: self._compile_setter(field, resolve) for field in self.descriptor.fields}
+
+    def _compile_extension_setter(self, field, resolve):
+        def get(pb):
+            return pb.Extensions[field]
+
+        def assign(pb, value):
+            pb.Extensions[field] = value
+        return self._compile_field_setter(field, get, assign, resolve)
+
+    def _compile_setter(self, field, resolve):
+        name = field.name
+        get = operator.attrgetter(name)
+
+        def assign(pb, value):
+            setattr(pb, name, value)
+        return self._compile_field_setter(field, get, assign, resolve)
+
+    def _compile_field_setter(self, field, get, assign, resolve):
+        """
+        :param get: returns the (composite) value of the field from a message
+        :param assign: assigns a scalar value to the field of a message
+        """
+        if field.label == FieldDescriptor.LABEL_REPEATED:
+            if field.message_type and field.message_type.has_options and field.message_type.GetOptions().map_entry:
+                value_field = field.message_type.fields_by_name['value']
+                if value_field.cpp_type == FieldDescriptor.CPPTYPE_MESSAGE:
+                    value_plan = resolve(value_field.message_type)
+
+                    def set_message_map(pb, values):
+                        container = get(pb)
+                        for key, value in values.items():
+                            value_plan.apply(container[key], value)
+                    return set_message_map
+
+                def set_map(pb, values):
+                    container = get(pb)
+                    for key, value in values.items():
+                        container[key] = value
+                return set_map
+
+            if field.type == FieldDescriptor.TYPE_MESSAGE:
+                item_plan = resolve(field.message_type)
+
+                def set_repeated_message(pb, values):
+                    container = get(pb)
+                    for item in values:
+                        if isinstance(item, Message):
+                            container.append(item)
+                        else:
+                            item_plan.apply(container.add(), item)
+                return set_repeated_message
+
+            if field.type == FieldDescriptor.TYPE_ENUM:
+                def set_repeated_enum(pb, values):
+                    get(pb).extend([_string_to_enum(field, item) if isinstance(item, six.string_types) else item
+                                    for item in values])
+                return set_repeated_enum
+
+            def set_repeated(pb, values):
+                get(pb).extend(values)
+            return set_repeated
+
+        if field.type == FieldDescriptor.TYPE_MESSAGE:
+            message_plan = resolve(field.message_type)
+
+            def set_message(pb, value):
+                if isinstance(value, datetime.datetime):
+                    # Instead of setattr we need to use CopyFrom for composite fields
+                    # Otherwise we will get AttributeError: Assignment not allowed to composite field
+                    # “field name” in protocol message object
+                    get(pb).CopyFrom(datetime_to_timestamp(value))
+                elif isinstance(value, Message):
+                    get(pb).CopyFrom(value)
+                else:
+                    message_plan.apply(get(pb), value)
+            return set_message
+
+        convert = self.type_callable_map.get(field.type)
+        if field.type == FieldDescriptor.TYPE_ENUM and not field.is_extension:
+            def set_enum(pb, value):
+                if convert is not None:
+                    value = convert(value)
+                if isinstance(value, six.string_types):
+                    value = _string_to_enum(field, value)
+                # Handle tri bool enum field
+                elif type(value) == bool:
+                    value = 1 if value else 2
+                assign(pb, value)
+            return set_enum
+
+        if convert is not None:
+            def set_converted(pb, value):
+                assign(pb, convert(value))
+            return set_converted
+        return assign
+
+    def apply(self, pb, values):
+        setters = self.setters
+        ignore_none = self.ignore_none
+        for key, value in values.items():
+            setter = setters.get(key)
+            if setter is None:
+                if self.strict and key != EXTENSION_CONTAINER:
+                    raise KeyError("%s does not have a field called %s" % (pb, key))
+                continue
+            if ignore_none and value is None:
+                continue
+            setter(pb, value)
+
+        for ext_num, ext_val in values.get(EXTENSION_CONTAINER, {}).items():
+            try:
+                ext_num = int(ext_num)
+            except ValueError:
+                raise ValueError("Extension keys must be integers.")
+            if ext_num not in pb._extensions_by_number:
+                if self.strict:
+                    raise KeyError(
+                        "%s does not have a extension with number %s. Perhaps you forgot to import it?" % (
+                            pb, ext_num))
+                continue
+            if ignore_none and ext_val is None:
+                continue
+            setter = self.extension_setters.get(ext_num)
+            if setter is None:
+                setter = self.extension_setters[ext_num] = _compile_lazily(
+                    self, self._compile_extension_setter, pb._extensions_by_number[ext_num])
+            setter(pb, ext_val)
+        return pb
+
+
 def dict_to_protobuf(pb_klass_or_instance, values, type_callable_map=REVERSE_TYPE_CALLABLE_MAP, strict=True,
                      ignore_none=False):
     """Populates a protobuf model from a dictionary.
 
+    The field setters for each message type are compiled once from its descriptor and cached,
+    so repeated conversions only pay for the data being copied.
+
     :param pb_klass_or_instance: a protobuf message class, or an protobuf instance
     :type pb_klass_or_instance: a type or instance of a subclass of google.protobuf.message.Message
     :param dict values: a dictionary of values. Repeated and nested values are
        fully supported.
     :param dict type_callable_map: a mapping of protobuf types to callables for setting
-       values on the target instance.
+       values on the target instance. Compiled plans are cached per mapping, so pass a long-lived mapping.
     :param bool strict: complain if keys in the map are not fields on the message.
     :param bool strict: ignore None-values of fields, treat them as empty field
     """
@@ -167,94 +422,24 @@ def dict_to_protobuf(pb_klass_or_instance, values, type_callable_map=REVERSE_TYP
         instance = pb_klass_or_instance
     else:
         instance = pb_klass_or_instance()
-    return _dict_to_protobuf(instance, values, type_callable_map, strict, ignore_none)
-
-
-def _get_field_mapping(pb, dict_value, strict):
-    field_mapping = []
-    for key, value in dict_value.items():
-        if key == EXTENSION_CONTAINER:
-            continue
-        if key not in pb.DESCRIPTOR.fields_by_name:
-            if strict:
-                raise KeyError("%s does not have a field called %s" % (pb, key))
-            continue
-        # if value is None:
-        #     value = ""
-        field_mapping.append((pb.DESCRIPTOR.fields_by_name[key], value, getattr(pb, key, None)))
-
-    for ext_num, ext_val in dict_value.get(EXTENSION_CONTAINER, {}).items():
-        try:
-            ext_num = int(ext_num)
-        except ValueError:
-            raise ValueError("Extension keys must be integers.")
-        if ext_num not in pb._extensions_by_number:
-            if strict:
-                raise KeyError(
-                    "%s does not have a extension with number %s. Perhaps you forgot to import it?" % (pb, key))
-            continue
-        ext_field = pb._extensions_by_number[ext_num]
-        pb_val = pb.Extensions[ext_field]
-        field_mapping.append((ext_field, ext_val, pb_val))
-
-    return field_mapping
-
-
-def _dict_to_protobuf(pb, value, type_callable_map, strict, ignore_none):
-    fields = _get_field_mapping(pb, value, strict)
-
-    for field, input_value, pb_value in fields:
-        if ignore_none and input_value is None:
-            continue
-        if field.label == FieldDescriptor.LABEL_REPEATED:
-            if field.message_type and field.message_type.has_options and field.message_type.GetOptions().map_entry:
-                value_field = field.message_type.fields_by_name['value']
-                for key, value in input_value.items():
-                    if value_field.cpp_type == FieldDescriptor.CPPTYPE_MESSAGE:
-                        _dict_to_protobuf(getattr(pb, field.name)[key], value, type_callable_map, strict, ignore_none)
-                    else:
-                        getattr(pb, field.name)[key] = value
-                continue
-            for item in input_value:
-                if field.type == FieldDescriptor.TYPE_MESSAGE:
-                    m = pb_value.add()
-                    _dict_to_protobuf(m, item, type_callable_map, strict, ignore_none)
-                elif field.type == FieldDescriptor.TYPE_ENUM and isinstance(item, six.string_types):
-                    pb_value.append(_string_to_enum(field, item))
-                else:
-                    pb_value.append(item)
-            continue
-        if isinstance(input_value, datetime.datetime):
-            input_value = datetime_to_timestamp(input_value)
-            # Instead of setattr we need to use CopyFrom for composite fields
-            # Otherwise we will get AttributeError: Assignment not allowed to composite field “field name” in protocol message object
-            getattr(pb, field.name).CopyFrom(input_value)
-            continue
-        elif field.type == FieldDescriptor.TYPE_MESSAGE:
-            _dict_to_protobuf(pb_value, input_value, type_callable_map, strict, ignore_none)
-            continue
-
-        if field.type in type_callable_map:
-            input_value = type_callable_map[field.type](input_value)
+    plan = _get_plan(_DictToProtobufPlan, instance.DESCRIPTOR, type_callable_map, bool(strict), bool(ignore_none))
+    return plan.apply(instance, values)
 
-        if field.is_extension:
-            pb.Extensions[field] = input_value
-            continue
-
-        if field.type == FieldDescriptor.TYPE_ENUM and isinstance(input_value, six.string_types):
-            input_value = _string_to_enum(field, input_value)
-        # Handle tri bool enum field
-        if field.type == FieldDescriptor.TYPE_ENUM and type(input_value) == bool:
-            if input_value is True:
-                input_value = 1
-            elif input_value is False:
-                input_value = 2
-            else:
-                input_value = 0
-
-        setattr(pb, field.name, input_value)
-
-    return pb
+
+def dicts_to_protobufs(pb_klass, values_list, type_callable_map=REVERSE_TYPE_CALLABLE_MAP, strict=True,
+                       ignore_none=False):
+    """Builds a list of protobuf messages from an iterable of dictionaries in one call.
+
+    :param pb_klass: a protobuf message class
+    :param values_list: an iterable of dictionaries, e.g. a list of serializer outputs or ``queryset.values()`` rows
+    :param dict type_callable_map: see :func:`dict_to_protobuf`
+    :param bool strict: complain if keys in the map are not fields on the message.
+    :param bool ignore_none: ignore None-values of fields, treat them as empty field
+    :return: list of pb_klass instances, in the order of values_list
+    """
+    apply = _get_plan(_DictToProtobufPlan, pb_klass.DESCRIPTOR, type_callable_map, bool(strict),
+                      bool(ignore_none)).apply
+    return [apply(pb_klass(), values) for values in values_list]
 
 
 def _string_to_enum(field, input_value):
@@ -0,0 +1,100 @@
+import os
+import tempfile
+
+from google.protobuf import descriptor_pb2, descriptor_pool
+
+from .codegen import ProtoTree, run_protoc
+from .exceptions import GrpcServerStartError
+
+try:
+    from google.protobuf.message_factory import GetMessageClass
+except ImportError:
+    # protobuf < 4.21
+    from google.protobuf.message_factory import MessageFactory
+    from google.protobuf.symbol_database import Default as _get_symbol_database
+
+    _message_factory = MessageFactory()
+
+    def GetMessageClass(descriptor):
+        try:
+            # Generated class of the message
+            return _get_symbol_database().GetSymbol(descriptor.full_name)
+        except KeyError:
+            return _message_factory.GetPrototype(descriptor)
+
+
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'grpc_django_descriptors')
+
+# Descriptors of the protos loaded at runtime, shared by the services so that they can import each other's protos
+_pool = descriptor_pool.DescriptorPool()
+
+
+class DescriptorLoader(ProtoTree):
+    """
+    Builds the descriptors of proto files at runtime, without generated stubs: each proto is compiled with all the
+    protos it imports into a FileDescriptorSet, which is cached on disk by the digest of their sources, so protoc
+    only runs the first time a version of the protos is loaded.
+    """
+
+    def __init__(self, inclusion_root, cache_dir=None, pool=None):
+        """
+        :param inclusion_root: folder where the protos reside
+        :param cache_dir: folder of the compiled descriptor sets
+        :param pool: DescriptorPool the descriptors are added to
+        """
+        super().__init__(inclusion_root)
+        self.cache_dir = cache_dir if cache_dir else DEFAULT_CACHE_DIR
+        self.pool = pool if pool is not None else _pool
+
+    def get_cache_path(self, name):
+        return os.path.join(self.cache_dir, '{}-{}.pb'.format(
+            os.path.splitext(name)[0].replace('/', '.'), self.get_digest(name)))
+
+    def compile(self, name, cache_path):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, path = tempfile.mkstemp(suffix='.pb', dir=self.cache_dir)
+        os.close(fd)
+        try:
+            command = self.get_protoc_command([name], '--include_imports', '--descriptor_set_out={}'.format(path))
+            try:
+                code, _ = run_protoc(command)
+            except ImportError:
+                raise GrpcServerStartError("grpcio-tools is required to compile the proto {}".format(name))
+            if code != 0:
+                raise GrpcServerStartError("Failed to compile the proto {}".format(name))
+            # Moved in place once complete, for the concurrently starting processes to never read it partially
+            os.replace(path, cache_path)
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def get_descriptor_set(self, name):
+        """
+        :return: FileDescriptorSet of the proto and of all the protos it imports, dependencies first
+        """
+        cache_path = self.get_cache_path(name)
+        if not os.path.isfile(cache_path):
+            self.compile(name, cache_path)
+        with open(cache_path, 'rb') as f:
+            return descriptor_pb2.FileDescriptorSet.FromString(f.read())
+
+    def load(self, proto_file):
+        """
+        :param proto_file: path of the proto file, or its name relative to the inclusion root
+        :return: FileDescriptor of the proto
+        """
+        name = self.get_proto_name(proto_file)
+        for file_proto in self.get_descriptor_set(name).file:
+            try:
+                self.pool.FindFileByName(file_proto.name)
+            except KeyError:
+                self.pool.AddSerializedFile(file_proto.SerializeToString())
+        return self.pool.FindFileByName(name)
+
+
+def get_message_class(full_name, pool=None):
+    """
+    :param full_name: full name of a message of the protos loaded at runtime, e.g. 'package.User'
+    :return: class of the message
+    """
+    return GetMessageClass((pool if pool is not None else _pool).FindMessageTypeByName(full_name))
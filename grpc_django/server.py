@@ -1,19 +1,218 @@
+import asyncio
+import signal
 import sys
+import threading
 from concurrent import futures
 
 import grpc
+from django.db import connections
 
+from grpc_django.db import ConnectionPool
+from grpc_django.exceptions import GrpcServerStartError
 from grpc_django.settings import settings
+from grpc_django.utils.interceptors import AioInFlightInterceptor, InFlightInterceptor, MetricsInterceptor, \
+    intercept_server, start_metrics_server
+from grpc_django.warmup import Warmup
 
 
-def init_server(addr, port, max_workers=1, stdout=sys.stdout):
+class WorkerThreadPool(futures.ThreadPoolExecutor):
+    """
+    Pool of threads the RPCs are processed on, which can run a function in each one of its threads
+    (e.g. to manage their thread local database connections).
+    """
+
+    def __init__(self, max_workers=1, **kwargs):
+        super().__init__(max_workers=max_workers, **kwargs)
+        self.max_workers = max_workers
+
+    def run_in_each_thread(self, func, timeout=None):
+        """
+        Runs `func` once in every worker thread. Threads still busy with an RPC after `timeout` seconds are skipped.
+        """
+        barrier = threading.Barrier(self.max_workers)
+
+        def run():
+            try:
+                func()
+            finally:
+                # Holds the thread until every other one picked up its call
+                try:
+                    barrier.wait(timeout)
+                except threading.BrokenBarrierError:
+                    pass
+
+        futures.wait([self.submit(run) for _ in range(self.max_workers)], timeout)
+
+
+def _add_services(server, stdout, use_asyncio=False, connection_pool=None):
+    """
+    :return: the generic RPC handlers of the services
+    """
+    stdout.write("\nAdding GRPC services: {}\n\n".format(', '.join([x.name for x in settings.services])))
+    handlers = tuple(service.get_generic_handler(use_asyncio=use_asyncio, connection_pool=connection_pool)
+                     for service in settings.services)
+    server.add_generic_rpc_handlers(handlers)
+    return handlers
+
+
+def _warm_up(warmup, handlers, thread_pool, connection_pool, stdout):
+    warmup = warmup if warmup else settings.warmup
+    if warmup:
+        stdout.write("Warming up...\n")
+        Warmup(warmup, stdout=stdout).run(handlers, thread_pool, connection_pool=connection_pool)
+
+
+def _get_server_kwargs(options=None, reuse_port=False):
+    options = options if options else settings.server_options
+    channel_args = options.get_channel_args()
+    if reuse_port:
+        # Lets several worker processes listen on the same port
+        channel_args.append(('grpc.so_reuseport', 1))
+    return {'options': channel_args, 'maximum_concurrent_rpcs': options.maximum_concurrent_rpcs}
+
+
+def init_server(addr, port, max_workers=1, stdout=sys.stdout, reuse_port=False, interceptors=(), thread_pool=None,
+                options=None, connection_pool=None, warmup=None):
+    """
+    :param options: IServerOptions, defaults to the options of the server settings
+    :param connection_pool: ConnectionPool the views check out their database connections from
+    :param warmup: IWarmup run before the server listens, defaults to the warmup of the server settings
+    """
     stdout.write("Performing system checks...\n\n")
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=max_workers))
+    thread_pool = thread_pool if thread_pool else WorkerThreadPool(max_workers=max_workers)
+    server = grpc.server(thread_pool, **_get_server_kwargs(options, reuse_port))
+    if interceptors:
+        # Interceptors have to wrap the server before the services are added
+        server = intercept_server(server, *interceptors)
     # Add services to server
-    stdout.write("\nAdding GRPC services: {}\n\n".format(', '.join([x.name for x in settings.services])))
-    for service in settings.services:
-        servicer = service.load()
-        handler = service.find_server_handler()
-        handler(servicer, server)
+    handlers = _add_services(server, stdout, connection_pool=connection_pool)
+    _warm_up(warmup, handlers, thread_pool, connection_pool, stdout)
     server.add_insecure_port("{}:{}".format(addr, port))
     return server
+
+
+def init_aio_server(addr, port, max_workers=1, stdout=sys.stdout, reuse_port=False, interceptors=(), thread_pool=None,
+                    options=None, connection_pool=None, warmup=None):
+    """
+    Builds an asyncio server, must be called from within a running event loop.
+    Async views run on the event loop, while synchronous views are served by the pool of worker threads.
+    Only the requests of the synchronous views are replayed by the warmup.
+    :param interceptors: grpc.aio.ServerInterceptor instances, e.g. AioInFlightInterceptor
+    """
+    stdout.write("Performing system checks...\n\n")
+    thread_pool = thread_pool if thread_pool else WorkerThreadPool(max_workers=max_workers)
+    server = grpc.aio.server(thread_pool, interceptors=tuple(interceptors), **_get_server_kwargs(options, reuse_port))
+    # Add services to server
+    handlers = _add_services(server, stdout, use_asyncio=True, connection_pool=connection_pool)
+    _warm_up(warmup, handlers, thread_pool, connection_pool, stdout)
+    server.add_insecure_port("{}:{}".format(addr, port))
+    return server
+
+
+def stop_server(server, grace, in_flight=None, thread_pool=None, stdout=sys.stdout, connection_pool=None):
+    """
+    Stops accepting new RPCs and waits up to `grace` seconds for the in-flight ones to finish,
+    before cancelling the remaining ones and closing the database connections.
+    :param in_flight: InFlightInterceptor the server was initialised with, to report on the drained RPCs
+    :param thread_pool: WorkerThreadPool the server was initialised with, to close the connections of its threads
+    :param connection_pool: ConnectionPool the server was initialised with, to close its connections
+    """
+    pending = in_flight.count if in_flight else None
+    stopped = server.stop(grace)
+    if in_flight:
+        in_flight.wait_for_idle(grace)
+        cancelled = in_flight.count
+        stdout.write("Drained {} in-flight RPCs, cancelled {}\n".format(pending - cancelled, cancelled))
+    stopped.wait()
+    if thread_pool:
+        thread_pool.run_in_each_thread(connections.close_all, timeout=grace)
+    if connection_pool:
+        connection_pool.close_all()
+    connections.close_all()
+
+
+async def stop_aio_server(server, grace, in_flight=None, thread_pool=None, stdout=sys.stdout, connection_pool=None):
+    """
+    Asyncio counterpart of `stop_server`, the RPCs still running after the grace period are cancelled.
+    :param in_flight: AioInFlightInterceptor the server was initialised with, to report on the drained RPCs
+    """
+    loop = asyncio.get_running_loop()
+    pending = in_flight.count if in_flight else None
+    stopped = asyncio.ensure_future(server.stop(grace))
+    if in_flight:
+        # The synchronous views are drained by the worker threads, the wait cannot block the event loop
+        await loop.run_in_executor(None, in_flight.wait_for_idle, grace)
+        cancelled = in_flight.count
+        stdout.write("Drained {} in-flight RPCs, cancelled {}\n".format(pending - cancelled, cancelled))
+    await stopped
+    if thread_pool:
+        await loop.run_in_executor(None, thread_pool.run_in_each_thread, connections.close_all, grace)
+    if connection_pool:
+        connection_pool.close_all()
+
+
+def serve(addr, port, max_workers=1, use_asyncio=False, reuse_port=False, stdout=sys.stdout, on_started=None,
+          signals=(signal.SIGINT, signal.SIGTERM), grace=None, metrics_port=None):
+    """
+    Runs the server until one of the `signals` is received, then stops it gracefully.
+    :param on_started: called once the server is started
+    :param grace: seconds to drain the in-flight RPCs, defaults to the `shutdown_grace_period` of the server settings
+    :param metrics_port: port of the Prometheus metrics endpoint, defaults to the `metrics_port` of the server settings,
+        not supported by the asyncio server
+    """
+    metrics_port = metrics_port if metrics_port is not None else settings.metrics_port
+    if use_asyncio and metrics_port:
+        raise GrpcServerStartError("The metrics endpoint is not supported by the asyncio server, unset the "
+                                   "metrics_port of the server settings to run it")
+    thread_pool = WorkerThreadPool(max_workers=max_workers)
+    grace = grace if grace is not None else settings.shutdown_grace_period
+    pool_conf = settings.connection_pool
+    connection_pool = ConnectionPool(pool_conf.max_connections, timeout=pool_conf.timeout,
+                                     health_checks=pool_conf.health_checks,
+                                     databases=pool_conf.databases) if pool_conf else None
+
+    if use_asyncio:
+        in_flight = AioInFlightInterceptor()
+
+        async def serve_async():
+            server = init_aio_server(addr, port, stdout=stdout, reuse_port=reuse_port, interceptors=[in_flight],
+                                     thread_pool=thread_pool, connection_pool=connection_pool)
+            await server.start()
+            if on_started:
+                on_started()
+            stopped = asyncio.Event()
+            for signum in signals:
+                asyncio.get_running_loop().add_signal_handler(signum, stopped.set)
+            await stopped.wait()
+            stdout.write("\nShutting down, waiting up to {}s for in-flight RPCs\n".format(grace))
+            await stop_aio_server(server, grace, in_flight=in_flight, thread_pool=thread_pool, stdout=stdout,
+                                  connection_pool=connection_pool)
+        asyncio.run(serve_async())
+        return
+
+    in_flight = InFlightInterceptor()
+    interceptors = [in_flight]
+    metrics_server = None
+    if metrics_port:
+        metrics = MetricsInterceptor()
+        interceptors.append(metrics)
+        metrics_server = start_metrics_server(metrics, addr, metrics_port)
+        stdout.write("Exposing metrics at http://{}:{}/metrics\n".format(addr, metrics_port))
+    server = init_server(addr, port, stdout=stdout, reuse_port=reuse_port, interceptors=interceptors,
+                         thread_pool=thread_pool, connection_pool=connection_pool)
+    server.start()
+    if on_started:
+        on_started()
+    stopped = threading.Event()
+    previous_handlers = {signum: signal.signal(signum, lambda *args: stopped.set()) for signum in signals}
+    try:
+        while not stopped.wait(1):
+            pass
+    finally:
+        for signum, handler in previous_handlers.items():
+            signal.signal(signum, handler)
+    stdout.write("\nShutting down, waiting up to {}s for in-flight RPCs\n".format(grace))
+    stop_server(server, grace, in_flight=in_flight, thread_pool=thread_pool, stdout=stdout,
+                connection_pool=connection_pool)
+    if metrics_server:
+        metrics_server.shutdown()
@@ -1,19 +1,34 @@
 import importlib
+import operator
+import os
 import sys
-from types import MethodType
 
-import pkg_resources
+import grpc
+from asgiref.sync import sync_to_async
 from django.conf import settings as django_settings
 from django.core.management import CommandError
-from grpc_tools import protoc
+from django.core.signals import request_finished, request_started
 
+from .db import request_scope
 from .exceptions import GrpcServerStartError
 from .interfaces import IService, rpc
-from .views import ServerStreamGRPCView
+from .protos import DescriptorLoader, GetMessageClass
+from .views import AsyncGenericGrpcView, AsyncServerStreamGRPCView
+
+# RPC method handler of each (request streaming, response streaming) combination
+_RPC_METHOD_HANDLERS = {
+    (False, False): grpc.unary_unary_rpc_method_handler,
+    (False, True): grpc.unary_stream_rpc_method_handler,
+    (True, False): grpc.stream_unary_rpc_method_handler,
+    (True, True): grpc.stream_stream_rpc_method_handler,
+}
 
 
 class GRPCService:
-    def __init__(self, definition: IService, stdout=None, stderr=None):
+    def __init__(self, definition: IService, stdout=None, stderr=None, descriptor_cache=None):
+        """
+        :param descriptor_cache: folder the descriptors of the proto are cached in, when loaded at startup
+        """
         self.stdout = stdout if stdout else sys.stdout
         self.stderr = stderr if stderr else sys.stderr
 
@@ -22,46 +37,137 @@ class GRPCService:
         self.proto_filename = self.proto_path.split('/')[-1]
         self.stub_destination = definition.stub_conf
         self.rpcs = self.get_rpc_paths(definition.rpc_conf)
+        self.load_proto = definition.load_proto
+        self.descriptor_cache = descriptor_cache
 
         # Internal Variables
         self._pb = None         # Protobuf message interfaces
         self._pb_grpc = None    # GRPC Service interfaces
-
-    def load(self):
-        pb, pb_grpc = self.find_stubs()
-        # Checks the gRPC server interfaces are generated or not
-        if not pb or not pb_grpc:
-            raise GrpcServerStartError(
-                "Failed to find gRPC server interface stubs for the service {}.\n"
-                "Run 'python manage.py generate_grpc_stubs to generate them.".format(self.name)
-            )
-
-        servicer = self.find_servicer(pb_grpc)
-
-        declared_methods = self.get_declared_methods(servicer)
-
+        self._file_descriptor = None    # Descriptor of the proto, when loaded at startup
+
+    def load_file_descriptor(self):
+        """
+        Builds the descriptor of the proto of the service at runtime, see `DescriptorLoader`
+        """
+        if self._file_descriptor is None:
+            inclusion_root = getattr(django_settings, 'GRPC_PROTO_PATH', None) or os.path.dirname(self.proto_path)
+            loader = DescriptorLoader(inclusion_root, self.descriptor_cache)
+            self._file_descriptor = loader.load(self.proto_path)
+        return self._file_descriptor
+
+    def get_service_descriptor(self):
+        if self.load_proto:
+            file_descriptor = self.load_file_descriptor()
+        else:
+            pb, pb_grpc = self.find_stubs()
+            # Checks the gRPC server interfaces are generated or not
+            if not pb or not pb_grpc:
+                raise GrpcServerStartError(
+                    "Failed to find gRPC server interface stubs for the service {}.\n"
+                    "Run 'python manage.py generate_grpc_stubs to generate them.".format(self.name)
+                )
+            file_descriptor = pb.DESCRIPTOR
+        if self.name not in file_descriptor.services_by_name:
+            raise AttributeError('No service descriptor found')
+        return file_descriptor.services_by_name[self.name]
+
+    def get_rpc_methods(self, use_asyncio=False, connection_pool=None):
+        """
+        :param connection_pool: ConnectionPool the synchronous views check out their database connections from
+        :return: list of (method descriptor, behavior calling the view with the request and the context) tuples
+        """
+        descriptor = self.get_service_descriptor()
+        declared_methods = list(descriptor.methods_by_name)
+
+        methods = []
         for _rpc in self.rpcs:
             assert isinstance(_rpc, rpc), "Invalid rpc definition {} provided".format(_rpc)
             # Check if the rpc is actually defined in the protocol buffer or not
             if _rpc.name not in declared_methods:
                 raise LookupError("RPC {} doesn't exists in proto declarations".format(_rpc.name))
-            # Add the method definition in servicer
-            setattr(servicer, _rpc.name, MethodType(self._get_rpc_method(_rpc), servicer))
+            if not use_asyncio and issubclass(_rpc.view, AsyncGenericGrpcView):
+                raise GrpcServerStartError(
+                    "RPC {} is served by an async view, which requires the asyncio server".format(_rpc.name))
+            method = descriptor.methods_by_name[_rpc.name]
+            if _rpc.view.response_streaming != method.server_streaming:
+                raise GrpcServerStartError(
+                    "RPC {} is served by a view which does not match its response streaming".format(_rpc.name))
+            if _rpc.view.request_streaming != method.client_streaming:
+                raise GrpcServerStartError(
+                    "RPC {} is served by a view which does not match its request streaming".format(_rpc.name))
+            if _rpc.view.field_mapping is not None:
+                # Compiled at startup rather than on the first request, failing on invalid mappings
+                _rpc.view.compile_converter()
+            methods.append((method, self._get_rpc_method(_rpc, connection_pool)))
             declared_methods.remove(_rpc.name)
 
         # Show warning if a declared RPC is not implemented
         if len(declared_methods):
             print("*WARNING* Missing implementations for the RPCs: {}\n\n".format(declared_methods))
+        return methods
+
+    def get_generic_handler(self, use_asyncio=False, connection_pool=None):
+        """
+        Builds the handler dispatching the RPCs of the service straight to their views, with the message classes
+        of the service descriptor
+        :param connection_pool: ConnectionPool the synchronous views check out their database connections from
+        """
+        descriptor = self.get_service_descriptor()
+        method_handlers = {}
+        for method, behavior in self.get_rpc_methods(use_asyncio, connection_pool):
+            handler = _RPC_METHOD_HANDLERS[(method.client_streaming, method.server_streaming)]
+            response_serializer = GetMessageClass(method.output_type).SerializeToString
+            if self.load_proto:
+                # The views may respond with messages of the generated classes as well as of the runtime ones
+                response_serializer = operator.methodcaller('SerializeToString')
+            method_handlers[method.name] = handler(
+                behavior,
+                request_deserializer=GetMessageClass(method.input_type).FromString,
+                response_serializer=response_serializer,
+            )
+        return grpc.method_handlers_generic_handler(descriptor.full_name, method_handlers)
+
+    def load(self, use_asyncio=False, connection_pool=None):
+        """
+        Patches the servicer class generated by protoc with the views of the RPCs, the server dispatches to the
+        views with `get_generic_handler` instead.
+        :param connection_pool: ConnectionPool the synchronous views check out their database connections from
+        """
+        if self.load_proto:
+            raise GrpcServerStartError(
+                "The service {} is loaded from its proto, without a generated servicer".format(self.name))
+        servicer = self.find_servicer(self.find_stubs()[1])
+        for method, behavior in self.get_rpc_methods(use_asyncio, connection_pool):
+            setattr(servicer, method.name, staticmethod(behavior))
         return servicer
 
     @staticmethod
-    def _get_rpc_method(_rpc: rpc):
-        if issubclass(_rpc.view, ServerStreamGRPCView):
-            def method(*args):
-                yield from _rpc.view(args[1], args[2]).__call__()
+    def _get_rpc_method(_rpc: rpc, connection_pool=None):
+        view = _rpc.view
+        # Async views query the database from the thread of sync_to_async, which the signals are sent on as well
+        if issubclass(view, AsyncServerStreamGRPCView):
+            async def method(request, context):
+                await sync_to_async(request_started.send)(sender=view)
+                try:
+                    async for response in view(request, context)():
+                        yield response
+                finally:
+                    await sync_to_async(request_finished.send)(sender=view)
+        elif issubclass(view, AsyncGenericGrpcView):
+            async def method(request, context):
+                await sync_to_async(request_started.send)(sender=view)
+                try:
+                    return await view(request, context)()
+                finally:
+                    await sync_to_async(request_finished.send)(sender=view)
+        elif view.response_streaming:
+            def method(request, context):
+                with request_scope(view, context, connection_pool):
+                    yield from view(request, context)()
         else:
-            def method(*args):
-                return _rpc.view(args[1], args[2]).__call__()
+            def method(request, context):
+                with request_scope(view, context, connection_pool):
+                    return view(request, context)()
         return method
 
     @staticmethod
@@ -93,14 +199,10 @@ class GRPCService:
         return [x for x in servicer.__dict__ if not x.startswith('__')]
 
     def generate_stubs(self):
-        well_known_protos_include = pkg_resources.resource_filename(
-            'grpc_tools', '_proto')
-        command = [
-            'grpc_tools.protoc',
-            "--proto_path={}".format(django_settings.GRPC_PROTO_PATH),
-            "--proto_path={}".format(well_known_protos_include),
-            "--python_out={}".format(self.stub_destination),
-            "--grpc_python_out={}".format(self.stub_destination),
-        ] + [self.proto_path]
-        if protoc.main(command) != 0:
+        # Codegen tooling is slow to import, and never needed to serve the RPCs
+        from .codegen import StubGenerator
+
+        generator = StubGenerator(django_settings.GRPC_PROTO_PATH, self.stub_destination, jobs=1)
+        _, _, failed = generator.generate([self.proto_path])
+        if failed:
             raise CommandError('Failed to generate proto stubs for {}'.format(self.proto_path))
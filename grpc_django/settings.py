@@ -1,5 +1,6 @@
 from django.conf import settings as django_settings
 
+from .authentication import AuthenticationPipeline, JSONMetadataAuthenticator
 from .service import GRPCService
 from .interfaces import ISettings, IService
 
@@ -20,16 +21,50 @@ class GRPCSettings:
         # No. of worker threads
         self.workers = _settings.server.num_of_workers
 
+        # Whether to run an asyncio server
+        self.use_asyncio = _settings.server.use_asyncio
+
+        # No. of server processes
+        self.processes = _settings.server.num_of_processes
+
+        # Seconds to drain the in-flight RPCs on shutdown
+        self.shutdown_grace_period = _settings.server.shutdown_grace_period
+
+        # Performance tuning options of the server
+        self.server_options = _settings.server.options
+
+        # Port of the Prometheus metrics endpoint
+        self.metrics_port = _settings.server.metrics_port
+
+        # Pool of database connections shared by the worker threads
+        self.connection_pool = _settings.server.connection_pool
+
+        # Warmup of the server before it starts listening
+        self.warmup = _settings.server.warmup
+
         # List of services
         self.services = []
         assert _settings.services, "You must provide at least one gRPC service, in GRPC_SETTINGS.services"
         for service in _settings.services:
             assert isinstance(service, IService), "Invalid service definition provided"
-            self.services.append(GRPCService(service))
+            self.services.append(GRPCService(service, descriptor_cache=_settings.descriptor_cache))
 
         self.auth_user_meta_key = _settings.auth_user_key
 
+        # Authentication of the RPCs
+        authenticators = _settings.authenticators
+        if authenticators is None:
+            authenticators = [JSONMetadataAuthenticator(self.auth_user_meta_key)]
+        self.authentication = AuthenticationPipeline(authenticators)
+
+
+def __getattr__(name):
+    # The settings are resolved on first use rather than on import, importing the views and RPCs of the services
+    if name == 'settings':
+        global settings
+        settings = GRPCSettings()
+        return settings
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
 
-settings = GRPCSettings()
 
 __all__ = ['settings']
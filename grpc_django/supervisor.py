@@ -0,0 +1,161 @@
+import multiprocessing
+import signal
+import sys
+import time
+from multiprocessing.connection import wait
+
+
+class WorkerOutput:
+    """
+    Writes the output of a worker process to a stream shared with the other workers, prefixing each line with the
+    slot of the worker. Complete lines are written at once, so that they don't interleave with the other workers'.
+    """
+
+    def __init__(self, slot, stream=None):
+        self.prefix = "[worker {}] ".format(slot)
+        self.stream = stream if stream else sys.stdout
+        self._line = ''
+
+    def write(self, msg):
+        *lines, self._line = (self._line + msg).split('\n')
+        if lines:
+            self.stream.write(''.join('{}{}\n'.format(self.prefix, line) if line else '\n' for line in lines))
+            self.stream.flush()
+
+    def flush(self):
+        if self._line:
+            self.write('\n')
+
+
+def serve_process(addr, port, max_workers=1, use_asyncio=False, slot=0):
+    """
+    Entrypoint of a worker process of the supervisor, serves the gRPC services on a port shared with
+    the other workers (SO_REUSEPORT) until SIGTERM is received.
+    """
+    import django
+    django.setup()
+
+    from grpc_django.server import serve
+    from grpc_django.settings import settings
+
+    # Metrics are per process, so each one of them has its own endpoint
+    metrics_port = settings.metrics_port + slot if settings.metrics_port else None
+
+    # Interrupts are handled by the supervisor, which terminates the workers
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    stdout = WorkerOutput(slot)
+    try:
+        serve(addr, port, max_workers=max_workers, use_asyncio=use_asyncio, reuse_port=True, stdout=stdout,
+              signals=(signal.SIGTERM,), metrics_port=metrics_port)
+    finally:
+        stdout.flush()
+
+
+class ProcessSupervisor:
+    """
+    Runs a target in a fixed number of worker processes, restarting the ones which exit unexpectedly,
+    until it is interrupted (SIGINT) or terminated (SIGTERM).
+    """
+    # Delay before restarting a crashed worker, doubled on each consecutive crash up to MAX_RESTART_DELAY
+    RESTART_DELAY = 0.5
+    MAX_RESTART_DELAY = 30
+    # Workers which ran for longer than this are not considered to be crash looping
+    MIN_HEALTHY_UPTIME = 10
+    # Seconds to wait for the workers to exit after being terminated, before killing them
+    SHUTDOWN_TIMEOUT = 30
+
+    def __init__(self, target, args=(), num_of_processes=1, stdout=None, shutdown_timeout=None, slot_kwarg=None):
+        """
+        :param slot_kwarg: name of the keyword argument of the target to pass the index of the worker process to
+        """
+        self.target = target
+        self.args = args
+        self.slot_kwarg = slot_kwarg
+        self.num_of_processes = num_of_processes
+        self.shutdown_timeout = shutdown_timeout if shutdown_timeout is not None else self.SHUTDOWN_TIMEOUT
+        self.stdout = stdout if stdout else sys.stdout
+
+        self._context = multiprocessing.get_context('spawn')
+        self._processes = {}        # slot -> (process, start time)
+        self._restart_delays = {}   # slot -> delay before the next restart
+        self._restart_at = {}       # slot of a crashed worker -> time it is restarted at
+        self._stopping = False
+
+    def start_process(self, slot):
+        kwargs = {self.slot_kwarg: slot} if self.slot_kwarg else {}
+        process = self._context.Process(target=self.target, args=self.args, kwargs=kwargs, daemon=True)
+        process.start()
+        self._processes[slot] = (process, time.monotonic())
+        self.stdout.write("Started worker process {} [{}]\n".format(slot, process.pid))
+
+    def start(self):
+        for slot in range(self.num_of_processes):
+            self.start_process(slot)
+
+    def check_processes(self):
+        """
+        Schedules the restart of the crashed workers, and restarts the ones whose delay expired. Never sleeps, so
+        that the other workers keep being supervised and the supervisor can be stopped in the meantime.
+        """
+        for slot, (process, started_at) in list(self._processes.items()):
+            if self._stopping:
+                return
+            if slot not in self._restart_at:
+                if process.is_alive():
+                    continue
+                process.join()
+                uptime = time.monotonic() - started_at
+                delay = self._restart_delays.get(slot, self.RESTART_DELAY) if uptime < self.MIN_HEALTHY_UPTIME \
+                    else self.RESTART_DELAY
+                self.stdout.write("Worker process {} [{}] exited with code {}, restarting in {}s\n".format(
+                    slot, process.pid, process.exitcode, delay))
+                self._restart_delays[slot] = min(delay * 2, self.MAX_RESTART_DELAY)
+                self._restart_at[slot] = time.monotonic() + delay
+            if time.monotonic() >= self._restart_at[slot]:
+                del self._restart_at[slot]
+                self.start_process(slot)
+
+    def get_wait_timeout(self):
+        """
+        :return: seconds to wait for a worker to exit before checking them again, up to the next scheduled restart
+        """
+        if not self._restart_at:
+            return 1
+        return min(1, max(min(self._restart_at.values()) - time.monotonic(), 0))
+
+    def stop(self):
+        self._stopping = True
+        processes = [process for process, _ in self._processes.values()]
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        deadline = time.monotonic() + self.shutdown_timeout
+        for process in processes:
+            process.join(max(deadline - time.monotonic(), 0))
+            if process.is_alive():
+                self.stdout.write("Killing worker process [{}]\n".format(process.pid))
+                process.kill()
+                process.join()
+
+    def _handle_signal(self, signum, frame):
+        self._stopping = True
+
+    def run(self):
+        """
+        Starts the workers and supervises them until SIGINT or SIGTERM is received
+        """
+        previous_handlers = {
+            signum: signal.signal(signum, self._handle_signal) for signum in (signal.SIGINT, signal.SIGTERM)
+        }
+        try:
+            self.start()
+            while not self._stopping:
+                # The crashed workers waiting to be restarted are left out, their sentinels being always ready
+                wait([process.sentinel for slot, (process, _) in self._processes.items()
+                      if slot not in self._restart_at], timeout=self.get_wait_timeout())
+                self.check_processes()
+        finally:
+            self.stop()
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+        self.stdout.write("Stopped all worker processes\n")
@@ -1,5 +1,7 @@
 from .bases import UnaryUnaryServerInterceptor, UnaryStreamServerInterceptor, StreamStreamServerInterceptor, \
     StreamUnaryServerInterceptor
+from .metrics import MetricsInterceptor, start_metrics_server
+from .tracking import AioInFlightInterceptor, InFlightInterceptor
 
 
 def intercept_server(server, *interceptors):
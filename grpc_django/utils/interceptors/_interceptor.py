@@ -201,120 +201,85 @@ def intercept_channel(channel, *interceptors):
     return channel
 
 
-class _InterceptingRpcMethodHandler(grpc.RpcMethodHandler):
-
-    def __init__(self, rpc_method_handler, method, interceptor):
-        self._rpc_method_handler = rpc_method_handler
-        self._method = method
-        self._interceptor = interceptor
-
-    @property
-    def request_streaming(self):
-        return self._rpc_method_handler.request_streaming
-
-    @property
-    def response_streaming(self):
-        return self._rpc_method_handler.response_streaming
-
-    @property
-    def request_deserializer(self):
-        return self._rpc_method_handler.request_deserializer
-
-    @property
-    def response_serializer(self):
-        return self._rpc_method_handler.response_serializer
-
-    @property
-    def unary_unary(self):
-        if not isinstance(self._interceptor, UnaryUnaryServerInterceptor):
-            return self._rpc_method_handler.unary_unary
-
-        def adaptation(request, servicer_context):
-
-            def handler(request, servicer_context):
-                return self._rpc_method_handler.unary_unary(request,
-                                                            servicer_context)
-
-            return self._interceptor.intercept_unary_unary_handler(
-                handler, self._method, request, servicer_context)
-
-        return adaptation
-
-    @property
-    def unary_stream(self):
-        if not isinstance(self._interceptor, UnaryStreamServerInterceptor):
-            return self._rpc_method_handler.unary_stream
-
-        def adaptation(request, servicer_context):
-
-            def handler(request, servicer_context):
-                return self._rpc_method_handler.unary_stream(request,
-                                                             servicer_context)
-
-            return self._interceptor.intercept_unary_stream_handler(
-                handler, self._method, request, servicer_context)
-
-        return adaptation
-
-    @property
-    def stream_unary(self):
-        if not isinstance(self._interceptor, StreamUnaryServerInterceptor):
-            return self._rpc_method_handler.stream_unary
-
-        def adaptation(request_iterator, servicer_context):
-
-            def handler(request_iterator, servicer_context):
-                return self._rpc_method_handler.stream_unary(request_iterator,
-                                                             servicer_context)
-
-            return self._interceptor.intercept_stream_unary_handler(
-                handler, self._method, request_iterator, servicer_context)
-
-        return adaptation
-
-    @property
-    def stream_stream(self):
-        if not isinstance(self._interceptor,
-                          StreamStreamServerInterceptor):
-            return self._rpc_method_handler.stream_stream
-
-        def adaptation(request_iterator, servicer_context):
-
-            def handler(request_iterator, servicer_context):
-                return self._rpc_method_handler.stream_stream(request_iterator,
-                                                              servicer_context)
-
-            return self._interceptor.intercept_stream_stream_handler(
-                handler, self._method, request_iterator, servicer_context)
-
-        return adaptation
+def _bind(intercept, handler, method):
+    def intercepted(request_or_iterator, servicer_context):
+        return intercept(handler, method, request_or_iterator, servicer_context)
+    return intercepted
+
+
+# RPC method handler factory, method handler behavior attribute, interceptor base and interception method
+# of each RPC type
+_RPC_TYPES = {
+    (False, False): (grpc.unary_unary_rpc_method_handler, 'unary_unary', UnaryUnaryServerInterceptor,
+                     'intercept_unary_unary_handler'),
+    (False, True): (grpc.unary_stream_rpc_method_handler, 'unary_stream', UnaryStreamServerInterceptor,
+                    'intercept_unary_stream_handler'),
+    (True, False): (grpc.stream_unary_rpc_method_handler, 'stream_unary', StreamUnaryServerInterceptor,
+                    'intercept_stream_unary_handler'),
+    (True, True): (grpc.stream_stream_rpc_method_handler, 'stream_stream', StreamStreamServerInterceptor,
+                   'intercept_stream_stream_handler'),
+}
+
+
+def _intercept_rpc_method_handler(rpc_method_handler, method, interceptors):
+    """
+    Compiles the interceptor chain of a method into a single RPC method handler, whose behavior calls the
+    applicable interceptors without allocating anything per call. As when each interceptor wrapped the server,
+    the last interceptor is the outermost one and gets control first.
+    """
+    factory, behavior_name, interceptor_type, intercept_name = _RPC_TYPES[
+        (rpc_method_handler.request_streaming, rpc_method_handler.response_streaming)]
+    behavior = getattr(rpc_method_handler, behavior_name)
+    applicable = [interceptor for interceptor in interceptors if isinstance(interceptor, interceptor_type)]
+    if not applicable:
+        return rpc_method_handler
+    for interceptor in applicable:
+        behavior = _bind(getattr(interceptor, intercept_name), behavior, method)
+    return factory(behavior, request_deserializer=rpc_method_handler.request_deserializer,
+                   response_serializer=rpc_method_handler.response_serializer)
 
 
 class _InterceptingGenericRpcHandler(grpc.GenericRpcHandler):
 
-    def __init__(self, handler, interceptor):
+    def __init__(self, handler, interceptors):
         self._handler = handler
-        self._interceptor = interceptor
+        self._interceptors = interceptors
+        # RPC method handler last returned by the wrapped handler for each method name, and its compiled
+        # intercepted handler
+        self._method_handlers = {}
 
     def service(self, handler_call_details):
+        # The wrapped handler is asked on every call, as it may dispatch on more than the method name (e.g. the
+        # invocation metadata), so the chain can't be compiled when it is registered. It is compiled on the first
+        # call, and only again when the handler returns another RPC method handler
         result = self._handler.service(handler_call_details)
-        if result:
-            result = _InterceptingRpcMethodHandler(
-                result, handler_call_details.method, self._interceptor)
-        return result
+        if not result:
+            return result
+        cached = self._method_handlers.get(handler_call_details.method)
+        if cached is not None and cached[0] is result:
+            return cached[1]
+        intercepted = _intercept_rpc_method_handler(result, handler_call_details.method, self._interceptors)
+        self._method_handlers[handler_call_details.method] = (result, intercepted)
+        return intercepted
 
 
 class _InterceptingServer(grpc.Server):
 
-    def __init__(self, server, interceptor):
+    def __init__(self, server, interceptors):
         self._server = server
-        self._interceptor = interceptor
+        self._interceptors = tuple(interceptors)
 
     def add_generic_rpc_handlers(self, generic_rpc_handlers):
-        handlers = (_InterceptingGenericRpcHandler(handler, self._interceptor)
-                    for handler in generic_rpc_handlers)
+        handlers = tuple(_InterceptingGenericRpcHandler(handler, self._interceptors)
+                         for handler in generic_rpc_handlers)
         return self._server.add_generic_rpc_handlers(handlers)
 
+    def add_registered_method_handlers(self, service_name, method_handlers):
+        return self._server.add_registered_method_handlers(service_name, {
+            name: _intercept_rpc_method_handler(handler, '/{}/{}'.format(service_name, name), self._interceptors)
+            for name, handler in method_handlers.items()
+        })
+
     def add_insecure_port(self, *args, **kwargs):
         return self._server.add_insecure_port(*args, **kwargs)
 
@@ -327,9 +292,12 @@ class _InterceptingServer(grpc.Server):
     def stop(self, *args, **kwargs):
         return self._server.stop(*args, **kwargs)
 
+    def wait_for_termination(self, *args, **kwargs):
+        return self._server.wait_for_termination(*args, **kwargs)
+
 
 def intercept_server(server, *interceptors):
-    for interceptor in reversed(interceptors):
+    for interceptor in interceptors:
         if not isinstance(interceptor, UnaryUnaryServerInterceptor) and \
            not isinstance(interceptor, UnaryStreamServerInterceptor) and \
            not isinstance(interceptor, StreamUnaryServerInterceptor) and \
@@ -339,5 +307,7 @@ def intercept_server(server, *interceptors):
                             'grpc.UnaryStreamServerInterceptor or '
                             'grpc.StreamUnaryServerInterceptor or '
                             'grpc.StreamStreamServerInterceptor or ')
-        server = _InterceptingServer(server, interceptor)
-    return server
+    if isinstance(server, _InterceptingServer):
+        # Flatten the chain, the interceptors of the server keep getting control before the ones given here
+        return _InterceptingServer(server._server, interceptors + server._interceptors)
+    return _InterceptingServer(server, interceptors)
@@ -0,0 +1,207 @@
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .bases import UnaryUnaryServerInterceptor, UnaryStreamServerInterceptor, StreamUnaryServerInterceptor, \
+    StreamStreamServerInterceptor
+
+DEFAULT_LATENCY_BUCKETS = (.001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10)
+DEFAULT_STREAM_MESSAGE_BUCKETS = (1, 10, 100, 1000, 10000, 100000, 1000000)
+
+_now = time.perf_counter
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class _Histogram:
+    __slots__ = ('bounds', 'counts', 'sum')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        # Non cumulative counts per bucket, the last one being +Inf
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    def cumulative_counts(self):
+        total = 0
+        for count in self.counts:
+            total += count
+            yield total
+
+
+class _MethodMetrics:
+    """
+    Metrics of a single RPC method, updated under its own lock
+    """
+    __slots__ = ('service', 'method', 'rpc_type', 'lock', 'handled', 'latency', 'messages_sent', 'bytes_sent',
+                 'stream_messages')
+
+    def __init__(self, full_method, rpc_type, latency_buckets, stream_message_buckets):
+        self.service, _, self.method = full_method.lstrip('/').rpartition('/')
+        self.rpc_type = rpc_type
+        self.lock = threading.Lock()
+        self.handled = {}   # status code name -> count
+        self.latency = _Histogram(latency_buckets)
+        self.messages_sent = 0
+        self.bytes_sent = 0
+        self.stream_messages = _Histogram(stream_message_buckets) if rpc_type.endswith('stream') else None
+
+    def record(self, code, latency, messages, size):
+        with self.lock:
+            self.handled[code] = self.handled.get(code, 0) + 1
+            self.latency.observe(latency)
+            self.messages_sent += messages
+            self.bytes_sent += size
+            if self.stream_messages is not None:
+                self.stream_messages.observe(messages)
+
+
+def _get_code(servicer_context, default='OK'):
+    # Views report errors by setting the code on the context rather than raising them. When the handler raises,
+    # e.g. the exception of `context.abort()`, the client receives the code set on the context, UNKNOWN otherwise
+    try:
+        code = servicer_context.code()
+    except AttributeError:
+        return default
+    return default if code is None else code.name
+
+
+class MetricsInterceptor(UnaryUnaryServerInterceptor, UnaryStreamServerInterceptor, StreamUnaryServerInterceptor,
+                         StreamStreamServerInterceptor):
+    """
+    Records per-method request counts by status code, latency histograms, messages per stream and bytes sent,
+    which can be rendered in the Prometheus text format.
+    """
+
+    def __init__(self, latency_buckets=DEFAULT_LATENCY_BUCKETS, stream_message_buckets=DEFAULT_STREAM_MESSAGE_BUCKETS):
+        self.latency_buckets = tuple(latency_buckets)
+        self.stream_message_buckets = tuple(stream_message_buckets)
+        self._methods = {}
+        self._lock = threading.Lock()
+
+    def _get_method_metrics(self, method, rpc_type):
+        metrics = self._methods.get(method)
+        if metrics is None:
+            with self._lock:
+                metrics = self._methods.setdefault(method, _MethodMetrics(
+                    method, rpc_type, self.latency_buckets, self.stream_message_buckets))
+        return metrics
+
+    def _intercept_unary_response(self, rpc_type, handler, method, request, servicer_context):
+        metrics = self._get_method_metrics(method, rpc_type)
+        start, code, messages, size = _now(), 'UNKNOWN', 0, 0
+        try:
+            response = handler(request, servicer_context)
+            code = _get_code(servicer_context)
+            # The response message is only sent along an OK status
+            if code == 'OK':
+                messages, size = 1, response.ByteSize()
+            return response
+        except Exception:
+            code = _get_code(servicer_context, 'UNKNOWN')
+            raise
+        finally:
+            metrics.record(code, _now() - start, messages, size)
+
+    def _intercept_stream_response(self, rpc_type, handler, method, request, servicer_context):
+        metrics = self._get_method_metrics(method, rpc_type)
+        start, code, messages, size = _now(), 'UNKNOWN', 0, 0
+        try:
+            for response in handler(request, servicer_context):
+                messages += 1
+                size += response.ByteSize()
+                yield response
+            code = _get_code(servicer_context)
+        except GeneratorExit:
+            code = 'CANCELLED'
+            raise
+        except Exception:
+            code = _get_code(servicer_context, 'UNKNOWN')
+            raise
+        finally:
+            metrics.record(code, _now() - start, messages, size)
+
+    def intercept_unary_unary_handler(self, handler, method, request, servicer_context):
+        return self._intercept_unary_response('unary', handler, method, request, servicer_context)
+
+    def intercept_unary_stream_handler(self, handler, method, request, servicer_context):
+        return self._intercept_stream_response('server_stream', handler, method, request, servicer_context)
+
+    def intercept_stream_unary_handler(self, handler, method, request_iterator, servicer_context):
+        return self._intercept_unary_response('client_stream', handler, method, request_iterator, servicer_context)
+
+    def intercept_stream_stream_handler(self, handler, method, request_iterator, servicer_context):
+        return self._intercept_stream_response('bidi_stream', handler, method, request_iterator, servicer_context)
+
+    def render(self):
+        """
+        :return: the metrics in the Prometheus text exposition format
+        """
+        handled, latency, messages, sent_bytes, stream_messages = [], [], [], [], []
+        for metrics in list(self._methods.values()):
+            labels = 'grpc_type="{}",grpc_service="{}",grpc_method="{}"'.format(
+                metrics.rpc_type, metrics.service, metrics.method)
+            with metrics.lock:
+                for code, count in sorted(metrics.handled.items()):
+                    handled.append('grpc_server_handled_total{{{},grpc_code="{}"}} {}'.format(labels, code, count))
+                latency.extend(self._render_histogram('grpc_server_handling_seconds', labels, metrics.latency))
+                messages.append("grpc_server_msg_sent_total{{{}}} {}".format(labels, metrics.messages_sent))
+                sent_bytes.append("grpc_server_sent_bytes_total{{{}}} {}".format(labels, metrics.bytes_sent))
+                if metrics.stream_messages is not None:
+                    stream_messages.extend(self._render_histogram(
+                        'grpc_server_stream_msgs_sent', labels, metrics.stream_messages))
+        lines = [
+            "# HELP grpc_server_handled_total Total number of RPCs completed on the server, regardless of success "
+            "or failure.",
+            "# TYPE grpc_server_handled_total counter",
+        ] + handled + [
+            "# HELP grpc_server_handling_seconds Histogram of response latency (seconds) of gRPC that had been "
+            "application-level handled by the server.",
+            "# TYPE grpc_server_handling_seconds histogram",
+        ] + latency + [
+            "# HELP grpc_server_msg_sent_total Total number of gRPC stream messages sent by the server.",
+            "# TYPE grpc_server_msg_sent_total counter",
+        ] + messages + [
+            "# HELP grpc_server_sent_bytes_total Total number of serialized bytes of the messages sent by the server.",
+            "# TYPE grpc_server_sent_bytes_total counter",
+        ] + sent_bytes + [
+            "# HELP grpc_server_stream_msgs_sent Histogram of the number of messages sent per streaming RPC.",
+            "# TYPE grpc_server_stream_msgs_sent histogram",
+        ] + stream_messages
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _render_histogram(name, labels, histogram):
+        bounds = [repr(float(bound)) for bound in histogram.bounds] + ['+Inf']
+        for bound, count in zip(bounds, histogram.cumulative_counts()):
+            yield '{}_bucket{{{},le="{}"}} {}'.format(name, labels, bound, count)
+        yield "{}_sum{{{}}} {}".format(name, labels, histogram.sum)
+        yield "{}_count{{{}}} {}".format(name, labels, sum(histogram.counts))
+
+
+def start_metrics_server(interceptor, addr, port):
+    """
+    Exposes the metrics of the interceptor in the Prometheus format over HTTP, from a daemon thread.
+    :return: the HTTP server, call `shutdown()` to stop it
+    """
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = interceptor.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', PROMETHEUS_CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((addr, int(port)), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='grpc-django-metrics', daemon=True).start()
+    return server
@@ -0,0 +1,120 @@
+import inspect
+import threading
+
+import grpc
+
+from .bases import UnaryUnaryServerInterceptor, UnaryStreamServerInterceptor, StreamUnaryServerInterceptor, \
+    StreamStreamServerInterceptor
+
+
+class _InFlightCounter(object):
+    def __init__(self):
+        self._count = 0
+        self._condition = threading.Condition()
+
+    @property
+    def count(self):
+        return self._count
+
+    def _enter(self):
+        with self._condition:
+            self._count += 1
+
+    def _exit(self):
+        with self._condition:
+            self._count -= 1
+            if not self._count:
+                self._condition.notify_all()
+
+    def wait_for_idle(self, timeout=None):
+        """
+        Blocks until no RPC is in flight, or the timeout expires.
+        :return: True if no RPC is in flight
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._count, timeout)
+
+
+class InFlightInterceptor(_InFlightCounter, UnaryUnaryServerInterceptor, UnaryStreamServerInterceptor,
+                          StreamUnaryServerInterceptor, StreamStreamServerInterceptor):
+    """
+    Keeps count of the RPCs being processed by the server, so that they can be drained on shutdown.
+    """
+
+    def _intercept_unary_response(self, handler, request, servicer_context):
+        self._enter()
+        try:
+            return handler(request, servicer_context)
+        finally:
+            self._exit()
+
+    def _intercept_stream_response(self, handler, request, servicer_context):
+        self._enter()
+        try:
+            yield from handler(request, servicer_context)
+        finally:
+            self._exit()
+
+    def intercept_unary_unary_handler(self, handler, method, request, servicer_context):
+        return self._intercept_unary_response(handler, request, servicer_context)
+
+    def intercept_unary_stream_handler(self, handler, method, request, servicer_context):
+        return self._intercept_stream_response(handler, request, servicer_context)
+
+    def intercept_stream_unary_handler(self, handler, method, request_iterator, servicer_context):
+        return self._intercept_unary_response(handler, request_iterator, servicer_context)
+
+    def intercept_stream_stream_handler(self, handler, method, request_iterator, servicer_context):
+        return self._intercept_stream_response(handler, request_iterator, servicer_context)
+
+
+class AioInFlightInterceptor(_InFlightCounter, grpc.aio.ServerInterceptor):
+    """
+    Asyncio counterpart of `InFlightInterceptor`, counting the RPCs of the async views run on the event loop as well
+    as the ones of the synchronous views run by the worker threads.
+    """
+    # Behaviors of the method handlers, and whether they stream their responses
+    _BEHAVIORS = (('unary_unary', False), ('unary_stream', True), ('stream_unary', False), ('stream_stream', True))
+
+    async def intercept_service(self, continuation, handler_call_details):
+        handler = await continuation(handler_call_details)
+        if handler is None:
+            return None
+        for name, response_streaming in self._BEHAVIORS:
+            behavior = getattr(handler, name)
+            if behavior is not None:
+                return handler._replace(**{name: self._track(behavior, response_streaming)})
+        return handler
+
+    def _track(self, behavior, response_streaming):
+        # The server tells the async behaviors from the synchronous ones by their type, which is kept
+        if inspect.isasyncgenfunction(behavior):
+            async def tracked(request, servicer_context):
+                self._enter()
+                try:
+                    async for response in behavior(request, servicer_context):
+                        yield response
+                finally:
+                    self._exit()
+        elif inspect.iscoroutinefunction(behavior):
+            async def tracked(request, servicer_context):
+                self._enter()
+                try:
+                    return await behavior(request, servicer_context)
+                finally:
+                    self._exit()
+        elif response_streaming:
+            def tracked(request, servicer_context):
+                self._enter()
+                try:
+                    yield from behavior(request, servicer_context)
+                finally:
+                    self._exit()
+        else:
+            def tracked(request, servicer_context):
+                self._enter()
+                try:
+                    return behavior(request, servicer_context)
+                finally:
+                    self._exit()
+        return tracked
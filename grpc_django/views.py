@@ -1,11 +1,24 @@
+import contextlib
+import datetime
 import json
-import traceback
+import queue
+import threading
+from itertools import islice
 
-from django.contrib.auth.models import AnonymousUser
-from django.db.models import QuerySet
+from asgiref.sync import sync_to_async
+from django.core import signing
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Q, QuerySet
+from django.db.models.query import ModelIterable
+from google.protobuf.message import Message
 
-from .models import ContextUser
-from .protobuf_to_dict import dict_to_protobuf
+from .authentication import LazyUser
+from .converters import ModelToProtobufConverter
+from .field_mask import get_field_mask_tree, mask_values
+from .projection import apply_projection, get_projection
+from .protos import GetMessageClass
+from .protobuf_to_dict import dict_to_protobuf, dicts_to_protobufs, protobufs_to_dicts
 from .exceptions import InvalidArgument, NotAuthenticated, ExceptionHandler
 
 
@@ -21,21 +34,34 @@ class GenericGrpcView(object):
     # If you want to use object lookups other than pk, set 'lookup_field'.
     # For more complex lookup requirements override `get_object()`.
     lookup_field = "pk"
+    # Whether the view serves RPCs streaming requests and/or responses
+    request_streaming = False
+    response_streaming = False
+    # Set 'auto_projection' to only fetch the columns of the fields of the response proto from the database, and
+    # the related objects of its nested messages along with the objects, see `get_projection()`
+    auto_projection = False
+    # Additional fields fetched by the projection, e.g. model fields the serializer builds response fields from
+    projection_fields = ()
+    # Request field identifier of the optional `google.protobuf.FieldMask` of the response fields to populate.
+    # The projection then only fetches the columns of the masked fields, the nested messages being fetched whole,
+    # if the serializer has a mapping of `fields` like the Django REST framework ones, which are dropped when unmasked.
+    field_mask_kwarg = "field_mask"
+    # Set 'field_mapping' to build the response messages straight from the objects instead of with the serializer,
+    # as a list of the names of the fields of the message, or a dictionary of their sources, see
+    # `ModelToProtobufConverter`
+    field_mapping = None
 
     def __init__(self, request, context):
         assert self.response_proto, "Missing response_proto declaration"
-        self.request_user = self.get_user(context)
+        # The user is only authenticated once accessed
+        self.request_user = LazyUser(self.get_user, context)
         self.request = request
         self.context = context
 
     @staticmethod
     def get_user(context):
         from .settings import settings
-        user_json = json.loads(dict(context.invocation_metadata()).get(settings.auth_user_meta_key, "{}"))
-        if user_json is None or len(user_json) == 0:
-            return AnonymousUser()
-        else:
-            return ContextUser(**user_json)
+        return settings.authentication.authenticate(context)
 
     def get_queryset(self):
         assert self.queryset is not None, (
@@ -46,8 +72,101 @@ class GenericGrpcView(object):
         if isinstance(queryset, QuerySet):
             # Ensure queryset is re-evaluated on each request.
             queryset = queryset.all()
+            # Querysets of dictionaries or tuples already select their fields
+            if self.auto_projection and issubclass(queryset._iterable_class, ModelIterable):
+                queryset = self.apply_projection(queryset)
         return queryset
 
+    @classmethod
+    def get_response_descriptor(cls):
+        """
+        :return: descriptor of the message the objects of the queryset are serialized into
+        """
+        return cls.response_proto.DESCRIPTOR
+
+    def get_projection_fields(self):
+        """
+        Override this function to fetch additional fields
+        :return: list of the additional fields of the projection
+        """
+        fields = list(self.projection_fields)
+        if isinstance(self.field_mapping, dict):
+            # Attributes the fields are read from, the related ones by their lookup
+            for source in self.field_mapping.values():
+                if isinstance(source, str) and source.replace('.', '__') not in fields:
+                    fields.append(source.replace('.', '__'))
+        return fields
+
+    def get_projection(self, queryset):
+        """
+        Override this function to customise the projection of the queryset
+        :return: Projection of the fields to fetch, and of the relations to select and prefetch
+        """
+        field_mask = self.get_field_mask()
+        # Only the serializers dropping the unmasked fields, e.g. the Django REST framework ones, do not read them
+        if self.field_mapping is None and self.serializer_class is not None and \
+                not hasattr(self.serializer_class, 'fields'):
+            field_mask = None
+        return get_projection(queryset.model, self.get_response_descriptor(), tuple(self.get_projection_fields()),
+                              fields=frozenset(field_mask) if field_mask is not None else None)
+
+    def apply_projection(self, queryset):
+        return apply_projection(queryset, self.get_projection(queryset))
+
+    def get_field_mask(self):
+        """
+        :return: field mask tree of the requested fields of the response descriptor, None for all of them
+        """
+        if not hasattr(self, '_field_mask'):
+            paths = getattr(getattr(self.request, self.field_mask_kwarg, None), 'paths', None)
+            self._field_mask = get_field_mask_tree(paths, self.get_response_descriptor()) if paths else None
+        return self._field_mask
+
+    @classmethod
+    def compile_converter(cls):
+        """
+        :return: converter of the objects into response messages of the `field_mapping`, compiled once per view
+        """
+        converter = cls.__dict__.get('_converter')
+        if converter is None:
+            converter = ModelToProtobufConverter(GetMessageClass(cls.get_response_descriptor()), cls.field_mapping,
+                                                 getattr(cls.queryset, 'model', None))
+            cls._converter = converter
+        return converter
+
+    def get_converter(self):
+        """
+        :return: converter of the objects, restricted to the fields of the field mask of the request if any
+        """
+        if not hasattr(self, '_request_converter'):
+            field_mask = self.get_field_mask()
+            converter = self.compile_converter()
+            self._request_converter = converter if field_mask is None else converter.mask(field_mask)
+        return self._request_converter
+
+    def serialize(self, obj):
+        """
+        Serializes an object, restricted to the fields of the field mask of the request if any
+        :return: dictionary, or message when built straight from the object with the `field_mapping`
+        """
+        if self.field_mapping is not None:
+            return self.get_converter()(obj)
+        field_mask = self.get_field_mask()
+        serializer = self.serializer_class(obj)
+        if field_mask is None:
+            return serializer.data
+        fields = getattr(serializer, 'fields', None)
+        if fields is not None:
+            # The fields dropped from Django REST framework serializers are not evaluated
+            for name in [name for name in fields if name not in field_mask]:
+                fields.pop(name)
+        return mask_values(serializer.data, field_mask)
+
+    def to_response(self, values):
+        if isinstance(values, Message):
+            return values
+        return dict_to_protobuf(self.response_proto, values=values, ignore_none=True)
+
     def check_object_permissions(self, user, obj):
         """
         Override this function to check if the request should be permitted for a given object.
@@ -62,9 +181,8 @@ class GenericGrpcView(object):
         :param user:
         :return:
         """
-        if self.requires_authentication and isinstance(user, AnonymousUser):
+        if self.requires_authentication and not user.is_authenticated:
             raise NotAuthenticated
-        pass
 
     def get_object(self):
         if not hasattr(self.request, self.lookup_kwarg):
@@ -76,14 +194,116 @@ class GenericGrpcView(object):
 
 
 class RetrieveGRPCView(GenericGrpcView):
+    # ResponseCache of the responses, disabled if not set
+    response_cache = None
+
+    def get_cache_models(self):
+        """
+        Override this function to invalidate the cached responses on changes of other models
+        :return: models the responses are built from
+        """
+        model = getattr(self.queryset, 'model', None)
+        return [model] if model is not None else []
+
+    def get_cache_scope(self):
+        """
+        Responses are cached per authentication scope, override this function to share them between users
+        :return: string identifying the users the response is visible to
+        """
+        from .settings import settings
+        return settings.authentication.get_credentials(self.context)
+
     def retrieve(self):
         """
         Override this function to implement retrieval
         :return: dictionary of object
         """
         instance = self.get_object()
-        serializer = self.serializer_class(instance)
-        return serializer.data
+        return self.serialize(instance)
+
+    def __call__(self):
+        try:
+            self.perform_authentication(self.request_user)
+            if self.response_cache is not None:
+                return self.response_cache.get_or_set(self, self.get_response)
+            return self.get_response()
+        except Exception as ex:
+            self.context = ExceptionHandler(self.context, self.__class__.__name__)(ex)
+            return self.response_proto()
+
+    def get_response(self):
+        return self.to_response(self.retrieve())
+
+
+class BatchRetrieveGRPCView(GenericGrpcView):
+    """
+    Retrieves the objects of a repeated field of lookup values in one go, with a single `in_bulk` query, and
+    responds with the serialized objects in the order of the request, and the lookup values of the missing ones.
+    """
+    # Repeated lookup field identifier in request proto
+    lookup_kwarg = "ids"
+    # Maximum number of lookup values of a request
+    max_batch_size = 1000
+    # Repeated result and not found lookup values field identifiers in response proto
+    results_field = "results"
+    not_found_field = "not_found"
+
+    @classmethod
+    def get_response_descriptor(cls):
+        return cls.response_proto.DESCRIPTOR.fields_by_name[cls.results_field].message_type
+
+    def get_projection_fields(self):
+        # The objects are keyed by their lookup field
+        fields = super().get_projection_fields()
+        return fields + [self.lookup_field] if self.lookup_field != "pk" else fields
+
+    def get_lookup_values(self):
+        if not hasattr(self.request, self.lookup_kwarg):
+            raise InvalidArgument("Missing argument {}".format(self.lookup_kwarg))
+        # Duplicates are only retrieved once
+        values = list(dict.fromkeys(getattr(self.request, self.lookup_kwarg)))
+        if len(values) > self.max_batch_size:
+            raise InvalidArgument("Too many values of {}, should be at most {}".format(
+                self.lookup_kwarg, self.max_batch_size))
+        return values
+
+    def get_objects(self):
+        """
+        :return: tuple of the list of the objects found, and of the lookup values of the missing ones
+        """
+        values = self.get_lookup_values()
+        queryset = self.get_queryset()
+        opts = queryset.model._meta
+        field = opts.pk if self.lookup_field == "pk" else opts.get_field(self.lookup_field)
+        # The objects are keyed by the values of the model field, e.g. UUIDs of the strings of the request
+        lookups = [(value, field.to_python(value)) for value in values]
+        objects = queryset.in_bulk([lookup for _, lookup in lookups], field_name=self.lookup_field)
+        found, not_found = [], []
+        for value, lookup in lookups:
+            if lookup in objects:
+                self.check_object_permissions(self.request_user, objects[lookup])
+                found.append(objects[lookup])
+            else:
+                not_found.append(value)
+        return found, not_found
+
+    def serialize_batch(self, objects):
+        """
+        Override this function to serialize the objects in one go (e.g. with a `many=True` serializer)
+        :return: list of dictionaries
+        """
+        return [self.serialize(obj) for obj in objects]
+
+    def retrieve(self):
+        """
+        Override this function to implement retrieval
+        :return: dictionary of the batch
+        """
+        objects, not_found = self.get_objects()
+        return {
+            self.results_field: self.serialize_batch(objects),
+            self.not_found_field: not_found,
+        }
 
     def __call__(self):
         try:
@@ -91,18 +311,439 @@ class RetrieveGRPCView(GenericGrpcView):
             result = self.retrieve()
             return dict_to_protobuf(self.response_proto, values=result, ignore_none=True)
         except Exception as ex:
-            self.context = ExceptionHandler(self.context).__call__(ex, traceback.format_exc())
+            self.context = ExceptionHandler(self.context, self.__class__.__name__)(ex)
+            return self.response_proto()
+
+
+class _PageTokenEncoder(DjangoJSONEncoder):
+    """
+    Keeps the microseconds of times, which DjangoJSONEncoder truncates to milliseconds and so would
+    make the keyset filter match the last row of the previous page again
+    """
+    def default(self, o):
+        if isinstance(o, datetime.datetime) or isinstance(o, datetime.time) and o.utcoffset() is None:
+            return o.isoformat()
+        # Timezone-aware times are rejected as before
+        return super().default(o)
+
+
+class _PageTokenSerializer:
+    """
+    Serializes keyset values of page tokens, which may include dates, decimals or UUIDs
+    """
+    @staticmethod
+    def dumps(obj):
+        return json.dumps(obj, cls=_PageTokenEncoder, separators=(',', ':')).encode('latin-1')
+
+    @staticmethod
+    def loads(data):
+        return json.loads(data.decode('latin-1'))
+
+
+class PaginatedListGRPCView(GenericGrpcView):
+    """
+    Lists the queryset a page at a time using keyset (cursor) pagination. The request carries an
+    opaque page token holding the ordering values of the last row of the previous page, so every
+    page is fetched with an indexed range filter instead of an OFFSET scan.
+    """
+    # Fields to order and paginate the queryset by, prefix with '-' for descending order.
+    # The combination must be unique, defaults to ('lookup_field',)
+    ordering = None
+    page_size = 100
+    max_page_size = 1000
+    # Page size and page token field identifiers in request proto
+    page_size_kwarg = "page_size"
+    page_token_kwarg = "page_token"
+    # Repeated result and next page token field identifiers in response proto
+    results_field = "results"
+    next_page_token_field = "next_page_token"
+    page_token_salt = "grpc_django.views.PaginatedListGRPCView"
+
+    def get_ordering(self):
+        return tuple(self.ordering) if self.ordering else (self.lookup_field,)
+
+    @classmethod
+    def get_response_descriptor(cls):
+        return cls.response_proto.DESCRIPTOR.fields_by_name[cls.results_field].message_type
+
+    def get_projection_fields(self):
+        # The page token holds the ordering values of the last object of the page
+        return super().get_projection_fields() + [field.lstrip('-') for field in self.get_ordering()]
+
+    def get_page_size(self):
+        page_size = getattr(self.request, self.page_size_kwarg, None)
+        if not page_size:
+            return self.page_size
+        if page_size < 0:
+            raise InvalidArgument("Invalid argument {}".format(self.page_size_kwarg))
+        return min(page_size, self.max_page_size)
+
+    def encode_page_token(self, values):
+        return signing.dumps(values, salt=self.page_token_salt, serializer=_PageTokenSerializer, compress=True)
+
+    def decode_page_token(self, token):
+        try:
+            values = signing.loads(token, salt=self.page_token_salt, serializer=_PageTokenSerializer)
+        except (signing.BadSignature, ValueError):
+            raise InvalidArgument("Invalid page token")
+        if not isinstance(values, list) or len(values) != len(self.get_ordering()):
+            raise InvalidArgument("Invalid page token")
+        return values
+
+    @staticmethod
+    def get_ordering_value(obj, field):
+        for attr in field.split('__'):
+            obj = obj[attr] if isinstance(obj, dict) else getattr(obj, attr)
+        return obj
+
+    def get_keyset_filter(self, values):
+        """
+        Builds the filter selecting rows after the given ordering values, i.e.
+        (a > x) OR (a = x AND b > y) OR ...
+        """
+        keyset, equal = Q(), {}
+        for field, value in zip(self.get_ordering(), values):
+            name = field.lstrip('-')
+            lookup = '{}__lt' if field.startswith('-') else '{}__gt'
+            keyset |= Q(**equal, **{lookup.format(name): value})
+            equal[name] = value
+        return keyset
+
+    def paginate_queryset(self, queryset):
+        """
+        :return: tuple of the list of objects in the requested page, and the token of the next page
+        """
+        ordering = self.get_ordering()
+        page_size = self.get_page_size()
+        queryset = queryset.order_by(*ordering)
+        token = getattr(self.request, self.page_token_kwarg, None)
+        if token:
+            queryset = queryset.filter(self.get_keyset_filter(self.decode_page_token(token)))
+        page = list(queryset[:page_size + 1])
+        if len(page) <= page_size:
+            return page, ""
+        page = page[:page_size]
+        return page, self.encode_page_token(
+            [self.get_ordering_value(page[-1], field.lstrip('-')) for field in ordering])
+
+    def list(self):
+        """
+        Override this function to implement listing
+        :return: dictionary of the page
+        """
+        page, next_page_token = self.paginate_queryset(self.get_queryset())
+        return {
+            self.results_field: [self.serialize(obj) for obj in page],
+            self.next_page_token_field: next_page_token,
+        }
+
+    def __call__(self):
+        try:
+            self.perform_authentication(self.request_user)
+            result = self.list()
+            return dict_to_protobuf(self.response_proto, values=result, ignore_none=True)
+        except Exception as ex:
+            self.context = ExceptionHandler(self.context, self.__class__.__name__)(ex)
             return self.response_proto()
 
 
 class ServerStreamGRPCView(GenericGrpcView):
+    response_streaming = True
+    # Set 'batch_size' to pull rows from the queryset in batches, which are serialized and converted
+    # to protocol buffers in bulk. Without a 'serializer_class' the rows are expected to be dictionaries,
+    # e.g. a `queryset.values(...)`.
+    batch_size = None
+    # Set 'chunk_size' to stream a queryset with `QuerySet.iterator()`, which fetches rows from the database
+    # in chunks (over a server-side cursor where the backend supports them) instead of loading and caching
+    # the whole result set before the first message is sent.
+    chunk_size = None
+
+    def get_iterator(self, queryset):
+        if self.chunk_size and isinstance(queryset, QuerySet):
+            return queryset.iterator(chunk_size=self.chunk_size)
+        return iter(queryset)
+
+    def serialize_batch(self, objects):
+        """
+        Override this function to serialize a batch of objects in one go (e.g. with a `many=True` serializer)
+        :param objects: list of objects pulled from the queryset
+        :return: list of dictionaries
+        """
+        if self.field_mapping is not None:
+            return list(map(self.get_converter(), objects))
+        if self.serializer_class is None:
+            field_mask = self.get_field_mask()
+            return objects if field_mask is None else [mask_values(obj, field_mask) for obj in objects]
+        return [self.serialize(obj) for obj in objects]
+
+    def get_batches(self, queryset):
+        iterator = self.get_iterator(queryset)
+        batch = list(islice(iterator, self.batch_size))
+        while batch:
+            yield batch
+            batch = list(islice(iterator, self.batch_size))
+
     def __call__(self):
         try:
             self.perform_authentication(self.request_user)
             queryset = self.get_queryset()
+            if self.batch_size:
+                for batch in self.get_batches(queryset):
+                    data = self.serialize_batch(batch)
+                    if self.field_mapping is None:
+                        data = dicts_to_protobufs(self.response_proto, data, ignore_none=True)
+                    yield from data
+                return
+            if self.field_mapping is not None:
+                yield from map(self.get_converter(), self.get_iterator(queryset))
+                return
+            for obj in self.get_iterator(queryset):
+                yield dict_to_protobuf(self.response_proto, values=self.serialize(obj), ignore_none=True)
+        except Exception as ex:
+            self.context = ExceptionHandler(self.context, self.__class__.__name__)(ex)
+            yield self.response_proto()
+
+
+class ClientStreamCreateGRPCView(GenericGrpcView):
+    """
+    Creates objects of the queryset model from a stream of request messages, which are converted, validated and
+    written to the database in batches with `bulk_create`, then responds with the number of created objects.
+    """
+    request_streaming = True
+    # Number of request messages converted and written to the database at a time
+    batch_size = 500
+    # Set 'atomic' to create all the objects of the stream in a single transaction, by default each batch is
+    # committed in its own transaction
+    atomic = False
+    # Passed on to `bulk_create`, the ignored objects are counted as created
+    ignore_conflicts = False
+    # Created objects count field identifier in response proto
+    created_field = "created"
+
+    def get_batches(self):
+        batch = list(islice(self.request, self.batch_size))
+        while batch:
+            yield batch
+            batch = list(islice(self.request, self.batch_size))
+
+    def validate_batch(self, data, offset):
+        """
+        Override this function to validate and convert a batch of request messages in one go.
+        Raise an appropriate exception if a message is invalid.
+        :param data: list of dictionaries of the request messages
+        :param offset: index of the first message of the batch in the stream
+        :return: list of dictionaries of field values of the objects to create
+        """
+        if self.serializer_class is None:
+            return data
+        validated_data = []
+        for index, values in enumerate(data, offset):
+            serializer = self.serializer_class(data=values)
+            if not serializer.is_valid():
+                raise InvalidArgument("Invalid message {}: {}".format(index, serializer.errors))
+            validated_data.append(serializer.validated_data)
+        return validated_data
+
+    def perform_create(self, queryset, data):
+        """
+        :return: list of the created objects
+        """
+        return queryset.bulk_create([queryset.model(**values) for values in data],
+                                    ignore_conflicts=self.ignore_conflicts)
+
+    def create(self):
+        """
+        Override this function to implement creation
+        :return: dictionary of the summary
+        """
+        queryset = self.get_queryset()
+        received, created = 0, 0
+        with transaction.atomic(using=queryset.db) if self.atomic else contextlib.nullcontext():
+            for batch in self.get_batches():
+                data = self.validate_batch(protobufs_to_dicts(batch), received)
+                received += len(batch)
+                # Joins the transaction of the stream if atomic, without a savepoint per batch
+                with transaction.atomic(using=queryset.db, savepoint=False):
+                    created += len(self.perform_create(queryset, data))
+        return {self.created_field: created}
+
+    def __call__(self):
+        try:
+            self.perform_authentication(self.request_user)
+            result = self.create()
+            return dict_to_protobuf(self.response_proto, values=result, ignore_none=True)
+        except Exception as ex:
+            self.context = ExceptionHandler(self.context, self.__class__.__name__)(ex)
+            return self.response_proto()
+
+
+class _ReadError:
+    def __init__(self, exception):
+        self.exception = exception
+
+
+# Marks the end of the request stream in the read ahead buffer
+_END_OF_STREAM = object()
+
+
+class BidiStreamGRPCView(GenericGrpcView):
+    """
+    Serves bidirectional streaming RPCs: a reader thread reads the request messages ahead while the previous ones
+    are handled, in turn on the thread of the RPC which holds its database connections, and their responses
+    streamed back. At most `window` messages are buffered, once full the reader stops reading from the stream, so
+    that the flow control of gRPC pushes back on the client instead of the server buffering unbounded work.
+    """
+    request_streaming = True
+    response_streaming = True
+    # Maximum number of request messages read ahead of the one being handled
+    window = 16
+    # Seconds between checks of whether the RPC is over, by the reader waiting on a full window, and of whether the
+    # reader is still alive, by the RPC waiting on an empty window
+    poll_interval = 0.1
+    # Thread reading the request messages ahead, once the RPC started
+    reader = None
+
+    def handle(self, message):
+        """
+        Override this function to handle a request message
+        :return: response message or dictionary, None to not respond to the message
+        """
+        raise NotImplementedError
+
+    def _put(self, buffer, item, done):
+        while not done.is_set():
+            try:
+                buffer.put(item, timeout=self.poll_interval)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def read_ahead(self, buffer, done):
+        try:
+            for message in self.request:
+                if not self._put(buffer, message, done):
+                    return
+            item = _END_OF_STREAM
+        except Exception as ex:
+            # e.g. the RPC was cancelled by the client
+            item = _ReadError(ex)
+        self._put(buffer, item, done)
+
+    def _get(self, buffer):
+        while True:
+            try:
+                return buffer.get(timeout=self.poll_interval)
+            except queue.Empty:
+                if not self.reader.is_alive():
+                    break
+        # The reader may have put its last message right before exiting
+        try:
+            return buffer.get_nowait()
+        except queue.Empty:
+            raise RuntimeError("The reader of the request stream stopped unexpectedly")
+
+    def __call__(self):
+        done = threading.Event()
+        try:
+            self.perform_authentication(self.request_user)
+            buffer = queue.Queue(self.window)
+            self.reader = threading.Thread(target=self.read_ahead, args=(buffer, done), daemon=True)
+            self.reader.start()
+            while True:
+                message = self._get(buffer)
+                if message is _END_OF_STREAM:
+                    return
+                if isinstance(message, _ReadError):
+                    raise message.exception
+                response = self.handle(message)
+                if response is None:
+                    continue
+                if isinstance(response, dict):
+                    response = dict_to_protobuf(self.response_proto, values=response, ignore_none=True)
+                yield response
+        except Exception as ex:
+            self.context = ExceptionHandler(self.context, self.__class__.__name__)(ex)
+            yield self.response_proto()
+        finally:
+            # Stops the reader, when the RPC ends before the request stream
+            done.set()
+
+
+class AsyncGenericGrpcView(GenericGrpcView):
+    """
+    Base class for views served by the asyncio server, querying the database with Django's async ORM.
+    The authentication, the permission checks and the serialization are synchronous, and may query the database,
+    e.g. for the related objects or the deferred fields, so they are run in a thread rather than on the event loop.
+    """
+    async def aperform_authentication(self, user):
+        await sync_to_async(self.perform_authentication)(user)
+
+    async def aget_object(self):
+        if not hasattr(self.request, self.lookup_kwarg):
+            raise InvalidArgument("Missing argument {}".format(self.lookup_kwarg))
+        queryset = self.get_queryset()
+        obj = await queryset.aget(**{self.lookup_field: getattr(self.request, self.lookup_kwarg)})
+        await sync_to_async(self.check_object_permissions)(self.request_user, obj)
+        return obj
+
+    def to_responses(self, objects):
+        """
+        :return: list of the response messages of the objects, serialized in a single call run in a thread
+        """
+        return [self.to_response(self.serialize(obj)) for obj in objects]
+
+
+class AsyncRetrieveGRPCView(AsyncGenericGrpcView):
+    async def retrieve(self):
+        """
+        Override this function to implement retrieval
+        :return: dictionary of object
+        """
+        instance = await self.aget_object()
+        return await sync_to_async(self.serialize)(instance)
+
+    async def __call__(self):
+        try:
+            await self.aperform_authentication(self.request_user)
+            result = await self.retrieve()
+            return self.to_response(result)
+        except Exception as ex:
+            self.context = ExceptionHandler(self.context, self.__class__.__name__)(ex)
+            return self.response_proto()
+
+
+class AsyncServerStreamGRPCView(AsyncGenericGrpcView):
+    response_streaming = True
+    # Number of rows fetched from the database at a time by `QuerySet.aiterator()`, and serialized at a time in a
+    # thread
+    chunk_size = 2000
+
+    async def get_iterator(self, queryset):
+        if isinstance(queryset, QuerySet):
+            async for obj in queryset.aiterator(chunk_size=self.chunk_size):
+                yield obj
+        else:
             for obj in queryset:
-                serializer = self.serializer_class(obj)
-                yield dict_to_protobuf(self.response_proto, values=serializer.data, ignore_none=True)
+                yield obj
+
+    async def get_batches(self, queryset):
+        batch = []
+        async for obj in self.get_iterator(queryset):
+            batch.append(obj)
+            if len(batch) >= self.chunk_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    async def __call__(self):
+        try:
+            await self.aperform_authentication(self.request_user)
+            queryset = self.get_queryset()
+            async for batch in self.get_batches(queryset):
+                for message in await sync_to_async(self.to_responses)(batch):
+                    yield message
         except Exception as ex:
-            self.context = ExceptionHandler(self.context).__call__(ex, traceback.format_exc())
+            self.context = ExceptionHandler(self.context, self.__class__.__name__)(ex)
             yield self.response_proto()
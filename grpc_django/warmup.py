@@ -0,0 +1,154 @@
+import collections
+import functools
+import inspect
+import sys
+import time
+from concurrent import futures
+
+from django.db import connections
+
+from .protobuf_to_dict import dict_to_protobuf
+
+HandlerCallDetails = collections.namedtuple('HandlerCallDetails', ('method', 'invocation_metadata'))
+
+
+class WarmupAborted(Exception):
+    pass
+
+
+class WarmupContext:
+    """
+    Servicer context of the canned requests replayed to warm up the server
+    """
+
+    def __init__(self, metadata=()):
+        self.metadata = tuple(metadata)
+        self._code = None
+        self._details = None
+
+    def invocation_metadata(self):
+        return self.metadata
+
+    def peer(self):
+        return 'warmup'
+
+    def is_active(self):
+        return True
+
+    def time_remaining(self):
+        return None
+
+    def add_callback(self, callback):
+        return False
+
+    def set_code(self, code):
+        self._code = code
+
+    def set_details(self, details):
+        self._details = details
+
+    def code(self):
+        return self._code
+
+    def details(self):
+        return self._details
+
+    def abort(self, code, details=''):
+        self._code, self._details = code, details
+        raise WarmupAborted(details)
+
+
+def _open_connections(excluded=()):
+    # Only persistent connections outlive the first request, the others are closed when it starts
+    for alias in connections:
+        if alias not in excluded and connections.settings[alias]['CONN_MAX_AGE'] != 0:
+            connections[alias].ensure_connection()
+
+
+def _replay(method_handler, request):
+    context = WarmupContext()
+    if method_handler.request_streaming:
+        request = iter([request])
+    behavior = method_handler.unary_unary or method_handler.unary_stream or method_handler.stream_unary \
+        or method_handler.stream_stream
+    response = behavior(request, context)
+    if method_handler.response_streaming:
+        for _ in response:
+            pass
+    return context.code()
+
+
+class Warmup:
+    """
+    Warms the server up before it starts listening: opens the database connections of its worker threads,
+    and replays canned requests to its RPCs, which loads the lazily initialised modules, protobuf classes and
+    Django caches they use.
+    """
+
+    def __init__(self, definition, stdout=None):
+        """
+        :param definition: IWarmup
+        """
+        self.open_connections = definition.open_connections
+        self.requests = definition.requests
+        self.timeout = definition.timeout
+        self.stdout = stdout if stdout else sys.stdout
+
+    def get_requests(self, generic_handlers):
+        """
+        :return: list of (method name, RPC method handler, request message) tuples of the canned requests
+        """
+        requests = []
+        for method, messages in self.requests.items():
+            method_handler = None
+            for generic_handler in generic_handlers:
+                method_handler = generic_handler.service(HandlerCallDetails(method, ()))
+                if method_handler:
+                    break
+            if not method_handler:
+                raise LookupError("No RPC {} to warm up".format(method))
+            for message in messages:
+                if isinstance(message, dict):
+                    # The request deserializer is the FromString class method of the request message class
+                    message = dict_to_protobuf(method_handler.request_deserializer.__self__, values=message)
+                requests.append((method, method_handler, message))
+        return requests
+
+    def run(self, generic_handlers, thread_pool, connection_pool=None):
+        """
+        :param generic_handlers: generic RPC handlers of the services, without interceptors
+        :param thread_pool: WorkerThreadPool of the server, the requests are replayed on
+        :param connection_pool: ConnectionPool of the server
+        """
+        started = time.monotonic()
+        if self.open_connections:
+            excluded = ()
+            if connection_pool:
+                connection_pool.fill()
+                excluded = connection_pool.databases
+            thread_pool.run_in_each_thread(functools.partial(_open_connections, excluded), timeout=self.timeout)
+
+        replayed, failed = 0, 0
+        pending = {}
+        for method, method_handler, request in self.get_requests(generic_handlers):
+            if inspect.iscoroutinefunction(method_handler.unary_unary or method_handler.stream_unary) or \
+                    inspect.isasyncgenfunction(method_handler.unary_stream or method_handler.stream_stream):
+                # Async views can only be served from the event loop
+                self.stdout.write("Skipped warming up the async RPC {}\n".format(method))
+                continue
+            pending[thread_pool.submit(_replay, method_handler, request)] = method
+        done, not_done = futures.wait(pending, self.timeout)
+        for future in done:
+            replayed += 1
+            try:
+                code = future.result()
+            except Exception as ex:
+                code = ex
+            if code is not None and getattr(code, 'name', None) != 'OK':
+                failed += 1
+                self.stdout.write("Warmup request of {} failed: {}\n".format(pending[future], code))
+        for future in not_done:
+            self.stdout.write("Warmup request of {} timed out\n".format(pending[future]))
+
+        self.stdout.write("Warmed up in {:.0f} ms, replayed {} requests ({} failed, {} timed out)\n".format(
+            (time.monotonic() - started) * 1e3, replayed, failed, len(not_done)))
@@ -23,15 +23,18 @@ setup(
     version=version,
     packages=find_packages(exclude=["tests*", "manage.py", "docs"]),
     include_package_data=True,
-    python_requires='>3.5.0',
+    python_requires='>=3.10',
     install_requires=[
-        "Django >= 1.9",
+        "Django >= 4.1",
         "grpcio",
         "grpcio-tools",
         "google",
         "six",
         "djangorestframework"
     ],
+    extras_require={
+        "jwt": ["pyjwt[crypto]"],
+    },
     author="Sohel Tarir",
     author_email="sohel.tarir@gmail.com",
     description="gRPC Integration with Django Framework",
@@ -42,8 +45,11 @@ setup(
     classifiers=[
         "License :: OSI Approved :: MIT License",
         "Programming Language :: Python :: 3",
-        "Programming Language :: Python :: 3.5",
-        "Programming Language :: Python :: 3.6",
-        "Programming Language :: Python :: 3.7",
+        "Programming Language :: Python :: 3.10",
+        "Programming Language :: Python :: 3.11",
+        "Programming Language :: Python :: 3.12",
+        "Framework :: Django :: 4.1",
+        "Framework :: Django :: 4.2",
+        "Framework :: Django :: 5.0",
     ],
 )
@@ -1,187 +1,51 @@
+# -*- coding: utf-8 -*-
 # Generated by the protocol buffer compiler.  DO NOT EDIT!
 # source: test.proto
-
-import sys
-_b=sys.version_info[0]<3 and (lambda x:x) or (lambda x:x.encode('latin1'))
+# Protobuf Python Version: 4.25.1
+"""Generated protocol buffer code."""
 from google.protobuf import descriptor as _descriptor
-from google.protobuf import message as _message
-from google.protobuf import reflection as _reflection
+from google.protobuf import descriptor_pool as _descriptor_pool
 from google.protobuf import symbol_database as _symbol_database
-from google.protobuf import descriptor_pb2
+from google.protobuf.internal import builder as _builder
 # @@protoc_insertion_point(imports)
 
 _sym_db = _symbol_database.Default()
 
 
-
-
-DESCRIPTOR = _descriptor.FileDescriptor(
-  name='test.proto',
-  package='test',
-  syntax='proto3',
-  serialized_pb=_b('\n\ntest.proto\x12\x04test\"2\n\x04User\x12\n\n\x02id\x18\x01 \x01(\x03\x12\x10\n\x08username\x18\x02 \x01(\t\x12\x0c\n\x04name\x18\x03 \x01(\t\"\x18\n\nGetPayload\x12\n\n\x02id\x18\x01 \x01(\x03\"\x07\n\x05\x45mpty2^\n\x0bTestService\x12\'\n\x07GetUser\x12\x10.test.GetPayload\x1a\n.test.User\x12&\n\tListUsers\x12\x0b.test.Empty\x1a\n.test.User0\x01\x62\x06proto3')
-)
-
-
-
-
-_USER = _descriptor.Descriptor(
-  name='User',
-  full_name='test.User',
-  filename=None,
-  file=DESCRIPTOR,
-  containing_type=None,
-  fields=[
-    _descriptor.FieldDescriptor(
-      name='id', full_name='test.User.id', index=0,
-      number=1, type=3, cpp_type=2, label=1,
-      has_default_value=False, default_value=0,
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      options=None, file=DESCRIPTOR),
-    _descriptor.FieldDescriptor(
-      name='username', full_name='test.User.username', index=1,
-      number=2, type=9, cpp_type=9, label=1,
-      has_default_value=False, default_value=_b("").decode('utf-8'),
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      options=None, file=DESCRIPTOR),
-    _descriptor.FieldDescriptor(
-      name='name', full_name='test.User.name', index=2,
-      number=3, type=9, cpp_type=9, label=1,
-      has_default_value=False, default_value=_b("").decode('utf-8'),
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      options=None, file=DESCRIPTOR),
-  ],
-  extensions=[
-  ],
-  nested_types=[],
-  enum_types=[
-  ],
-  options=None,
-  is_extendable=False,
-  syntax='proto3',
-  extension_ranges=[],
-  oneofs=[
-  ],
-  serialized_start=20,
-  serialized_end=70,
-)
-
-
-_GETPAYLOAD = _descriptor.Descriptor(
-  name='GetPayload',
-  full_name='test.GetPayload',
-  filename=None,
-  file=DESCRIPTOR,
-  containing_type=None,
-  fields=[
-    _descriptor.FieldDescriptor(
-      name='id', full_name='test.GetPayload.id', index=0,
-      number=1, type=3, cpp_type=2, label=1,
-      has_default_value=False, default_value=0,
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      options=None, file=DESCRIPTOR),
-  ],
-  extensions=[
-  ],
-  nested_types=[],
-  enum_types=[
-  ],
-  options=None,
-  is_extendable=False,
-  syntax='proto3',
-  extension_ranges=[],
-  oneofs=[
-  ],
-  serialized_start=72,
-  serialized_end=96,
-)
-
-
-_EMPTY = _descriptor.Descriptor(
-  name='Empty',
-  full_name='test.Empty',
-  filename=None,
-  file=DESCRIPTOR,
-  containing_type=None,
-  fields=[
-  ],
-  extensions=[
-  ],
-  nested_types=[],
-  enum_types=[
-  ],
-  options=None,
-  is_extendable=False,
-  syntax='proto3',
-  extension_ranges=[],
-  oneofs=[
-  ],
-  serialized_start=98,
-  serialized_end=105,
-)
-
-DESCRIPTOR.message_types_by_name['User'] = _USER
-DESCRIPTOR.message_types_by_name['GetPayload'] = _GETPAYLOAD
-DESCRIPTOR.message_types_by_name['Empty'] = _EMPTY
-_sym_db.RegisterFileDescriptor(DESCRIPTOR)
-
-User = _reflection.GeneratedProtocolMessageType('User', (_message.Message,), dict(
-  DESCRIPTOR = _USER,
-  __module__ = 'test_pb2'
-  # @@protoc_insertion_point(class_scope:test.User)
-  ))
-_sym_db.RegisterMessage(User)
-
-GetPayload = _reflection.GeneratedProtocolMessageType('GetPayload', (_message.Message,), dict(
-  DESCRIPTOR = _GETPAYLOAD,
-  __module__ = 'test_pb2'
-  # @@protoc_insertion_point(class_scope:test.GetPayload)
-  ))
-_sym_db.RegisterMessage(GetPayload)
-
-Empty = _reflection.GeneratedProtocolMessageType('Empty', (_message.Message,), dict(
-  DESCRIPTOR = _EMPTY,
-  __module__ = 'test_pb2'
-  # @@protoc_insertion_point(class_scope:test.Empty)
-  ))
-_sym_db.RegisterMessage(Empty)
-
-
-
-_TESTSERVICE = _descriptor.ServiceDescriptor(
-  name='TestService',
-  full_name='test.TestService',
-  file=DESCRIPTOR,
-  index=0,
-  options=None,
-  serialized_start=107,
-  serialized_end=201,
-  methods=[
-  _descriptor.MethodDescriptor(
-    name='GetUser',
-    full_name='test.TestService.GetUser',
-    index=0,
-    containing_service=None,
-    input_type=_GETPAYLOAD,
-    output_type=_USER,
-    options=None,
-  ),
-  _descriptor.MethodDescriptor(
-    name='ListUsers',
-    full_name='test.TestService.ListUsers',
-    index=1,
-    containing_service=None,
-    input_type=_EMPTY,
-    output_type=_USER,
-    options=None,
-  ),
-])
-_sym_db.RegisterServiceDescriptor(_TESTSERVICE)
-
-DESCRIPTOR.services_by_name['TestService'] = _TESTSERVICE
-
+from google.protobuf import field_mask_pb2 as google_dot_protobuf_dot_field__mask__pb2
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\ntest.proto\x12\x04test\x1a google/protobuf/field_mask.proto\"2\n\x04User\x12\n\n\x02id\x18\x01 \x01(\x03\x12\x10\n\x08username\x18\x02 \x01(\t\x12\x0c\n\x04name\x18\x03 \x01(\t\"H\n\nGetPayload\x12\n\n\x02id\x18\x01 \x01(\x03\x12.\n\nfield_mask\x18\x02 \x01(\x0b\x32\x1a.google.protobuf.FieldMask\"\x07\n\x05\x45mpty\"i\n\x10ListUsersPayload\x12\x11\n\tpage_size\x18\x01 \x01(\x05\x12\x12\n\npage_token\x18\x02 \x01(\t\x12.\n\nfield_mask\x18\x03 \x01(\x0b\x32\x1a.google.protobuf.FieldMask\"@\n\x08UserPage\x12\x1b\n\x07results\x18\x01 \x03(\x0b\x32\n.test.User\x12\x17\n\x0fnext_page_token\x18\x02 \x01(\t\"B\n\x07NewUser\x12\x10\n\x08username\x18\x01 \x01(\t\x12\x12\n\nfirst_name\x18\x02 \x01(\t\x12\x11\n\tlast_name\x18\x03 \x01(\t\"%\n\x12\x43reateUsersSummary\x12\x0f\n\x07\x63reated\x18\x01 \x01(\x03\"\x1e\n\x0f\x42\x61tchGetPayload\x12\x0b\n\x03ids\x18\x01 \x03(\x03\";\n\tUserBatch\x12\x1b\n\x07results\x18\x01 \x03(\x0b\x32\n.test.User\x12\x11\n\tnot_found\x18\x02 \x03(\x03\"/\n\x0b\x43ontentType\x12\x11\n\tapp_label\x18\x01 \x01(\t\x12\r\n\x05model\x18\x02 \x01(\t\"S\n\nPermission\x12\n\n\x02id\x18\x01 \x01(\x03\x12\x10\n\x08\x63odename\x18\x02 \x01(\t\x12\'\n\x0c\x63ontent_type\x18\x03 \x01(\x0b\x32\x11.test.ContentType\"H\n\x05Group\x12\n\n\x02id\x18\x01 \x01(\x03\x12\x0c\n\x04name\x18\x02 \x01(\t\x12%\n\x0bpermissions\x18\x03 \x03(\x0b\x32\x10.test.Permission2\xb9\x02\n\x0bTestService\x12\'\n\x07GetUser\x12\x10.test.GetPayload\x1a\n.test.User\x12&\n\tListUsers\x12\x0b.test.Empty\x1a\n.test.User0\x01\x12\x37\n\rListUsersPage\x12\x16.test.ListUsersPayload\x1a\x0e.test.UserPage\x12\x38\n\x0b\x43reateUsers\x12\r.test.NewUser\x1a\x18.test.CreateUsersSummary(\x01\x12-\n\tSyncUsers\x12\x10.test.GetPayload\x1a\n.test.User(\x01\x30\x01\x12\x37\n\rBatchGetUsers\x12\x15.test.BatchGetPayload\x1a\x0f.test.UserBatchb\x06proto3')
+
+_globals = globals()
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'test_pb2', _globals)
+if _descriptor._USE_C_DESCRIPTORS == False:
+  DESCRIPTOR._options = None
+  _globals['_USER']._serialized_start=54
+  _globals['_USER']._serialized_end=104
+  _globals['_GETPAYLOAD']._serialized_start=106
+  _globals['_GETPAYLOAD']._serialized_end=178
+  _globals['_EMPTY']._serialized_start=180
+  _globals['_EMPTY']._serialized_end=187
+  _globals['_LISTUSERSPAYLOAD']._serialized_start=189
+  _globals['_LISTUSERSPAYLOAD']._serialized_end=294
+  _globals['_USERPAGE']._serialized_start=296
+  _globals['_USERPAGE']._serialized_end=360
+  _globals['_NEWUSER']._serialized_start=362
+  _globals['_NEWUSER']._serialized_end=428
+  _globals['_CREATEUSERSSUMMARY']._serialized_start=430
+  _globals['_CREATEUSERSSUMMARY']._serialized_end=467
+  _globals['_BATCHGETPAYLOAD']._serialized_start=469
+  _globals['_BATCHGETPAYLOAD']._serialized_end=499
+  _globals['_USERBATCH']._serialized_start=501
+  _globals['_USERBATCH']._serialized_end=560
+  _globals['_CONTENTTYPE']._serialized_start=562
+  _globals['_CONTENTTYPE']._serialized_end=609
+  _globals['_PERMISSION']._serialized_start=611
+  _globals['_PERMISSION']._serialized_end=694
+  _globals['_GROUP']._serialized_start=696
+  _globals['_GROUP']._serialized_end=768
+  _globals['_TESTSERVICE']._serialized_start=771
+  _globals['_TESTSERVICE']._serialized_end=1084
 # @@protoc_insertion_point(module_scope)
@@ -1,63 +1,231 @@
 # Generated by the gRPC Python protocol compiler plugin. DO NOT EDIT!
+"""Client and server classes corresponding to protobuf-defined services."""
 import grpc
 
 from tests.grpc_codegen import test_pb2 as test__pb2
 
 
 class TestServiceStub(object):
-  # missing associated documentation comment in .proto file
-  pass
-
-  def __init__(self, channel):
-    """Constructor.
-
-    Args:
-      channel: A grpc.Channel.
-    """
-    self.GetUser = channel.unary_unary(
-        '/test.TestService/GetUser',
-        request_serializer=test__pb2.GetPayload.SerializeToString,
-        response_deserializer=test__pb2.User.FromString,
-        )
-    self.ListUsers = channel.unary_stream(
-        '/test.TestService/ListUsers',
-        request_serializer=test__pb2.Empty.SerializeToString,
-        response_deserializer=test__pb2.User.FromString,
-        )
+    """Missing associated documentation comment in .proto file."""
+
+    def __init__(self, channel):
+        """Constructor.
+
+        Args:
+            channel: A grpc.Channel.
+        """
+        self.GetUser = channel.unary_unary(
+                '/test.TestService/GetUser',
+                request_serializer=test__pb2.GetPayload.SerializeToString,
+                response_deserializer=test__pb2.User.FromString,
+                )
+        self.ListUsers = channel.unary_stream(
+                '/test.TestService/ListUsers',
+                request_serializer=test__pb2.Empty.SerializeToString,
+                response_deserializer=test__pb2.User.FromString,
+                )
+        self.ListUsersPage = channel.unary_unary(
+                '/test.TestService/ListUsersPage',
+                request_serializer=test__pb2.ListUsersPayload.SerializeToString,
+                response_deserializer=test__pb2.UserPage.FromString,
+                )
+        self.CreateUsers = channel.stream_unary(
+                '/test.TestService/CreateUsers',
+                request_serializer=test__pb2.NewUser.SerializeToString,
+                response_deserializer=test__pb2.CreateUsersSummary.FromString,
+                )
+        self.SyncUsers = channel.stream_stream(
+                '/test.TestService/SyncUsers',
+                request_serializer=test__pb2.GetPayload.SerializeToString,
+                response_deserializer=test__pb2.User.FromString,
+                )
+        self.BatchGetUsers = channel.unary_unary(
+                '/test.TestService/BatchGetUsers',
+                request_serializer=test__pb2.BatchGetPayload.SerializeToString,
+                response_deserializer=test__pb2.UserBatch.FromString,
+                )
 
 
 class TestServiceServicer(object):
-  # missing associated documentation comment in .proto file
-  pass
+    """Missing associated documentation comment in .proto file."""
+
+    def GetUser(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def ListUsers(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
 
-  def GetUser(self, request, context):
-    # missing associated documentation comment in .proto file
-    pass
-    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
-    context.set_details('Method not implemented!')
-    raise NotImplementedError('Method not implemented!')
+    def ListUsersPage(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
 
-  def ListUsers(self, request, context):
-    # missing associated documentation comment in .proto file
-    pass
-    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
-    context.set_details('Method not implemented!')
-    raise NotImplementedError('Method not implemented!')
+    def CreateUsers(self, request_iterator, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def SyncUsers(self, request_iterator, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def BatchGetUsers(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
 
 
 def add_TestServiceServicer_to_server(servicer, server):
-  rpc_method_handlers = {
-      'GetUser': grpc.unary_unary_rpc_method_handler(
-          servicer.GetUser,
-          request_deserializer=test__pb2.GetPayload.FromString,
-          response_serializer=test__pb2.User.SerializeToString,
-      ),
-      'ListUsers': grpc.unary_stream_rpc_method_handler(
-          servicer.ListUsers,
-          request_deserializer=test__pb2.Empty.FromString,
-          response_serializer=test__pb2.User.SerializeToString,
-      ),
-  }
-  generic_handler = grpc.method_handlers_generic_handler(
-      'test.TestService', rpc_method_handlers)
-  server.add_generic_rpc_handlers((generic_handler,))
+    rpc_method_handlers = {
+            'GetUser': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetUser,
+                    request_deserializer=test__pb2.GetPayload.FromString,
+                    response_serializer=test__pb2.User.SerializeToString,
+            ),
+            'ListUsers': grpc.unary_stream_rpc_method_handler(
+                    servicer.ListUsers,
+                    request_deserializer=test__pb2.Empty.FromString,
+                    response_serializer=test__pb2.User.SerializeToString,
+            ),
+            'ListUsersPage': grpc.unary_unary_rpc_method_handler(
+                    servicer.ListUsersPage,
+                    request_deserializer=test__pb2.ListUsersPayload.FromString,
+                    response_serializer=test__pb2.UserPage.SerializeToString,
+            ),
+            'CreateUsers': grpc.stream_unary_rpc_method_handler(
+                    servicer.CreateUsers,
+                    request_deserializer=test__pb2.NewUser.FromString,
+                    response_serializer=test__pb2.CreateUsersSummary.SerializeToString,
+            ),
+            'SyncUsers': grpc.stream_stream_rpc_method_handler(
+                    servicer.SyncUsers,
+                    request_deserializer=test__pb2.GetPayload.FromString,
+                    response_serializer=test__pb2.User.SerializeToString,
+            ),
+            'BatchGetUsers': grpc.unary_unary_rpc_method_handler(
+                    servicer.BatchGetUsers,
+                    request_deserializer=test__pb2.BatchGetPayload.FromString,
+                    response_serializer=test__pb2.UserBatch.SerializeToString,
+            ),
+    }
+    generic_handler = grpc.method_handlers_generic_handler(
+            'test.TestService', rpc_method_handlers)
+    server.add_generic_rpc_handlers((generic_handler,))
+
+
+ # This class is part of an EXPERIMENTAL API.
+class TestService(object):
+    """Missing associated documentation comment in .proto file."""
+
+    @staticmethod
+    def GetUser(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/test.TestService/GetUser',
+            test__pb2.GetPayload.SerializeToString,
+            test__pb2.User.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def ListUsers(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(request, target, '/test.TestService/ListUsers',
+            test__pb2.Empty.SerializeToString,
+            test__pb2.User.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def ListUsersPage(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/test.TestService/ListUsersPage',
+            test__pb2.ListUsersPayload.SerializeToString,
+            test__pb2.UserPage.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def CreateUsers(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_unary(request_iterator, target, '/test.TestService/CreateUsers',
+            test__pb2.NewUser.SerializeToString,
+            test__pb2.CreateUsersSummary.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def SyncUsers(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_stream(request_iterator, target, '/test.TestService/SyncUsers',
+            test__pb2.GetPayload.SerializeToString,
+            test__pb2.User.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def BatchGetUsers(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/test.TestService/BatchGetUsers',
+            test__pb2.BatchGetPayload.SerializeToString,
+            test__pb2.UserBatch.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
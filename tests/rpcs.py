@@ -1,8 +1,12 @@
+from django.contrib.auth.models import User as UserModel
 from django.core.exceptions import ObjectDoesNotExist
 
 from grpc_django.interfaces import rpc
-from grpc_django.views import RetrieveGRPCView, ServerStreamGRPCView
-from tests.grpc_codegen.test_pb2 import User
+from grpc_django.views import (
+    BatchRetrieveGRPCView, BidiStreamGRPCView, ClientStreamCreateGRPCView, PaginatedListGRPCView, RetrieveGRPCView,
+    ServerStreamGRPCView
+)
+from tests.grpc_codegen.test_pb2 import CreateUsersSummary, User, UserBatch, UserPage
 
 USERS = [{
             "id": 1,
@@ -24,6 +28,15 @@ class UserSerializer:
         return self.obj
 
 
+class UserModelSerializer:
+    def __init__(self, obj):
+        self.obj = obj
+
+    @property
+    def data(self):
+        return {"id": self.obj.id, "username": self.obj.username, "name": self.obj.get_full_name()}
+
+
 class GetUser(RetrieveGRPCView):
     response_proto = User
     serializer_class = UserSerializer
@@ -47,7 +60,40 @@ class ListUsers(ServerStreamGRPCView):
         return USERS
 
 
+class ListUsersPage(PaginatedListGRPCView):
+    queryset = UserModel.objects.all()
+    response_proto = UserPage
+    serializer_class = UserModelSerializer
+    ordering = ("-last_name", "id")
+
+
+class CreateUsers(ClientStreamCreateGRPCView):
+    queryset = UserModel.objects.all()
+    response_proto = CreateUsersSummary
+    batch_size = 2
+
+
+class SyncUsers(BidiStreamGRPCView):
+    response_proto = User
+
+    def handle(self, message):
+        for user in USERS:
+            if user["id"] == message.id:
+                return user
+        return None
+
+
+class BatchGetUsers(BatchRetrieveGRPCView):
+    queryset = UserModel.objects.all()
+    response_proto = UserBatch
+    serializer_class = UserModelSerializer
+
+
 rpcs = [
     rpc("GetUser", GetUser),
-    rpc("ListUsers", ListUsers)
+    rpc("ListUsers", ListUsers),
+    rpc("ListUsersPage", ListUsersPage),
+    rpc("CreateUsers", CreateUsers),
+    rpc("SyncUsers", SyncUsers),
+    rpc("BatchGetUsers", BatchGetUsers),
 ]
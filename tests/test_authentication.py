@@ -0,0 +1,106 @@
+import json
+import time
+from unittest import mock, skipIf
+
+import grpc
+from django.test import SimpleTestCase
+
+from grpc_django.authentication import AuthenticationPipeline, JSONMetadataAuthenticator, JWTAuthenticator, Principal
+from grpc_django.exceptions import AuthenticationFailed
+from tests.grpc_codegen.test_pb2 import GetPayload
+from tests.rpcs import GetUser
+from tests.test_views import FakeContext
+
+try:
+    import jwt
+except ImportError:
+    jwt = None
+
+
+SIGNING_KEY = "a-signing-key-of-at-least-32-bytes"
+
+
+class AuthenticatedGetUser(GetUser):
+    requires_authentication = True
+
+
+class AuthenticationPipelineTest(SimpleTestCase):
+    def test_json_metadata(self):
+        pipeline = AuthenticationPipeline([JSONMetadataAuthenticator()])
+        user = pipeline.authenticate(FakeContext([("user", json.dumps({"id": 1, "username": "bruce.wayne",
+                                                                        "is_staff": True}))]))
+        self.assertEqual((user.pk, user.username, user.is_staff), (1, "bruce.wayne", True))
+        self.assertTrue(user.is_authenticated)
+        for metadata in ([], [("user", "{}")]):
+            self.assertFalse(pipeline.authenticate(FakeContext(metadata)).is_authenticated)
+
+    def test_principals_are_cached_by_credentials(self):
+        authenticator = JSONMetadataAuthenticator()
+        metadata = {"user": json.dumps({"id": 1})}
+        with mock.patch.object(authenticator, 'verify', wraps=authenticator.verify) as verify:
+            self.assertIs(authenticator.authenticate(metadata), authenticator.authenticate(metadata))
+        self.assertEqual(verify.call_count, 1)
+
+    def test_first_authenticator_with_credentials(self):
+        pipeline = AuthenticationPipeline([JSONMetadataAuthenticator("admin"), JSONMetadataAuthenticator("user")])
+        context = FakeContext([("user", json.dumps({"id": 1})), ("admin", json.dumps({"id": 2}))])
+        self.assertEqual(pipeline.authenticate(context).pk, 2)
+        self.assertEqual(pipeline.get_credentials(context), json.dumps({"id": 2}))
+
+    def test_invalid_credentials(self):
+        with self.assertRaises(AuthenticationFailed):
+            JSONMetadataAuthenticator().authenticate({"user": "bruce.wayne"})
+
+
+class LazyAuthenticationTest(SimpleTestCase):
+    def test_user_is_resolved_on_access(self):
+        with mock.patch.object(GetUser, 'get_user') as get_user:
+            GetUser(GetPayload(id=1), FakeContext())()
+        get_user.assert_not_called()
+
+    def test_authentication_required(self):
+        context = FakeContext()
+        AuthenticatedGetUser(GetPayload(id=1), context)()
+        self.assertEqual(context.code, grpc.StatusCode.UNAUTHENTICATED)
+
+        context = FakeContext([("user", json.dumps({"id": 1, "username": "bruce.wayne"}))])
+        self.assertEqual(AuthenticatedGetUser(GetPayload(id=1), context)().name, "Bruce Wayne")
+        self.assertIsNone(context.code)
+
+        context = FakeContext([("user", "bruce.wayne")])
+        AuthenticatedGetUser(GetPayload(id=1), context)()
+        self.assertEqual(context.code, grpc.StatusCode.UNAUTHENTICATED)
+
+    def test_context_user_is_deprecated(self):
+        from grpc_django import models
+        with self.assertWarns(DeprecationWarning):
+            self.assertTrue(models.ContextUser._meta.abstract)
+
+
+@skipIf(jwt is None, "PyJWT is not installed")
+class JWTAuthenticatorTest(SimpleTestCase):
+    def setUp(self):
+        self.authenticator = JWTAuthenticator(signing_key=SIGNING_KEY, algorithms=["HS256"], cache_timeout=60)
+
+    def get_metadata(self, **claims):
+        return {"authorization": "Bearer {}".format(jwt.encode(claims, SIGNING_KEY, algorithm="HS256"))}
+
+    def test_valid_token(self):
+        principal = self.authenticator.authenticate(self.get_metadata(sub="1", username="bruce.wayne"))
+        self.assertEqual(principal, Principal(id="1", username="bruce.wayne",
+                                              claims={"sub": "1", "username": "bruce.wayne"}))
+        self.assertIsNone(self.authenticator.authenticate({"authorization": "Basic YnJ1Y2U="}))
+
+    def test_invalid_tokens(self):
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticator.authenticate(self.get_metadata(sub="1", exp=int(time.time()) - 10))
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticator.authenticate({"authorization": "Bearer {}".format(
+                jwt.encode({"sub": "1"}, SIGNING_KEY[::-1], algorithm="HS256"))})
+
+    def test_principals_are_not_cached_past_their_expiry(self):
+        expiry = int(time.time()) + 10
+        principal = self.authenticator.authenticate(self.get_metadata(sub="1", exp=expiry))
+        self.assertAlmostEqual(self.authenticator.get_cache_timeout(principal), 10, delta=2)
+        principal = self.authenticator.authenticate(self.get_metadata(sub="1", exp=expiry + 3600))
+        self.assertEqual(self.authenticator.get_cache_timeout(principal), 60)
@@ -0,0 +1,100 @@
+from unittest import mock
+
+from django.contrib.auth.models import User as UserModel
+from django.test import SimpleTestCase, TestCase
+
+from grpc_django.cache import LRUCache, ResponseCache
+from grpc_django.views import RetrieveGRPCView
+from tests.grpc_codegen.test_pb2 import GetPayload, User
+from tests.rpcs import GetUser, UserModelSerializer
+from tests.test_views import FakeContext
+
+
+class LRUCacheTest(SimpleTestCase):
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = LRUCache(max_size=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertEqual((cache.get('a'), cache.get('b'), cache.get('c')), (1, None, 3))
+
+    def test_expired_entries(self):
+        cache = LRUCache(timeout=10)
+        with mock.patch('grpc_django.cache.time.monotonic', return_value=0):
+            cache.set('a', 1)
+            cache.set('b', 2, None)
+        with mock.patch('grpc_django.cache.time.monotonic', return_value=10):
+            self.assertIsNone(cache.get('a'))
+            self.assertEqual(cache.get('b'), 2)
+        self.assertEqual(len(cache), 1)
+
+
+class CachedGetUser(GetUser):
+    response_cache = ResponseCache(LRUCache())
+    retrieved = 0
+
+    def retrieve(self):
+        CachedGetUser.retrieved += 1
+        return super().retrieve()
+
+
+class ResponseCacheTest(SimpleTestCase):
+    def setUp(self):
+        CachedGetUser.response_cache = ResponseCache(LRUCache())
+        CachedGetUser.retrieved = 0
+
+    def get_user(self, user_id):
+        return CachedGetUser(GetPayload(id=user_id), FakeContext())()
+
+    def test_responses_are_cached_per_request_and_scope(self):
+        response = self.get_user(1)
+        self.assertEqual(self.get_user(1), response)
+        self.assertEqual(response.name, "Bruce Wayne")
+        self.assertEqual(CachedGetUser.retrieved, 1)
+
+        self.assertEqual(self.get_user(2).name, "Clary Fairchild")
+        with mock.patch.object(CachedGetUser, 'get_cache_scope', return_value='{"username": "bruce.wayne"}'):
+            self.get_user(1)
+        self.assertEqual(CachedGetUser.retrieved, 3)
+        self.assertEqual(CachedGetUser.response_cache.get_stats(), {'hits': 1, 'misses': 3})
+
+    def test_errors_are_not_cached(self):
+        context = FakeContext()
+        CachedGetUser(GetPayload(id=3), context)()
+        self.assertIsNotNone(context.code)
+        self.assertEqual(CachedGetUser.response_cache.get_stats(), {'hits': 0, 'misses': 1})
+        self.assertEqual(len(CachedGetUser.response_cache.cache), 0)
+
+
+class GetUserModel(RetrieveGRPCView):
+    queryset = UserModel.objects.all()
+    response_proto = User
+    serializer_class = UserModelSerializer
+    response_cache = ResponseCache(LRUCache())
+
+
+class ResponseCacheInvalidationTest(TestCase):
+    def setUp(self):
+        self.user = UserModel.objects.create(username="bruce.wayne", first_name="Bruce", last_name="Wayne")
+
+    def get_user(self):
+        return GetUserModel(GetPayload(id=self.user.id), FakeContext())()
+
+    def test_saving_an_instance_invalidates_the_responses(self):
+        self.assertEqual(self.get_user().name, "Bruce Wayne")
+        with self.captureOnCommitCallbacks(execute=True):
+            UserModel.objects.filter(pk=self.user.pk).update(first_name="Batman")
+            # Querysets updates do not send signals
+            self.assertEqual(self.get_user().name, "Bruce Wayne")
+            self.user.first_name = "Batman"
+            self.user.save()
+            # Until the transaction is committed
+            self.assertEqual(self.get_user().name, "Bruce Wayne")
+        self.assertEqual(self.get_user().name, "Batman Wayne")
+
+    def test_deleting_an_instance_invalidates_the_responses(self):
+        self.get_user()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.delete()
+        self.assertEqual(self.get_user(), User())
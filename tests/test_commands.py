@@ -0,0 +1,109 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase
+
+from grpc_django import codegen
+from grpc_django.management.commands.grpc_startup_time import parse_import_times
+from grpc_django.settings import settings
+
+IMPORT_TIMES = """import time: self [us] | cumulative | imported package
+import time:       177 |        177 |     grpc_tools
+import time:      3217 |      53003 |   grpc
+import time:      4439 |      72397 | grpc_django.server
+"""
+
+
+class StartupTimeCommandTest(SimpleTestCase):
+    def test_parse_import_times(self):
+        self.assertEqual(parse_import_times(IMPORT_TIMES), [
+            ('grpc_tools', 2, 177, 177), ('grpc', 1, 3217, 53003), ('grpc_django.server', 0, 4439, 72397)
+        ])
+
+    def test_report(self):
+        stdout = StringIO()
+        call_command('grpc_startup_time', '--json', '--top', '3', stdout=stdout)
+        report = json.loads(stdout.getvalue())
+        self.assertGreater(report['time_to_serving'], report['time_to_ready'])
+        self.assertEqual(len(report['slowest_imports']), 3)
+        self.assertIn('grpc_django.server', [module for module, _ in report['slowest_imports']])
+        # Starting the server must not import the code generation tooling
+        self.assertEqual(report['codegen_modules'], [])
+
+
+PROTOS = {
+    "users.proto": 'syntax = "proto3";\npackage users;\nmessage User { int64 id = 1; }\n',
+    "groups.proto": 'syntax = "proto3";\npackage groups;\nimport "users.proto";\n'
+                    'message Group { repeated users.User members = 1; }\n',
+    "empty.proto": 'syntax = "proto3";\npackage empty;\nimport "google/protobuf/empty.proto";\n'
+                   'service EmptyService { rpc Ping (google.protobuf.Empty) returns (google.protobuf.Empty); }\n',
+}
+
+
+class RunServerCommandTest(SimpleTestCase):
+    def test_asyncio_server_with_metrics(self):
+        with mock.patch.object(settings, 'metrics_port', 55009), \
+                mock.patch('grpc_django.management.commands.run_grpc_server.serve') as serve, \
+                mock.patch('grpc_django.management.commands.run_grpc_server.ProcessSupervisor') as supervisor, \
+                self.assertRaises(CommandError):
+            call_command('run_grpc_server', '--asyncio', '--processes', '2', stdout=StringIO())
+        serve.assert_not_called()
+        supervisor.assert_not_called()
+
+
+class GenerateStubsCommandTest(SimpleTestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.destination = os.path.join(self.root, "stubs")
+        for name, source in PROTOS.items():
+            self.write_proto(name, source)
+
+    def write_proto(self, name, source):
+        with open(os.path.join(self.root, name), "w") as f:
+            f.write(source)
+
+    def generate(self, *args):
+        stdout = StringIO()
+        with mock.patch.object(codegen, "run_protoc", wraps=codegen.run_protoc) as run_protoc:
+            call_command("generate_grpc_stubs", self.root, ",".join(sorted(PROTOS)), "--dest", self.destination,
+                         "--jobs", "1", *args, stdout=stdout)
+        return sorted(name for call in run_protoc.call_args_list for name in call.args[0] if name in PROTOS)
+
+    def test_find_imports(self):
+        self.assertEqual(codegen.find_imports('import "a.proto";\n  import public "b/c.proto" ;\n// import "d";'),
+                         ["a.proto", "b/c.proto"])
+
+    def test_only_changed_protos_are_compiled(self):
+        self.assertEqual(self.generate(), sorted(PROTOS))
+        for name in PROTOS:
+            self.assertTrue(os.path.isfile(os.path.join(self.destination, name[:-len(".proto")] + "_pb2.py")))
+        self.assertEqual(self.generate(), [])
+        # Importing protos are compiled again when their imports change
+        self.write_proto("users.proto", PROTOS["users.proto"] + "message Users { repeated User users = 1; }\n")
+        self.assertEqual(self.generate(), ["groups.proto", "users.proto"])
+        os.remove(os.path.join(self.destination, "empty_pb2_grpc.py"))
+        self.assertEqual(self.generate(), ["empty.proto"])
+        self.assertEqual(self.generate("--force"), sorted(PROTOS))
+
+    def test_protos_are_batched(self):
+        generator = codegen.StubGenerator(self.root, self.destination, jobs=2)
+        self.assertEqual(generator.get_batches(["a", "b", "c"]), [["a", "c"], ["b"]])
+        self.assertEqual(generator.get_batches([]), [])
+
+    def test_parallel_generation(self):
+        generator = codegen.StubGenerator(self.root, self.destination, jobs=2)
+        generated, skipped, failed = generator.generate(sorted(PROTOS))
+        self.assertEqual((sorted(generated), skipped, failed), (sorted(PROTOS), [], []))
+        self.assertEqual(set(generator.load_manifest()), set(PROTOS))
+
+    def test_failure(self):
+        self.write_proto("users.proto", "syntax = \"proto3\";\nmessage {")
+        with self.assertRaisesMessage(CommandError, "Failed to generate"):
+            self.generate()
+        self.assertEqual(codegen.StubGenerator(self.root, self.destination).load_manifest(), {})
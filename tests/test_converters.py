@@ -0,0 +1,156 @@
+from django.contrib.auth.models import Group as GroupModel, Permission as PermissionModel, User as UserModel
+from django.test import TestCase
+
+from grpc_django.converters import ModelToProtobufConverter
+from grpc_django.views import BatchRetrieveGRPCView, PaginatedListGRPCView, RetrieveGRPCView, ServerStreamGRPCView
+from tests.grpc_codegen.test_pb2 import (
+    BatchGetPayload, ContentType, Empty, GetPayload, Group, ListUsersPayload, Permission, User, UserBatch, UserPage,
+)
+from tests.test_field_mask import mask
+from tests.test_views import FakeContext
+
+USER_MAPPING = {"id": "id", "username": "username", "name": lambda obj: obj.get_full_name()}
+PERMISSION_MAPPING = {"id": "id", "codename": "codename", "content_type": ["app_label", "model"]}
+
+
+class GetUser(RetrieveGRPCView):
+    queryset = UserModel.objects.all()
+    response_proto = User
+    field_mapping = USER_MAPPING
+    auto_projection = True
+    projection_fields = ("first_name", "last_name")
+
+
+class ListUsers(ServerStreamGRPCView):
+    queryset = UserModel.objects.order_by("id")
+    response_proto = User
+    field_mapping = ["id", "username"]
+
+
+class ListUserRows(ListUsers):
+    batch_size = 2
+
+    def get_queryset(self):
+        return super().get_queryset().values("id", "username")
+
+
+class ListUsersPage(PaginatedListGRPCView):
+    queryset = UserModel.objects.all()
+    response_proto = UserPage
+    field_mapping = USER_MAPPING
+    ordering = ("id",)
+
+
+class BatchGetUsers(BatchRetrieveGRPCView):
+    queryset = UserModel.objects.all()
+    response_proto = UserBatch
+    field_mapping = ["id", "username"]
+
+
+class ListGroups(ServerStreamGRPCView):
+    queryset = GroupModel.objects.prefetch_related("permissions__content_type")
+    response_proto = Group
+    field_mapping = {"id": "id", "name": "name", "permissions": PERMISSION_MAPPING}
+
+
+class ListPermissionNames(ServerStreamGRPCView):
+    queryset = PermissionModel.objects.order_by("id")
+    response_proto = User
+    field_mapping = {"id": "id", "username": "codename", "name": "content_type.app_label"}
+    auto_projection = True
+
+
+class ModelToProtobufConverterTest(TestCase):
+    def setUp(self):
+        self.user = UserModel.objects.create(id=1, username="bruce.wayne", first_name="Bruce", last_name="Wayne")
+
+    def test_convert_instance(self):
+        converter = ModelToProtobufConverter(User, USER_MAPPING, UserModel)
+        self.assertEqual(converter(self.user), User(id=1, username="bruce.wayne", name="Bruce Wayne"))
+
+    def test_convert_values_row(self):
+        converter = ModelToProtobufConverter(Permission, {"id": "id", "codename": "codename"}, PermissionModel)
+        row = PermissionModel.objects.values("id", "codename").get(codename="add_user")
+        self.assertEqual(converter(row), Permission(id=row["id"], codename="add_user"))
+
+        # Related fields are read from the rows by their lookup
+        converter = ModelToProtobufConverter(User, {"id": "id", "username": "content_type.model"}, PermissionModel)
+        row = PermissionModel.objects.values("id", "content_type__model").get(codename="add_user")
+        self.assertEqual(converter(row), User(id=row["id"], username="user"))
+
+    def test_nested_messages(self):
+        group = GroupModel.objects.create(name="admins")
+        group.permissions.set(PermissionModel.objects.filter(codename__in=["add_user", "change_user"]))
+        converter = ModelToProtobufConverter(
+            Group, {"id": "id", "name": "name", "permissions": PERMISSION_MAPPING}, GroupModel)
+        user_type = ContentType(app_label="auth", model="user")
+        self.assertEqual(list(converter(group).permissions), [
+            Permission(id=permission.id, codename=permission.codename, content_type=user_type)
+            for permission in group.permissions.all()
+        ])
+
+    def test_mask(self):
+        converter = ModelToProtobufConverter(User, USER_MAPPING, UserModel)
+        self.assertEqual(converter.mask({"name": None})(self.user), User(name="Bruce Wayne"))
+        self.assertIs(converter.mask({"name": None}), converter.mask({"name": None}))
+
+        converter = ModelToProtobufConverter(Permission, PERMISSION_MAPPING, PermissionModel)
+        permission = PermissionModel.objects.get(codename="add_user")
+        self.assertEqual(converter.mask({"content_type": {"model": None}})(permission),
+                         Permission(content_type=ContentType(model="user")))
+
+    def test_invalid_field_mapping(self):
+        with self.assertRaises(ValueError):
+            ModelToProtobufConverter(User, ["id", "email"], UserModel)
+        with self.assertRaises(ValueError):
+            # Nested messages are not converted implicitly
+            ModelToProtobufConverter(Permission, ["id", "content_type"], PermissionModel)
+
+
+class FieldMappingViewTest(TestCase):
+    def setUp(self):
+        for i in range(3):
+            UserModel.objects.create(id=i + 1, username="user.{}".format(i + 1), first_name="Bruce", last_name="Wayne")
+
+    def test_compile_converter(self):
+        self.assertIs(GetUser.compile_converter(), GetUser.compile_converter())
+        self.assertIsNot(ListUsers.compile_converter(), ListUserRows.compile_converter())
+
+    def test_retrieve(self):
+        context = FakeContext()
+        with self.assertNumQueries(1):
+            user = GetUser(GetPayload(id=1), context)()
+        self.assertIsNone(context.code)
+        self.assertEqual(user, User(id=1, username="user.1", name="Bruce Wayne"))
+        self.assertEqual(GetUser(GetPayload(id=1, field_mask=mask("username")), FakeContext())(),
+                         User(username="user.1"))
+
+    def test_server_stream(self):
+        expected = [User(id=i + 1, username="user.{}".format(i + 1)) for i in range(3)]
+        self.assertEqual(list(ListUsers(Empty(), FakeContext())()), expected)
+        self.assertEqual(list(ListUserRows(Empty(), FakeContext())()), expected)
+
+    def test_nested_server_stream(self):
+        group = GroupModel.objects.create(name="admins")
+        group.permissions.set(PermissionModel.objects.filter(codename="add_user"))
+        with self.assertNumQueries(3):
+            groups = list(ListGroups(Empty(), FakeContext())())
+        self.assertEqual(groups[0].permissions[0].content_type, ContentType(app_label="auth", model="user"))
+
+    def test_related_sources_are_projected(self):
+        with self.assertNumQueries(1):
+            permissions = list(ListPermissionNames(Empty(), FakeContext())())
+        self.assertEqual(len(permissions), PermissionModel.objects.count())
+        self.assertEqual([permission.name for permission in permissions],
+                         list(ListPermissionNames.queryset.values_list("content_type__app_label", flat=True)))
+
+    def test_paginated(self):
+        page = ListUsersPage(ListUsersPayload(page_size=2), FakeContext())()
+        self.assertEqual(list(page.results), [User(id=1, username="user.1", name="Bruce Wayne"),
+                                              User(id=2, username="user.2", name="Bruce Wayne")])
+        self.assertTrue(page.next_page_token)
+
+    def test_batch_retrieve(self):
+        batch = BatchGetUsers(BatchGetPayload(ids=[2, 4]), FakeContext())()
+        self.assertEqual(list(batch.results), [User(id=2, username="user.2")])
+        self.assertEqual(list(batch.not_found), [4])
@@ -0,0 +1,165 @@
+import threading
+from unittest import mock
+
+import grpc
+from django.core.signals import request_finished, request_started
+from django.db import OperationalError, connections
+from django.test import SimpleTestCase, TransactionTestCase
+
+from grpc_django.db import ConnectionPool, request_scope
+from grpc_django.exceptions import ConnectionPoolExhausted
+from grpc_django.interfaces import rpc
+from grpc_django.service import GRPCService
+from tests.grpc_codegen.test_pb2 import Empty, GetPayload
+from tests.rpcs import GetUser, ListUsers
+from tests.test_views import FakeContext
+
+
+def run_in_thread(func):
+    result = {}
+
+    def run():
+        try:
+            result['value'] = func()
+        except Exception as ex:
+            result['error'] = ex
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+    if 'error' in result:
+        raise result['error']
+    return result['value']
+
+
+class ConnectionPoolTest(TransactionTestCase):
+    def setUp(self):
+        self.pool = ConnectionPool(2, timeout=0.1)
+        self.addCleanup(self.pool.close_all)
+
+    def checkout(self):
+        self.pool.acquire()
+        connection = connections['default']
+        connection.ensure_connection()
+        self.pool.release()
+        return connection
+
+    def test_connections_are_shared_between_threads(self):
+        connection = run_in_thread(self.checkout)
+        self.assertIs(run_in_thread(self.checkout), connection)
+        self.assertIsNot(connections['default'], connection)
+
+    def test_release_removes_the_connection_of_the_thread(self):
+        self.pool.acquire()
+        connection = connections['default']
+        self.pool.release()
+        self.assertIsNot(connections['default'], connection)
+
+    def test_exhausted_pool(self):
+        held = threading.Barrier(3)
+        release = threading.Event()
+
+        def hold():
+            self.pool.acquire()
+            held.wait()
+            release.wait()
+            self.pool.release()
+
+        threads = [threading.Thread(target=hold) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        try:
+            held.wait()
+            with self.assertRaises(ConnectionPoolExhausted):
+                run_in_thread(self.pool.acquire)
+        finally:
+            release.set()
+            for thread in threads:
+                thread.join()
+
+    def test_unusable_connections_are_closed(self):
+        connection = run_in_thread(self.checkout)
+        # Closing is a no-op on the in-memory test database
+        with mock.patch.object(connection, 'is_usable', return_value=False), mock.patch.object(connection, 'close'):
+            self.pool.acquire()
+            self.pool.release()
+            connection.close.assert_called_once_with()
+
+    def test_connections_are_not_closed_by_the_request_signals(self):
+        connection = run_in_thread(self.checkout)
+
+        def process_rpc():
+            with request_scope(GetUser, FakeContext(), self.pool):
+                self.assertIs(connections['default'], connection)
+
+        # CONN_MAX_AGE is 0, the connections of the threads are closed at the end of every request
+        with mock.patch.object(connection, 'close'):
+            run_in_thread(process_rpc)
+            connection.close.assert_not_called()
+
+    def test_obsolete_connections_are_closed_on_release(self):
+        connection = run_in_thread(self.checkout)
+        with mock.patch.dict(connection.settings_dict, {'CONN_MAX_AGE': 60}), \
+                mock.patch.object(connection, 'close_at', 0), mock.patch.object(connection, 'close'):
+            run_in_thread(self.checkout)
+            connection.close.assert_called_once_with()
+
+    def test_failed_checkout_is_given_back(self):
+        pool = ConnectionPool(1, timeout=0.1, databases=('default', 'other'))
+        self.addCleanup(pool.close_all)
+        create_connection = pool._create_connection
+
+        def fail_other(alias):
+            if alias == 'other':
+                raise OperationalError("unable to open database file")
+            return create_connection(alias)
+
+        def acquire():
+            with self.assertRaises(OperationalError):
+                pool.acquire()
+            return connections['default']
+
+        with mock.patch.object(pool, '_create_connection', side_effect=fail_other):
+            own_connection = run_in_thread(acquire)
+            self.assertEqual(len(pool._idle['default']), 1)
+            self.assertIsNot(own_connection, pool._idle['default'][0])
+            # Neither the connection nor the permit leaked, the pool is not exhausted
+            run_in_thread(acquire)
+            self.assertEqual(len(pool._idle['default']), 1)
+
+
+class RequestScopeTest(SimpleTestCase):
+    def setUp(self):
+        self.signals = []
+        for signal in (request_started, request_finished):
+            receiver = self._get_receiver(signal)
+            signal.connect(receiver, weak=False)
+            self.addCleanup(signal.disconnect, receiver)
+
+    def _get_receiver(self, signal):
+        def receiver(sender, **kwargs):
+            self.signals.append((signal, sender))
+        return receiver
+
+    def test_unary_rpc(self):
+        method = GRPCService._get_rpc_method(rpc('GetUser', GetUser))
+        method(GetPayload(id=1), FakeContext())
+        self.assertEqual(self.signals, [(request_started, GetUser), (request_finished, GetUser)])
+
+    def test_stream_rpc(self):
+        method = GRPCService._get_rpc_method(rpc('ListUsers', ListUsers))
+        stream = method(Empty(), FakeContext())
+        next(stream)
+        self.assertEqual(self.signals, [(request_started, ListUsers)])
+        list(stream)
+        self.assertEqual(self.signals, [(request_started, ListUsers), (request_finished, ListUsers)])
+
+    def test_exhausted_pool_aborts_the_rpc(self):
+        pool = mock.Mock(acquire=mock.Mock(side_effect=ConnectionPoolExhausted(None)))
+        context = mock.Mock(abort=mock.Mock(side_effect=Exception))
+        with self.assertRaises(Exception):
+            with request_scope(GetUser, context, pool):
+                pass
+        context.abort.assert_called_once_with(grpc.StatusCode.RESOURCE_EXHAUSTED, "No database connection available.")
+        pool.release.assert_not_called()
+        self.assertEqual(self.signals, [(request_started, GetUser), (request_finished, GetUser)])
@@ -0,0 +1,71 @@
+from unittest import mock
+
+import grpc
+from django.contrib.auth.models import User as UserModel
+from django.test import SimpleTestCase
+
+from grpc_django.exceptions import ExceptionHandler, NotAuthenticated, PermissionDenied, RateLimiter
+from tests.test_views import FakeContext
+
+
+class NotFoundHandler(ExceptionHandler):
+    _handlers = {LookupError: (grpc.StatusCode.NOT_FOUND, str)}
+
+
+class ExceptionHandlerTest(SimpleTestCase):
+    def handle(self, exc, handler_class=ExceptionHandler):
+        try:
+            raise exc
+        except Exception as ex:
+            return handler_class(FakeContext(), "GetUser")(ex)
+
+    def test_subclasses_are_handled(self):
+        context = self.handle(UserModel.DoesNotExist("User matching query does not exist."))
+        self.assertEqual(context.code, grpc.StatusCode.NOT_FOUND)
+        self.assertEqual(context.details, "User matching query does not exist.")
+        self.assertEqual(self.handle(UserModel.MultipleObjectsReturned()).code, grpc.StatusCode.ALREADY_EXISTS)
+        self.assertEqual(self.handle(KeyError("id"), NotFoundHandler).code, grpc.StatusCode.NOT_FOUND)
+
+    def test_grpc_exceptions(self):
+        context = self.handle(PermissionDenied())
+        self.assertEqual(context.code, grpc.StatusCode.PERMISSION_DENIED)
+        self.assertEqual(context.details, PermissionDenied.default_message)
+        self.assertEqual(self.handle(NotAuthenticated("Expired")).details, "Expired")
+
+    def test_resolve_is_cached_per_class(self):
+        self.assertEqual(ExceptionHandler.resolve(UserModel.DoesNotExist), (grpc.StatusCode.NOT_FOUND, str))
+        self.assertIn(UserModel.DoesNotExist, ExceptionHandler._resolved)
+        self.assertIsNone(ExceptionHandler.resolve(KeyError))
+        self.assertIsNotNone(NotFoundHandler.resolve(KeyError))
+
+    def test_unexpected_exceptions_are_logged(self):
+        with mock.patch.object(ExceptionHandler, "unexpected_limiter", RateLimiter(rate=0, burst=2)), \
+                self.assertLogs("grpc_django", "ERROR") as logs:
+            contexts = [self.handle(ValueError("Invalid value")) for _ in range(3)]
+        self.assertEqual({context.code for context in contexts}, {grpc.StatusCode.UNKNOWN})
+        self.assertIn("ErrorId: ", contexts[0].details)
+        # The third one exceeds the rate
+        self.assertEqual(len(logs.records), 2)
+        record = logs.records[0]
+        self.assertEqual((record.grpc_view, record.grpc_code, record.exception), ("GetUser", "UNKNOWN", "ValueError"))
+        self.assertTrue(contexts[0].details.endswith(record.error_id))
+        self.assertIn("raise exc", logs.output[0])
+
+    def test_expected_exceptions_are_sampled(self):
+        with mock.patch.object(ExceptionHandler, "expected_sample_rate", 1), \
+                self.assertLogs("grpc_django", "DEBUG") as logs:
+            self.handle(UserModel.DoesNotExist())
+        self.assertEqual(logs.records[0].grpc_code, "NOT_FOUND")
+        self.assertIsNone(logs.records[0].exc_info)
+
+        with mock.patch.object(ExceptionHandler, "expected_sample_rate", 0), \
+                self.assertNoLogs("grpc_django", "DEBUG"):
+            self.handle(UserModel.DoesNotExist())
+
+
+class RateLimiterTest(SimpleTestCase):
+    def test_acquire(self):
+        limiter = RateLimiter(rate=10, burst=2)
+        self.assertEqual([limiter.acquire() for _ in range(4)], [0, 0, None, None])
+        limiter.updated -= 0.1
+        self.assertEqual(limiter.acquire(), 2)
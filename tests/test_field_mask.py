@@ -0,0 +1,124 @@
+import grpc
+from django.contrib.auth.models import Permission as PermissionModel, User as UserModel
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from google.protobuf.field_mask_pb2 import FieldMask
+
+from grpc_django.exceptions import InvalidArgument
+from grpc_django.field_mask import get_field_mask_tree, mask_values
+from grpc_django.projection import get_projection
+from tests.grpc_codegen.test_pb2 import GetPayload, ListUsersPayload, Permission, User
+from tests.rpcs import GetUser, ListUsersPage
+from tests.test_projection import GetUser as ProjectedGetUser
+from tests.test_views import FakeContext
+
+
+def get_full_name(obj):
+    return obj["name"] if isinstance(obj, dict) else obj.get_full_name()
+
+
+class FieldsSerializer:
+    """
+    Serializer with a mapping of fields, like the Django REST framework ones
+    """
+    evaluated = []
+
+    def __init__(self, obj):
+        self.obj = obj
+        self._fields = None
+
+    @property
+    def fields(self):
+        if self._fields is None:
+            self._fields = {
+                "id": lambda obj: obj["id"] if isinstance(obj, dict) else obj.id,
+                "username": lambda obj: obj["username"] if isinstance(obj, dict) else obj.username,
+                "name": get_full_name,
+            }
+        return self._fields
+
+    @property
+    def data(self):
+        self.evaluated.extend(self.fields)
+        return {name: get_value(self.obj) for name, get_value in self.fields.items()}
+
+
+class FieldsGetUser(GetUser):
+    serializer_class = FieldsSerializer
+
+
+class ProjectedFieldsGetUser(ProjectedGetUser):
+    serializer_class = FieldsSerializer
+
+
+def mask(*paths):
+    return FieldMask(paths=paths)
+
+
+class FieldMaskTest(SimpleTestCase):
+    def test_get_field_mask_tree(self):
+        self.assertEqual(get_field_mask_tree(["id", "content_type.app_label"], Permission.DESCRIPTOR),
+                         {"id": None, "content_type": {"app_label": None}})
+        for paths in (["content_type", "content_type.model"], ["content_type.model", "content_type"]):
+            self.assertEqual(get_field_mask_tree(paths, Permission.DESCRIPTOR), {"content_type": None})
+        for path in ("email", "id.value", "content_type.name"):
+            with self.assertRaises(InvalidArgument):
+                get_field_mask_tree([path], Permission.DESCRIPTOR)
+
+    def test_mask_values(self):
+        values = {"id": 1, "codename": "add_user", "content_type": {"app_label": "auth", "model": "user"},
+                  "permissions": [{"id": 1, "codename": "add_user"}]}
+        self.assertEqual(mask_values(values, {"codename": None, "content_type": {"model": None},
+                                              "permissions": {"id": None}}),
+                         {"codename": "add_user", "content_type": {"model": "user"}, "permissions": [{"id": 1}]})
+
+    def test_partial_response(self):
+        context = FakeContext()
+        user = GetUser(GetPayload(id=1, field_mask=mask("username")), context)()
+        self.assertIsNone(context.code)
+        self.assertEqual(user, User(username="bruce.wayne"))
+        self.assertEqual(GetUser(GetPayload(id=1), FakeContext())().name, "Bruce Wayne")
+
+    def test_unmasked_serializer_fields_are_not_evaluated(self):
+        FieldsSerializer.evaluated = []
+        self.assertEqual(FieldsGetUser(GetPayload(id=1, field_mask=mask("id", "name")), FakeContext())(),
+                         User(id=1, name="Bruce Wayne"))
+        self.assertEqual(FieldsSerializer.evaluated, ["id", "name"])
+
+    def test_invalid_field_mask(self):
+        context = FakeContext()
+        GetUser(GetPayload(id=1, field_mask=mask("email")), context)()
+        self.assertEqual(context.code, grpc.StatusCode.INVALID_ARGUMENT)
+
+
+class FieldMaskProjectionTest(TestCase):
+    def setUp(self):
+        for i in range(3):
+            UserModel.objects.create(id=i + 1, username="user.{}".format(i + 1), first_name="Bruce", last_name="Wayne")
+
+    def test_get_projection(self):
+        self.assertEqual(get_projection(PermissionModel, Permission.DESCRIPTOR,
+                                        fields=frozenset(["codename", "content_type"])).select_related,
+                         ("content_type",))
+        self.assertEqual(get_projection(PermissionModel, Permission.DESCRIPTOR, fields=frozenset(["id"])).only,
+                         ("id",))
+
+    def test_only_the_masked_columns_are_fetched(self):
+        with CaptureQueriesContext(connection) as queries:
+            user = ProjectedFieldsGetUser(GetPayload(id=1, field_mask=mask("name")), FakeContext())()
+        self.assertEqual(user, User(name="Bruce Wayne"))
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('"username"', queries[0]["sql"])
+
+        # Serializers without fields read all the fields of the response
+        with self.assertNumQueries(1):
+            user = ProjectedGetUser(GetPayload(id=1, field_mask=mask("name")), FakeContext())()
+        self.assertEqual(user, User(name="Bruce Wayne"))
+
+    def test_list(self):
+        context = FakeContext()
+        page = ListUsersPage(ListUsersPayload(page_size=2, field_mask=mask("id")), context)()
+        self.assertIsNone(context.code)
+        self.assertEqual(list(page.results), [User(id=1), User(id=2)])
+        self.assertTrue(page.next_page_token)
@@ -0,0 +1,135 @@
+import collections
+
+import grpc
+from django.test import SimpleTestCase
+
+from grpc_django.utils.interceptors import UnaryStreamServerInterceptor, UnaryUnaryServerInterceptor, \
+    intercept_server
+
+HandlerCallDetails = collections.namedtuple('HandlerCallDetails', ('method', 'invocation_metadata'))
+
+GET_USER = '/test.TestService/GetUser'
+LIST_USERS = '/test.TestService/ListUsers'
+
+
+class RecordingInterceptor(UnaryUnaryServerInterceptor, UnaryStreamServerInterceptor):
+    def __init__(self, name, calls):
+        self.name = name
+        self.calls = calls
+
+    def intercept_unary_unary_handler(self, handler, method, request, servicer_context):
+        self.calls.append((self.name, method))
+        return handler(request, servicer_context)
+
+    def intercept_unary_stream_handler(self, handler, method, request, servicer_context):
+        self.calls.append((self.name, method))
+        yield from handler(request, servicer_context)
+
+
+class UnaryOnlyInterceptor(UnaryUnaryServerInterceptor):
+    def __init__(self, calls):
+        self.calls = calls
+
+    def intercept_unary_unary_handler(self, handler, method, request, servicer_context):
+        self.calls.append(('unary', method))
+        return handler(request, servicer_context)
+
+
+class Server:
+    """
+    Collects the handlers registered by the (intercepting) server
+    """
+    def __init__(self):
+        self.handlers = []
+        self.method_handlers = {}
+
+    def add_generic_rpc_handlers(self, generic_rpc_handlers):
+        self.handlers.extend(generic_rpc_handlers)
+
+    def add_registered_method_handlers(self, service_name, method_handlers):
+        self.method_handlers[service_name] = method_handlers
+
+
+def get_user(request, context):
+    return request
+
+
+def list_users(request, context):
+    yield request
+
+
+GENERIC_HANDLER = grpc.method_handlers_generic_handler('test.TestService', {
+    'GetUser': grpc.unary_unary_rpc_method_handler(get_user),
+    'ListUsers': grpc.unary_stream_rpc_method_handler(list_users),
+})
+
+
+class MetadataGenericHandler(grpc.GenericRpcHandler):
+    """
+    Dispatches on the invocation metadata rather than on the method name only
+    """
+    def __init__(self):
+        self.handlers = {
+            version: grpc.unary_unary_rpc_method_handler(lambda request, context, version=version: version)
+            for version in ('v1', 'v2')
+        }
+
+    def service(self, handler_call_details):
+        return self.handlers[dict(handler_call_details.invocation_metadata)['version']]
+
+
+def service(server, method, metadata=()):
+    return server.handlers[0].service(HandlerCallDetails(method, metadata))
+
+
+class InterceptServerTest(SimpleTestCase):
+    def test_last_interceptor_is_called_first(self):
+        calls, server = [], Server()
+        intercept_server(server, RecordingInterceptor('a', calls), RecordingInterceptor('b', calls)) \
+            .add_generic_rpc_handlers((GENERIC_HANDLER,))
+        self.assertEqual(service(server, GET_USER).unary_unary('request', None), 'request')
+        self.assertEqual(list(service(server, LIST_USERS).unary_stream('request', None)), ['request'])
+        self.assertEqual(calls, [('b', GET_USER), ('a', GET_USER), ('b', LIST_USERS), ('a', LIST_USERS)])
+
+    def test_nested_servers_are_flattened(self):
+        calls, server = [], Server()
+        inner = intercept_server(server, RecordingInterceptor('inner', calls))
+        outer = intercept_server(inner, RecordingInterceptor('outer', calls))
+        self.assertIs(outer._server, server)
+        outer.add_generic_rpc_handlers((GENERIC_HANDLER,))
+        service(server, GET_USER).unary_unary('request', None)
+        # The innermost server wraps the handlers last, its interceptors are called first
+        self.assertEqual(calls, [('inner', GET_USER), ('outer', GET_USER)])
+
+    def test_interceptors_of_other_rpc_types_are_skipped(self):
+        calls, server = [], Server()
+        intercept_server(server, UnaryOnlyInterceptor(calls)).add_generic_rpc_handlers((GENERIC_HANDLER,))
+        list_users_handler = GENERIC_HANDLER.service(HandlerCallDetails(LIST_USERS, ()))
+        # Returned as is when no interceptor applies
+        self.assertIs(service(server, LIST_USERS), list_users_handler)
+        service(server, GET_USER).unary_unary('request', None)
+        self.assertEqual(calls, [('unary', GET_USER)])
+        self.assertIsNone(service(server, '/test.TestService/Unknown'))
+
+    def test_registered_method_handlers(self):
+        calls, server = [], Server()
+        intercept_server(server, RecordingInterceptor('a', calls)).add_registered_method_handlers(
+            'test.TestService', {'GetUser': grpc.unary_unary_rpc_method_handler(get_user)})
+        server.method_handlers['test.TestService']['GetUser'].unary_unary('request', None)
+        self.assertEqual(calls, [('a', GET_USER)])
+
+    def test_handlers_dispatching_on_metadata(self):
+        calls, server = [], Server()
+        intercept_server(server, RecordingInterceptor('a', calls)).add_generic_rpc_handlers(
+            (MetadataGenericHandler(),))
+        v1 = service(server, GET_USER, (('version', 'v1'),))
+        self.assertEqual(v1.unary_unary('request', None), 'v1')
+        self.assertEqual(service(server, GET_USER, (('version', 'v2'),)).unary_unary('request', None), 'v2')
+        self.assertEqual(service(server, GET_USER, (('version', 'v1'),)).unary_unary('request', None), 'v1')
+        self.assertEqual(len(calls), 3)
+        # The chain is compiled again only when another method handler is returned
+        self.assertIs(service(server, GET_USER, (('version', 'v1'),)), service(server, GET_USER, (('version', 'v1'),)))
+
+    def test_invalid_interceptor(self):
+        with self.assertRaises(TypeError):
+            intercept_server(Server(), object())
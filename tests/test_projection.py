@@ -0,0 +1,110 @@
+from django.contrib.auth.models import Group as GroupModel, Permission as PermissionModel, User as UserModel
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from grpc_django.projection import Projection, get_projection
+from grpc_django.views import RetrieveGRPCView, ServerStreamGRPCView
+from tests.grpc_codegen.test_pb2 import GetPayload, Group, Permission, User
+from tests.rpcs import ListUsersPage, UserModelSerializer
+from tests.test_views import FakeContext
+
+
+class PermissionSerializer:
+    def __init__(self, obj):
+        self.obj = obj
+
+    @property
+    def data(self):
+        return {
+            "id": self.obj.id,
+            "codename": self.obj.codename,
+            "content_type": {"app_label": self.obj.content_type.app_label, "model": self.obj.content_type.model},
+        }
+
+
+class GroupSerializer:
+    def __init__(self, obj):
+        self.obj = obj
+
+    @property
+    def data(self):
+        return {
+            "id": self.obj.id,
+            "name": self.obj.name,
+            "permissions": [PermissionSerializer(permission).data for permission in self.obj.permissions.all()],
+        }
+
+
+class ListPermissions(ServerStreamGRPCView):
+    queryset = PermissionModel.objects.filter(content_type__app_label="auth")
+    response_proto = Permission
+    serializer_class = PermissionSerializer
+    auto_projection = True
+
+
+class ListGroups(ServerStreamGRPCView):
+    queryset = GroupModel.objects.all()
+    response_proto = Group
+    serializer_class = GroupSerializer
+    auto_projection = True
+
+
+class GetUser(RetrieveGRPCView):
+    queryset = UserModel.objects.all()
+    response_proto = User
+    serializer_class = UserModelSerializer
+    auto_projection = True
+    projection_fields = ("first_name", "last_name")
+
+
+class ProjectionTest(TestCase):
+    def test_get_projection(self):
+        self.assertEqual(get_projection(UserModel, User.DESCRIPTOR), Projection(("id", "username"), (), ()))
+        self.assertEqual(get_projection(PermissionModel, Permission.DESCRIPTOR), Projection(
+            ("id", "codename", "content_type", "content_type__app_label", "content_type__model"),
+            ("content_type",), ()))
+        projection = get_projection(GroupModel, Group.DESCRIPTOR)
+        self.assertEqual(projection[:2], (("id", "name"), ()))
+        prefetch, = projection.prefetch_related
+        self.assertEqual(prefetch.prefetch_to, "permissions")
+        self.assertEqual(prefetch.queryset.query.select_related, {"content_type": {}})
+        self.assertEqual(get_projection(GroupModel, Group.DESCRIPTOR, max_depth=1).prefetch_related[0].queryset.query
+                         .select_related, False)
+        self.assertEqual(get_projection(PermissionModel, Permission.DESCRIPTOR, max_depth=0),
+                         Projection(("id", "codename", "content_type"), (), ()))
+
+    def test_extra_lookups(self):
+        self.assertEqual(get_projection(UserModel, User.DESCRIPTOR, ("first_name", "groups__name")),
+                         Projection(("id", "username", "first_name"), (), ("groups",)))
+        self.assertEqual(get_projection(PermissionModel, User.DESCRIPTOR, ("content_type__app_label",)), Projection(
+            ("id", "name", "content_type", "content_type__app_label"), ("content_type",), ()))
+        # Already selected along for the nested message
+        projection = get_projection(PermissionModel, Permission.DESCRIPTOR, ("content_type__model",))
+        self.assertEqual(projection.select_related, ("content_type",))
+
+    def test_related_objects_are_fetched_along(self):
+        with self.assertNumQueries(1):
+            permissions = list(ListPermissions(GetPayload(), FakeContext())())
+        self.assertEqual(len(permissions), PermissionModel.objects.filter(content_type__app_label="auth").count())
+        self.assertEqual(permissions[0].content_type.app_label, "auth")
+
+        group = GroupModel.objects.create(name="admins")
+        group.permissions.set(PermissionModel.objects.all()[:3])
+        GroupModel.objects.create(name="users")
+        with self.assertNumQueries(2):
+            groups = list(ListGroups(GetPayload(), FakeContext())())
+        self.assertEqual([len(group.permissions) for group in groups], [3, 0])
+
+    def test_only_the_response_fields_are_fetched(self):
+        UserModel.objects.create(id=1, username="bruce.wayne", first_name="Bruce", last_name="Wayne", password="x")
+        with CaptureQueriesContext(connection) as queries:
+            user = GetUser(GetPayload(id=1), FakeContext())()
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("password", queries[0]["sql"])
+        self.assertEqual((user.username, user.name), ("bruce.wayne", "Bruce Wayne"))
+
+    def test_ordering_fields_are_fetched(self):
+        view = ListUsersPage(GetPayload(), FakeContext())
+        view.auto_projection = True
+        self.assertEqual(view.get_projection(UserModel.objects.all()).only, ("id", "username", "last_name"))
@@ -0,0 +1,64 @@
+from django.test import SimpleTestCase
+from google.protobuf.descriptor_pb2 import FieldDescriptorProto, FileDescriptorProto
+from google.protobuf.struct_pb2 import Struct
+
+from grpc_django import protobuf_to_dict as codec
+from grpc_django.protobuf_to_dict import TYPE_CALLABLE_MAP, dict_to_protobuf, protobuf_to_dict
+from tests.grpc_codegen.test_pb2 import User
+
+
+FILE_DESCRIPTOR = {
+    "name": "users.proto",
+    "dependency": ["google/protobuf/timestamp.proto"],
+    "message_type": [{
+        "name": "User",
+        "field": [
+            {"name": "id", "number": 1, "type": FieldDescriptorProto.TYPE_INT64},
+            {"name": "username", "number": 2, "type": "TYPE_STRING", "label": "LABEL_OPTIONAL"},
+        ]
+    }]
+}
+
+
+class ProtobufToDictTest(SimpleTestCase):
+    def test_round_trip_nested_and_repeated(self):
+        message = dict_to_protobuf(FileDescriptorProto, FILE_DESCRIPTOR)
+        self.assertEqual(message.message_type[0].field[1].type, FieldDescriptorProto.TYPE_STRING)
+        self.assertEqual(message.message_type[0].field[1].label, FieldDescriptorProto.LABEL_OPTIONAL)
+
+        result = protobuf_to_dict(message, use_enum_labels=True)
+        self.assertEqual(result["dependency"], ["google/protobuf/timestamp.proto"])
+        self.assertEqual(result["message_type"][0]["field"][0]["type"], "TYPE_INT64")
+
+    def test_recursive_message_map(self):
+        values = {"fields": {"user": {"struct_value": {"fields": {"name": {"string_value": "Bruce Wayne"}}}}}}
+        message = dict_to_protobuf(Struct, values)
+        self.assertEqual(message["user"]["name"], "Bruce Wayne")
+        self.assertEqual(protobuf_to_dict(message), values)
+
+    def test_ignore_none_and_strict(self):
+        message = dict_to_protobuf(User, {"id": 1, "name": None}, ignore_none=True)
+        self.assertEqual(message, User(id=1))
+        self.assertEqual(dict_to_protobuf(User, {"id": 1, "unknown": 2}, strict=False), User(id=1))
+        with self.assertRaises(KeyError):
+            dict_to_protobuf(User, {"id": 1, "unknown": 2})
+
+    def test_string_placeholders_and_defaults(self):
+        self.assertEqual(protobuf_to_dict(User(id=1, name="None", username="Nil")),
+                         {"id": 1, "name": None, "username": ""})
+        self.assertEqual(protobuf_to_dict(User(id=1), including_default_value_fields=True),
+                         {"id": 1, "name": "", "username": ""})
+
+    def test_plans_of_conversion_maps_built_per_call(self):
+        protobuf_to_dict(User(id=1))
+        plans = len(codec._codec_plans)
+        for i in range(10):
+            self.assertEqual(protobuf_to_dict(User(id=1, username="x"), type_callable_map=dict(TYPE_CALLABLE_MAP)),
+                             {"id": 1, "username": "x"})
+        self.assertEqual(len(codec._codec_plans), plans + 1)
+
+        # A map of different contents gets its own plan, even if it reuses the identity of a collected map
+        upper_map = dict(TYPE_CALLABLE_MAP)
+        upper_map[FieldDescriptorProto.TYPE_STRING] = str.upper
+        self.assertEqual(protobuf_to_dict(User(id=1, username="x"), type_callable_map=upper_map),
+                         {"id": 1, "username": "X"})
@@ -0,0 +1,69 @@
+import collections
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.test import SimpleTestCase
+from google.protobuf import descriptor_pool
+
+from grpc_django import codegen, protos
+from grpc_django.interfaces import IService
+from grpc_django.service import GRPCService
+from tests.grpc_codegen.test_pb2 import GetPayload, User
+from tests.test_views import FakeContext
+
+HandlerCallDetails = collections.namedtuple('HandlerCallDetails', ('method', 'invocation_metadata'))
+
+PROTO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'protos')
+
+
+class DescriptorLoaderTest(SimpleTestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir)
+
+    def load(self, inclusion_root=PROTO_ROOT):
+        loader = protos.DescriptorLoader(inclusion_root, self.cache_dir, descriptor_pool.DescriptorPool())
+        with mock.patch.object(protos, 'run_protoc', wraps=codegen.run_protoc) as run_protoc:
+            file_descriptor = loader.load(os.path.join(inclusion_root, 'test.proto'))
+        return loader, file_descriptor, run_protoc.call_count
+
+    def test_load(self):
+        loader, file_descriptor, compilations = self.load()
+        self.assertEqual(compilations, 1)
+        self.assertEqual(file_descriptor.name, 'test.proto')
+        self.assertIn('GetUser', file_descriptor.services_by_name['TestService'].methods_by_name)
+        user_class = protos.get_message_class('test.User', loader.pool)
+        user = user_class.FromString(User(id=1, username='bruce.wayne').SerializeToString())
+        self.assertEqual((user.id, user.username), (1, 'bruce.wayne'))
+
+    def test_descriptor_sets_are_cached_by_digest(self):
+        self.load()
+        self.assertEqual(self.load()[2], 0)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+
+        inclusion_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, inclusion_root)
+        with open(os.path.join(PROTO_ROOT, 'test.proto')) as f:
+            source = f.read()
+        with open(os.path.join(inclusion_root, 'test.proto'), 'w') as f:
+            f.write(source + '\nmessage Team { string name = 1; }\n')
+        loader, file_descriptor, compilations = self.load(inclusion_root)
+        self.assertEqual(compilations, 1)
+        self.assertIn('Team', file_descriptor.message_types_by_name)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 2)
+
+
+class RuntimeServiceTest(SimpleTestCase):
+    def test_generic_handler(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        service = GRPCService(IService('TestService', 'test', 'tests/protos/test.proto', 'tests.rpcs',
+                                       load_proto=True), descriptor_cache=cache_dir)
+        method_handler = service.get_generic_handler().service(
+            HandlerCallDetails('/test.TestService/GetUser', ()))
+        request = method_handler.request_deserializer(GetPayload(id=1).SerializeToString())
+        self.assertIsNot(type(request), GetPayload)
+        response = method_handler.unary_unary(request, FakeContext())
+        self.assertEqual(User.FromString(method_handler.response_serializer(response)).name, 'Bruce Wayne')
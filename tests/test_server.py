@@ -1,11 +1,27 @@
+import asyncio
+import inspect
+import threading
+import time
 from io import StringIO
+from urllib.request import urlopen
+from unittest import mock
 
 import grpc
-from django.test import TestCase
+from django.db import connections
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
 
-from grpc_django.server import init_server
+from grpc_django.db import ConnectionPool
+from grpc_django.exceptions import ConnectionPoolExhausted, GrpcServerStartError
+from grpc_django.interfaces import IServerOptions, IWarmup
+from grpc_django.server import WorkerThreadPool, init_aio_server, init_server, serve, stop_aio_server, stop_server
+from grpc_django.settings import settings
+from grpc_django.supervisor import ProcessSupervisor, WorkerOutput, serve_process
+from grpc_django.utils.interceptors import AioInFlightInterceptor, InFlightInterceptor, MetricsInterceptor, \
+    start_metrics_server
+from grpc_django.warmup import Warmup
 from tests.grpc_codegen.test_pb2 import GetPayload, User, Empty
 from tests.grpc_codegen.test_pb2_grpc import TestServiceStub
+from tests.rpcs import GetUser
 
 
 TEST_USERS = {
@@ -36,5 +52,288 @@ class GrpcServerTest(TestCase):
         for _ in response:
             self.assertIsInstance(_, User)
 
+    def test_bidi_stream(self):
+        responses = self.client_stub.SyncUsers(iter([GetPayload(id=1), GetPayload(id=3), GetPayload(id=2)]))
+        self.assertEqual([user.id for user in responses], [1, 2])
+
     def tearDown(self):
         self.server.stop(0)
+
+
+class GracefulShutdownTest(SimpleTestCase):
+    def test_drains_in_flight_rpcs(self):
+        started, release = threading.Event(), threading.Event()
+        retrieve = GetUser.retrieve
+
+        def slow_retrieve(view):
+            started.set()
+            release.wait(5)
+            return retrieve(view)
+
+        in_flight, thread_pool, stdout = InFlightInterceptor(), WorkerThreadPool(max_workers=2), StringIO()
+        server = init_server('127.0.0.1', '55002', stdout=StringIO(), interceptors=[in_flight],
+                             thread_pool=thread_pool)
+        server.start()
+        with mock.patch.object(GetUser, 'retrieve', slow_retrieve):
+            channel = grpc.insecure_channel("localhost:55002")
+            future = TestServiceStub(channel).GetUser.future(GetPayload(id=1))
+            self.assertTrue(started.wait(5))
+            self.assertEqual(in_flight.count, 1)
+            threading.Timer(0.2, release.set).start()
+            stop_server(server, 5, in_flight=in_flight, thread_pool=thread_pool, stdout=stdout)
+        self.assertEqual(future.result(), TEST_USERS[1])
+        self.assertIn("Drained 1 in-flight RPCs, cancelled 0", stdout.getvalue())
+        channel.close()
+
+
+class ServerOptionsTest(SimpleTestCase):
+    def test_channel_args(self):
+        options = IServerOptions(max_receive_message_length=-1, keepalive_permit_without_calls=True,
+                                 extra_channel_args={'grpc.max_connection_idle_ms': 60000})
+        self.assertEqual(options.get_channel_args(), [
+            ('grpc.max_receive_message_length', -1),
+            ('grpc.keepalive_permit_without_calls', 1),
+            ('grpc.max_connection_idle_ms', 60000),
+        ])
+        with self.assertRaises(TypeError):
+            IServerOptions(max_concurrent_streams="100")
+        with self.assertRaises(ValueError):
+            IServerOptions(keepalive_time_ms=-1)
+
+    def test_sheds_load_over_maximum_concurrent_rpcs(self):
+        started, release = threading.Event(), threading.Event()
+        retrieve = GetUser.retrieve
+
+        def slow_retrieve(view):
+            started.set()
+            release.wait(5)
+            return retrieve(view)
+
+        server = init_server('127.0.0.1', '55003', max_workers=2, stdout=StringIO(),
+                             options=IServerOptions(maximum_concurrent_rpcs=1))
+        server.start()
+        channel = grpc.insecure_channel("localhost:55003")
+        stub = TestServiceStub(channel)
+        try:
+            with mock.patch.object(GetUser, 'retrieve', slow_retrieve):
+                future = stub.GetUser.future(GetPayload(id=1))
+                self.assertTrue(started.wait(5))
+                with self.assertRaises(grpc.RpcError) as error:
+                    stub.GetUser(GetPayload(id=2))
+                self.assertEqual(error.exception.code(), grpc.StatusCode.RESOURCE_EXHAUSTED)
+                release.set()
+                self.assertEqual(future.result(), TEST_USERS[1])
+        finally:
+            channel.close()
+            server.stop(0)
+
+
+class AioGracefulShutdownTest(SimpleTestCase):
+    async def test_drains_in_flight_rpcs(self):
+        started, release = threading.Event(), threading.Event()
+        retrieve = GetUser.retrieve
+
+        def slow_retrieve(view):
+            started.set()
+            release.wait(5)
+            return retrieve(view)
+
+        in_flight, thread_pool, stdout = AioInFlightInterceptor(), WorkerThreadPool(max_workers=2), StringIO()
+        server = init_aio_server('127.0.0.1', '55007', stdout=StringIO(), interceptors=[in_flight],
+                                 thread_pool=thread_pool)
+        await server.start()
+        loop = asyncio.get_running_loop()
+        with mock.patch.object(GetUser, 'retrieve', slow_retrieve):
+            async with grpc.aio.insecure_channel("localhost:55007") as channel:
+                call = asyncio.ensure_future(TestServiceStub(channel).GetUser(GetPayload(id=1)))
+                self.assertTrue(await loop.run_in_executor(None, started.wait, 5))
+                self.assertEqual(in_flight.count, 1)
+                threading.Timer(0.2, release.set).start()
+                await stop_aio_server(server, 5, in_flight=in_flight, thread_pool=thread_pool, stdout=stdout)
+                self.assertEqual(await call, TEST_USERS[1])
+        self.assertEqual(in_flight.count, 0)
+        self.assertIn("Drained 1 in-flight RPCs, cancelled 0", stdout.getvalue())
+
+    async def test_tracks_async_behaviors(self):
+        in_flight = AioInFlightInterceptor()
+
+        async def get(request, context):
+            return in_flight.count
+
+        async def stream(request, context):
+            yield in_flight.count
+
+        async def continuation(handler):
+            return handler
+
+        handler = await in_flight.intercept_service(continuation, grpc.unary_unary_rpc_method_handler(get))
+        self.assertTrue(inspect.iscoroutinefunction(handler.unary_unary))
+        self.assertEqual(await handler.unary_unary(None, None), 1)
+        handler = await in_flight.intercept_service(continuation, grpc.unary_stream_rpc_method_handler(stream))
+        self.assertTrue(inspect.isasyncgenfunction(handler.unary_stream))
+        self.assertEqual([count async for count in handler.unary_stream(None, None)], [1])
+        self.assertEqual(in_flight.count, 0)
+
+
+class MetricsInterceptorTest(SimpleTestCase):
+    def test_metrics(self):
+        metrics = MetricsInterceptor()
+        server = init_server('127.0.0.1', '55004', stdout=StringIO(), interceptors=[metrics])
+        server.start()
+        metrics_server = start_metrics_server(metrics, '127.0.0.1', 55005)
+        channel = grpc.insecure_channel("localhost:55004")
+        try:
+            stub = TestServiceStub(channel)
+            stub.GetUser(GetPayload(id=1))
+            with self.assertRaises(grpc.RpcError):
+                stub.GetUser(GetPayload(id=3))
+            self.assertEqual(len(list(stub.ListUsers(Empty()))), 2)
+            body = urlopen("http://127.0.0.1:55005/metrics").read().decode()
+        finally:
+            channel.close()
+            server.stop(0)
+            metrics_server.shutdown()
+
+        labels = 'grpc_type="unary",grpc_service="test.TestService",grpc_method="GetUser"'
+        self.assertIn('grpc_server_handled_total{%s,grpc_code="OK"} 1' % labels, body)
+        self.assertIn('grpc_server_handled_total{%s,grpc_code="NOT_FOUND"} 1' % labels, body)
+        self.assertIn('grpc_server_handling_seconds_count{%s} 2' % labels, body)
+        self.assertIn('grpc_server_msg_sent_total{%s} 1' % labels, body)
+        labels = 'grpc_type="server_stream",grpc_service="test.TestService",grpc_method="ListUsers"'
+        self.assertIn('grpc_server_msg_sent_total{%s} 2' % labels, body)
+        self.assertIn('grpc_server_stream_msgs_sent_bucket{%s,le="10.0"} 1' % labels, body)
+
+    def test_aborted_rpcs(self):
+        metrics = MetricsInterceptor()
+        pool = ConnectionPool(1)
+        server = init_server('127.0.0.1', '55010', stdout=StringIO(), interceptors=[metrics], connection_pool=pool)
+        server.start()
+        channel = grpc.insecure_channel("localhost:55010")
+        try:
+            stub = TestServiceStub(channel)
+            with mock.patch.object(pool, 'acquire', side_effect=ConnectionPoolExhausted("No connection")):
+                with self.assertRaises(grpc.RpcError) as get_error:
+                    stub.GetUser(GetPayload(id=1))
+                with self.assertRaises(grpc.RpcError) as list_error:
+                    list(stub.ListUsers(Empty()))
+        finally:
+            channel.close()
+            server.stop(0)
+            pool.close_all()
+
+        self.assertEqual(get_error.exception.code(), grpc.StatusCode.RESOURCE_EXHAUSTED)
+        self.assertEqual(list_error.exception.code(), grpc.StatusCode.RESOURCE_EXHAUSTED)
+        body = metrics.render()
+        for rpc_type, method in (("unary", "GetUser"), ("server_stream", "ListUsers")):
+            labels = 'grpc_type="{}",grpc_service="test.TestService",grpc_method="{}"'.format(rpc_type, method)
+            self.assertIn('grpc_server_handled_total{%s,grpc_code="RESOURCE_EXHAUSTED"} 1' % labels, body)
+
+
+class GrpcAioServerTest(SimpleTestCase):
+    def test_metrics_are_not_supported(self):
+        with self.assertRaises(GrpcServerStartError):
+            serve('127.0.0.1', '55008', use_asyncio=True, stdout=StringIO(), metrics_port=55009)
+        with mock.patch.object(settings, 'metrics_port', 55009), self.assertRaises(GrpcServerStartError):
+            serve('127.0.0.1', '55008', use_asyncio=True, stdout=StringIO())
+
+    async def test_sync_views(self):
+        server = init_aio_server('127.0.0.1', '55001', max_workers=1, stdout=StringIO())
+        await server.start()
+        try:
+            async with grpc.aio.insecure_channel("localhost:55001") as channel:
+                stub = TestServiceStub(channel)
+                self.assertEqual(await stub.GetUser(GetPayload(id=1)), TEST_USERS[1])
+                async for user in stub.ListUsers(Empty()):
+                    self.assertIsInstance(user, User)
+        finally:
+            await server.stop(0)
+
+
+class ProcessSupervisorTest(SimpleTestCase):
+    def test_restarts_crashed_processes(self):
+        supervisor = ProcessSupervisor(time.sleep, args=(60,), num_of_processes=2, stdout=StringIO())
+        supervisor.RESTART_DELAY = 0
+        supervisor.start()
+        try:
+            crashed, _ = supervisor._processes[0]
+            crashed.kill()
+            crashed.join()
+            supervisor.check_processes()
+            restarted, _ = supervisor._processes[0]
+            self.assertNotEqual(restarted.pid, crashed.pid)
+            self.assertTrue(restarted.is_alive())
+        finally:
+            supervisor.stop()
+        self.assertFalse(any(process.is_alive() for process, _ in supervisor._processes.values()))
+
+    def test_restart_delay_does_not_block(self):
+        supervisor = ProcessSupervisor(time.sleep, args=(60,), num_of_processes=2, stdout=StringIO())
+        supervisor.RESTART_DELAY = 0.5
+        supervisor.start()
+        try:
+            crashed, _ = supervisor._processes[0]
+            crashed.kill()
+            crashed.join()
+            started = time.monotonic()
+            supervisor.check_processes()
+            self.assertLess(time.monotonic() - started, supervisor.RESTART_DELAY)
+            self.assertIs(supervisor._processes[0][0], crashed)
+            self.assertLessEqual(supervisor.get_wait_timeout(), supervisor.RESTART_DELAY)
+
+            time.sleep(supervisor.get_wait_timeout())
+            supervisor.check_processes()
+            restarted, _ = supervisor._processes[0]
+            self.assertNotEqual(restarted.pid, crashed.pid)
+            self.assertEqual(supervisor.get_wait_timeout(), 1)
+        finally:
+            supervisor.stop()
+
+
+class WorkerOutputTest(SimpleTestCase):
+    def test_lines_are_prefixed(self):
+        stream = StringIO()
+        stdout = WorkerOutput(1, stream)
+        stdout.write("\nAdding GRPC services: TestService\n\nStarting")
+        self.assertEqual(stream.getvalue(), "\n[worker 1] Adding GRPC services: TestService\n\n")
+        stdout.write(" server\n")
+        stdout.write("Drained")
+        stdout.flush()
+        self.assertEqual(stream.getvalue().splitlines()[-2:], ["[worker 1] Starting server", "[worker 1] Drained"])
+
+    def test_shutdown_report_of_the_workers(self):
+        def serve(*args, stdout, **kwargs):
+            stdout.write("Drained 2 in-flight RPCs, cancelled 1\n")
+
+        with mock.patch('grpc_django.server.serve', serve), mock.patch('signal.signal'), \
+                mock.patch('sys.stdout', new_callable=StringIO) as stream:
+            serve_process('127.0.0.1', '55000', slot=3)
+        self.assertEqual(stream.getvalue(), "[worker 3] Drained 2 in-flight RPCs, cancelled 1\n")
+
+
+class WarmupTest(TransactionTestCase):
+    def test_replays_canned_requests_before_listening(self):
+        stdout = StringIO()
+        warmup = IWarmup(open_connections=False, requests={
+            '/test.TestService/GetUser': [{'id': 1}, GetPayload(id=3)],
+            '/test.TestService/ListUsers': [Empty()],
+        })
+        with mock.patch.object(GetUser, 'retrieve', autospec=True, side_effect=GetUser.retrieve) as retrieve:
+            server = init_server('127.0.0.1', '55006', stdout=stdout, warmup=warmup)
+        self.assertEqual(retrieve.call_count, 2)
+        self.assertIn("replayed 3 requests (1 failed, 0 timed out)", stdout.getvalue())
+        server.stop(None)
+
+    def test_unknown_rpc(self):
+        with self.assertRaises(LookupError):
+            init_server('127.0.0.1', '55006', stdout=StringIO(),
+                        warmup=IWarmup(requests={'/test.TestService/DeleteUser': [{}]}))
+
+    def test_opens_persistent_connections_of_the_workers(self):
+        thread_pool = WorkerThreadPool(max_workers=2)
+        self.addCleanup(thread_pool.shutdown)
+        self.addCleanup(thread_pool.run_in_each_thread, connections.close_all)
+        with mock.patch.dict(connections.settings['default'], CONN_MAX_AGE=60):
+            Warmup(IWarmup(), stdout=StringIO()).run([], thread_pool)
+        opened = []
+        thread_pool.run_in_each_thread(lambda: opened.append(connections['default'].connection is not None))
+        self.assertEqual(opened, [True, True])
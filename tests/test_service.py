@@ -0,0 +1,52 @@
+from django.test import SimpleTestCase
+
+from grpc_django.exceptions import GrpcServerStartError
+from grpc_django.interfaces import IService, rpc
+from grpc_django.service import GRPCService
+from tests.rpcs import CreateUsers, GetUser, ListUsers, SyncUsers
+from tests.test_views import AsyncGetUser, AsyncListUsers
+
+
+def get_service(*rpcs):
+    service = GRPCService(IService('TestService', 'test', 'tests/protos/test.proto', 'tests.rpcs',
+                                   'tests.grpc_codegen'))
+    service.rpcs = list(rpcs)
+    return service
+
+
+class GetRpcMethodsTest(SimpleTestCase):
+    def test_streaming_mismatches_are_rejected(self):
+        mismatches = [
+            # Response streaming
+            rpc("GetUser", ListUsers),
+            rpc("ListUsers", GetUser),
+            # Request streaming
+            rpc("GetUser", CreateUsers),
+            rpc("CreateUsers", GetUser),
+            rpc("SyncUsers", ListUsers),
+            rpc("ListUsers", SyncUsers),
+            # Both
+            rpc("GetUser", SyncUsers),
+            rpc("SyncUsers", GetUser),
+        ]
+        for mismatch in mismatches:
+            with self.subTest(rpc=mismatch.name, view=mismatch.view.__name__):
+                with self.assertRaises(GrpcServerStartError):
+                    get_service(mismatch).get_rpc_methods()
+
+    def test_async_views_require_the_asyncio_server(self):
+        for _rpc in (rpc("GetUser", AsyncGetUser), rpc("ListUsers", AsyncListUsers)):
+            with self.subTest(rpc=_rpc.name):
+                with self.assertRaises(GrpcServerStartError):
+                    get_service(_rpc).get_rpc_methods()
+                self.assertEqual(len(get_service(_rpc).get_rpc_methods(use_asyncio=True)), 1)
+
+    def test_unknown_rpc(self):
+        with self.assertRaises(LookupError):
+            get_service(rpc("DeleteUser", GetUser)).get_rpc_methods()
+
+    def test_matching_views(self):
+        service = get_service(rpc("GetUser", GetUser), rpc("ListUsers", ListUsers), rpc("CreateUsers", CreateUsers),
+                              rpc("SyncUsers", SyncUsers))
+        self.assertEqual([method.name for method, _ in service.get_rpc_methods()],
+                         ["GetUser", "ListUsers", "CreateUsers", "SyncUsers"])
@@ -0,0 +1,346 @@
+import datetime
+import threading
+import time
+from unittest import mock
+
+import grpc
+from django.contrib.auth.models import Permission as PermissionModel, User as UserModel
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+
+from grpc_django.views import AsyncRetrieveGRPCView, AsyncServerStreamGRPCView, ServerStreamGRPCView
+from tests.grpc_codegen.test_pb2 import (
+    BatchGetPayload, Empty, GetPayload, ListUsersPayload, NewUser, Permission, User,
+)
+from tests.rpcs import (
+    BatchGetUsers, CreateUsers, ListUsers, ListUsersPage, SyncUsers, USERS, UserModelSerializer, UserSerializer
+)
+
+
+class FakeContext:
+    def __init__(self, metadata=()):
+        self.metadata = metadata
+        self.code = None
+        self.details = None
+
+    def invocation_metadata(self):
+        return self.metadata
+
+    def set_code(self, code):
+        self.code = code
+
+    def set_details(self, details):
+        self.details = details
+
+
+class BatchedListUsers(ListUsers):
+    batch_size = 1
+
+
+class ValuesListUsers(ServerStreamGRPCView):
+    response_proto = User
+    batch_size = 10
+
+    def get_queryset(self):
+        return USERS
+
+
+class ServerStreamViewTest(SimpleTestCase):
+    def test_batched_stream_matches_row_stream(self):
+        expected = list(ListUsers(Empty(), FakeContext())())
+        self.assertEqual(list(BatchedListUsers(Empty(), FakeContext())()), expected)
+        self.assertEqual(list(ValuesListUsers(Empty(), FakeContext())()), expected)
+
+
+class ChunkedListUsers(ServerStreamGRPCView):
+    queryset = UserModel.objects.order_by('id').values('id', 'username')
+    response_proto = User
+    serializer_class = UserSerializer
+    chunk_size = 1
+
+
+class ChunkedServerStreamViewTest(TestCase):
+    def setUp(self):
+        for user in USERS:
+            UserModel.objects.create(id=user["id"], username=user["username"])
+
+    def test_chunked_stream(self):
+        view = ChunkedListUsers(Empty(), FakeContext())
+        queryset = view.get_queryset()
+        stream = view.get_iterator(queryset)
+        self.assertEqual(next(stream), {"id": 1, "username": "bruce.wayne"})
+        self.assertIsNone(queryset._result_cache)
+
+        expected = [User(id=user["id"], username=user["username"]) for user in USERS]
+        self.assertEqual(list(ChunkedListUsers(Empty(), FakeContext())()), expected)
+
+
+class ListUsersByDateJoined(ListUsersPage):
+    ordering = ("date_joined", "id")
+
+
+class PaginatedListViewTest(TestCase):
+    def setUp(self):
+        for i in range(5):
+            UserModel.objects.create(id=i + 1, username="user.{}".format(i + 1), last_name="Wayne" if i % 2 else "Kent")
+
+    def test_pages(self):
+        ids, token = [], ""
+        for _ in range(3):
+            context = FakeContext()
+            page = ListUsersPage(ListUsersPayload(page_size=2, page_token=token), context)()
+            self.assertIsNone(context.code)
+            ids.extend(user.id for user in page.results)
+            token = page.next_page_token
+        self.assertEqual(ids, [2, 4, 1, 3, 5])
+        self.assertEqual(token, "")
+
+    def test_datetime_pages(self):
+        date_joined = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+        for user in UserModel.objects.order_by("-id"):
+            # Microseconds apart, within the same millisecond
+            user.date_joined = date_joined + datetime.timedelta(microseconds=10 - user.id)
+            user.save()
+        ids, token = [], ""
+        for _ in range(5):
+            page = ListUsersByDateJoined(ListUsersPayload(page_size=1, page_token=token), FakeContext())()
+            ids.extend(user.id for user in page.results)
+            token = page.next_page_token
+        self.assertEqual(ids, [5, 4, 3, 2, 1])
+        self.assertEqual(token, "")
+
+    def test_invalid_page_token(self):
+        context = FakeContext()
+        ListUsersPage(ListUsersPayload(page_token="tampered"), context)()
+        self.assertEqual(context.code, grpc.StatusCode.INVALID_ARGUMENT)
+
+
+class BatchRetrieveViewTest(TestCase):
+    def setUp(self):
+        for i in range(5):
+            UserModel.objects.create(id=i + 1, username="user.{}".format(i + 1))
+
+    def test_single_query(self):
+        context = FakeContext()
+        with self.assertNumQueries(1):
+            batch = BatchGetUsers(BatchGetPayload(ids=[4, 9, 1, 4, 2, 7]), context)()
+        self.assertIsNone(context.code)
+        self.assertEqual([user.username for user in batch.results], ["user.4", "user.1", "user.2"])
+        self.assertEqual(list(batch.not_found), [9, 7])
+
+    def test_max_batch_size(self):
+        context = FakeContext()
+        BatchGetUsers(BatchGetPayload(ids=range(BatchGetUsers.max_batch_size + 1)), context)()
+        self.assertEqual(context.code, grpc.StatusCode.INVALID_ARGUMENT)
+
+
+class NewUserSerializer:
+    def __init__(self, data):
+        self.initial_data = data
+        self.errors = {}
+
+    def is_valid(self):
+        if not self.initial_data.get("username"):
+            self.errors["username"] = "This field is required."
+        return not self.errors
+
+    @property
+    def validated_data(self):
+        return dict(self.initial_data, first_name=self.initial_data.get("first_name", "").title())
+
+
+class ValidatedCreateUsers(CreateUsers):
+    serializer_class = NewUserSerializer
+
+
+class AtomicCreateUsers(CreateUsers):
+    atomic = True
+
+
+def new_users(*usernames):
+    return iter([NewUser(username=username, first_name=username.split(".")[0]) for username in usernames])
+
+
+class ClientStreamCreateViewTest(TestCase):
+    def test_create_in_batches(self):
+        context = FakeContext()
+        with self.assertNumQueries(3):
+            summary = CreateUsers(new_users("bruce.wayne", "diana.prince", "clark.kent", "barry.allen", "hal.jordan"),
+                                  context)()
+        self.assertIsNone(context.code)
+        self.assertEqual(summary.created, 5)
+        self.assertEqual(UserModel.objects.get(username="clark.kent").first_name, "clark")
+
+    def test_validation(self):
+        summary = ValidatedCreateUsers(new_users("bruce.wayne"), FakeContext())()
+        self.assertEqual(summary.created, 1)
+        self.assertEqual(UserModel.objects.get(username="bruce.wayne").first_name, "Bruce")
+
+        context = FakeContext()
+        ValidatedCreateUsers(new_users("clark.kent", "diana.prince", ""), context)()
+        self.assertEqual(context.code, grpc.StatusCode.INVALID_ARGUMENT)
+        self.assertIn("Invalid message 2", context.details)
+
+
+class ClientStreamCreateTransactionTest(TransactionTestCase):
+    def test_batches_are_committed_separately(self):
+        context = FakeContext()
+        # The duplicate username is an unexpected error
+        with self.assertLogs("grpc_django", "ERROR") as logs:
+            CreateUsers(new_users("bruce.wayne", "diana.prince", "clark.kent", "clark.kent"), context)()
+        self.assertEqual(logs.records[0].exception, "IntegrityError")
+        self.assertEqual(context.code, grpc.StatusCode.UNKNOWN)
+        self.assertEqual(set(UserModel.objects.values_list("username", flat=True)), {"bruce.wayne", "diana.prince"})
+
+    def test_atomic(self):
+        context = FakeContext()
+        # The duplicate username is an unexpected error
+        with self.assertLogs("grpc_django", "ERROR") as logs:
+            AtomicCreateUsers(new_users("bruce.wayne", "diana.prince", "clark.kent", "clark.kent"), context)()
+        self.assertEqual(logs.records[0].exception, "IntegrityError")
+        self.assertEqual(context.code, grpc.StatusCode.UNKNOWN)
+        self.assertFalse(UserModel.objects.exists())
+
+
+class SlowSyncUsers(SyncUsers):
+    window = 2
+
+    def handle(self, message):
+        time.sleep(0.1)
+        self.read_when_handled.append(self.request.read)
+        return super().handle(message)
+
+
+class FailingSyncUsers(SyncUsers):
+    def handle(self, message):
+        if message.id == 2:
+            raise ValueError("Failed to sync")
+        return super().handle(message)
+
+
+class CountingRequests:
+    def __init__(self, messages):
+        self.messages = iter(messages)
+        self.read = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        message = next(self.messages)
+        self.read += 1
+        return message
+
+
+class BidiStreamViewTest(SimpleTestCase):
+    def test_responses(self):
+        context = FakeContext()
+        responses = list(SyncUsers(iter([GetPayload(id=2), GetPayload(id=3), GetPayload(id=1)]), context)())
+        self.assertEqual([user.username for user in responses], ["clary.fairchild", "bruce.wayne"])
+        self.assertIsNone(context.code)
+
+    def test_read_ahead_is_bounded_by_the_window(self):
+        requests = CountingRequests([GetPayload(id=1)] * 10)
+        view = SlowSyncUsers(requests, FakeContext())
+        view.read_when_handled = []
+        self.assertEqual(len(list(view())), 10)
+        # The message being handled, a full window, and the message waiting for room in it
+        self.assertLessEqual(view.read_when_handled[0], SlowSyncUsers.window + 2)
+        self.assertGreater(view.read_when_handled[0], 1)
+
+    def test_error(self):
+        context = FakeContext()
+        with self.assertLogs("grpc_django", "ERROR") as logs:
+            responses = list(FailingSyncUsers(iter([GetPayload(id=1), GetPayload(id=2), GetPayload(id=1)]), context)())
+        self.assertEqual(logs.records[0].exception, "ValueError")
+        self.assertEqual([user.id for user in responses], [1, 0])
+        self.assertEqual(context.code, grpc.StatusCode.UNKNOWN)
+
+    def test_reader_stops_with_the_rpc(self):
+        requests = CountingRequests([GetPayload(id=1)] * 100)
+        view = SlowSyncUsers(requests, FakeContext())
+        view.read_when_handled = []
+        responses = view()
+        next(responses)
+        responses.close()
+        view.reader.join(5)
+        self.assertFalse(view.reader.is_alive())
+        self.assertLess(requests.read, 100)
+
+    def test_reader_killed(self):
+        class Killed(BaseException):
+            pass
+
+        def requests():
+            yield GetPayload(id=1)
+            raise Killed
+
+        context = FakeContext()
+        # The uncaught exception of the reader thread is reported by threading.excepthook
+        with mock.patch.object(threading, "excepthook"), self.assertLogs("grpc_django", "ERROR") as logs:
+            responses = list(SyncUsers(requests(), context)())
+        self.assertEqual(logs.records[0].exception, "RuntimeError")
+        self.assertEqual([user.id for user in responses], [1, 0])
+        self.assertEqual(context.code, grpc.StatusCode.UNKNOWN)
+
+
+class AsyncGetUser(AsyncRetrieveGRPCView):
+    queryset = UserModel.objects.all()
+    response_proto = User
+    serializer_class = UserModelSerializer
+
+
+class AsyncListUsers(AsyncServerStreamGRPCView):
+    queryset = UserModel.objects.order_by('id')
+    response_proto = User
+    serializer_class = UserModelSerializer
+    chunk_size = 1
+
+
+class PermissionSerializer:
+    def __init__(self, obj):
+        self.obj = obj
+
+    @property
+    def data(self):
+        return {"id": self.obj.id, "content_type": {"model": self.obj.content_type.model}}
+
+
+class AsyncGetPermission(AsyncRetrieveGRPCView):
+    queryset = PermissionModel.objects.all()
+    response_proto = Permission
+    serializer_class = PermissionSerializer
+
+
+class AsyncListPermissions(AsyncServerStreamGRPCView):
+    queryset = PermissionModel.objects.filter(content_type__model="user").order_by('id')
+    response_proto = Permission
+    serializer_class = PermissionSerializer
+    chunk_size = 3
+
+
+class AsyncViewTest(TestCase):
+    def setUp(self):
+        for user in USERS:
+            UserModel.objects.create(id=user["id"], username=user["username"])
+
+    async def test_retrieve(self):
+        response = await AsyncGetUser(GetPayload(id=2), FakeContext())()
+        self.assertEqual(response, User(id=2, username="clary.fairchild"))
+
+    async def test_stream(self):
+        responses = [response async for response in AsyncListUsers(Empty(), FakeContext())()]
+        self.assertEqual([response.id for response in responses], [1, 2])
+
+    async def test_serializers_run_in_a_thread(self):
+        # The serializer loads the related content type lazily, which is not allowed on the event loop
+        permission = await PermissionModel.objects.aget(codename="add_user")
+        context = FakeContext()
+        response = await AsyncGetPermission(GetPayload(id=permission.id), context)()
+        self.assertIsNone(context.code)
+        self.assertEqual(response.content_type.model, "user")
+
+        context = FakeContext()
+        responses = [response async for response in AsyncListPermissions(Empty(), context)()]
+        self.assertIsNone(context.code)
+        self.assertEqual(len(responses), await AsyncListPermissions.queryset.acount())
+        self.assertEqual({response.content_type.model for response in responses}, {"user"})